@@ -0,0 +1,243 @@
+"""
+Bridge Logging
+Quiet stderr, per-message rate limiting and a ring buffer of recent records
+"""
+import os
+import sys
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Dict, Any, List, Optional, TextIO
+
+from config import env_int
+
+# Optional: loguru, used by the Vidurai SDK (its records are routed through here)
+try:
+    from loguru import logger as loguru_logger
+    LOGURU_AVAILABLE = True
+except ImportError:
+    LOGURU_AVAILABLE = False
+
+# Only warnings and errors reach stderr unless VIDURAI_LOG_LEVEL says otherwise;
+# everything from INFO up is kept in memory for get_logs
+DEFAULT_STDERR_LEVEL = logging.WARNING
+BUFFER_LEVEL = logging.INFO
+
+# Recent records kept for get_logs (VIDURAI_LOG_BUFFER)
+DEFAULT_BUFFER_SIZE = 2000
+
+# Each message template may log RATE_BURST times per RATE_WINDOW_S seconds
+RATE_BURST = 5
+RATE_WINDOW_S = 60.0
+
+# Message templates tracked by the rate limiter before expired windows are dropped
+MAX_TRACKED = 1000
+
+# Parsed by the extension: the level is the word between "] " and ":"
+LOG_FORMAT = '[%(asctime)s] %(levelname)s: %(message)s'
+
+
+def parse_level(name: Any, default: int) -> int:
+    """Logging level for a name like 'warning' (default if missing)"""
+    if name is None or name == '':
+        return default
+    level = logging.getLevelName(str(name).upper())
+    if not isinstance(level, int):
+        raise ValueError(f"Unknown log level: {name!r}")
+    return level
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drop repeats of the same message beyond a burst per window.
+
+    Records are keyed on their unformatted template (record.msg), so
+    "Secrets detected in %s" counts as one message whatever the file.
+    Drops are counted; the first record let through once the window
+    rolls over carries the count as `record.suppressed`.
+    """
+
+    def __init__(self, burst: int = RATE_BURST, window_s: float = RATE_WINDOW_S):
+        super().__init__()
+        self.burst = burst
+        self.window_s = window_s
+        self.suppressed_total = 0
+        self._windows: Dict[tuple, List] = {}  # key -> [window start, passed, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, record.levelno, str(record.msg))
+        now = record.created
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.window_s:
+                if window is None and len(self._windows) >= MAX_TRACKED:
+                    self._expire(now)
+                record.suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                record.suppressed = 0
+                return True
+            window[2] += 1
+            self.suppressed_total += 1
+            return False
+
+    def _expire(self, now: float):
+        self._windows = {
+            key: window for key, window in self._windows.items()
+            if now - window[0] < self.window_s
+        }
+        if len(self._windows) >= MAX_TRACKED:
+            self._windows.clear()
+
+    def suppressing(self) -> Dict[str, int]:
+        """Templates currently being dropped -> records dropped this window"""
+        with self._lock:
+            return {key[2]: window[2] for key, window in self._windows.items() if window[2]}
+
+
+class SuppressionFormatter(logging.Formatter):
+    """Standard format plus a note when similar records were dropped"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            text += f" ({suppressed} similar messages suppressed)"
+        return text
+
+
+class RingBufferHandler(logging.Handler):
+    """Keep the most recent records as small dicts for get_logs"""
+
+    def __init__(self, capacity: int = DEFAULT_BUFFER_SIZE, level: int = BUFFER_LEVEL):
+        super().__init__(level)
+        self._records: deque = deque(maxlen=max(1, capacity))
+        self.last_seq = 0
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            message = record.getMessage()
+            if record.exc_info:
+                message += '\n' + logging.Formatter().formatException(record.exc_info)
+        except Exception:
+            self.handleError(record)
+            return
+        self.last_seq += 1
+        self._records.append({
+            'seq': self.last_seq,
+            'ts': datetime.fromtimestamp(record.created).isoformat(),
+            'level': record.levelname,
+            'levelno': record.levelno,
+            'logger': record.name,
+            'message': message,
+            'suppressed': getattr(record, 'suppressed', 0)
+        })
+
+    def records(self, level: int = logging.NOTSET, since: int = 0,
+                limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Buffered records after seq `since` at `level` or above, oldest first"""
+        with self.lock:
+            matching = [r for r in self._records if r['seq'] > since and r['levelno'] >= level]
+        if limit is not None:
+            matching = matching[-limit:]
+        return [{k: v for k, v in r.items() if k != 'levelno'} for r in matching]
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            buffered = len(self._records)
+        return {
+            'capacity': self._records.maxlen,
+            'buffered': buffered,
+            'last_seq': self.last_seq,
+            'dropped': self.last_seq - buffered
+        }
+
+
+_installed: Optional['BridgeLogging'] = None
+
+
+def installed_logging() -> Optional['BridgeLogging']:
+    """What configure_logging() installed in this process (None if it wasn't called)"""
+    return _installed
+
+
+class BridgeLogging:
+    """The bridge's handlers and rate limiter, as installed by configure_logging()"""
+
+    def __init__(self, stderr_handler: logging.Handler, buffer: RingBufferHandler,
+                 limiter: RateLimitFilter):
+        self.stderr_handler = stderr_handler
+        self.buffer = buffer
+        self.limiter = limiter
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.buffer.stats()
+        stats['stderr_level'] = logging.getLevelName(self.stderr_handler.level)
+        stats['suppressed'] = self.limiter.suppressed_total
+        stats['suppressing'] = self.limiter.suppressing()
+        return stats
+
+
+def _forward_loguru(message):
+    """loguru sink: re-log an SDK record through the standard handlers"""
+    record = message.record
+    # loguru's level numbers match the standard library's (SUCCESS = 25 sits between)
+    logging.getLogger(record['name'] or 'vidurai').log(record['level'].no, record['message'])
+
+
+def configure_logging(stream: Optional[TextIO] = None,
+                      stderr_level: Optional[int] = None,
+                      buffer_size: Optional[int] = None) -> BridgeLogging:
+    """
+    Install the bridge's logging: rate-limited 'vidurai-bridge' records,
+    WARNING+ to stderr and INFO+ into the ring buffer. Records below both
+    levels are rejected before their message is formatted. An unknown
+    VIDURAI_LOG_LEVEL falls back to WARNING (and is logged as a warning).
+    """
+    global _installed
+    bad_level = None
+    if stderr_level is None:
+        try:
+            stderr_level = parse_level(os.environ.get('VIDURAI_LOG_LEVEL'), DEFAULT_STDERR_LEVEL)
+        except ValueError as e:
+            stderr_level = DEFAULT_STDERR_LEVEL
+            bad_level = e
+    if buffer_size is None:
+        buffer_size = env_int('VIDURAI_LOG_BUFFER', DEFAULT_BUFFER_SIZE)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if getattr(handler, '_vidurai', False):
+            root.removeHandler(handler)
+
+    # stdout is for JSON responses only!
+    stderr_handler = logging.StreamHandler(stream or sys.stderr)
+    stderr_handler.setLevel(stderr_level)
+    stderr_handler.setFormatter(SuppressionFormatter(LOG_FORMAT))
+    buffer = RingBufferHandler(buffer_size, min(BUFFER_LEVEL, stderr_level))
+    for handler in (stderr_handler, buffer):
+        handler._vidurai = True
+        root.addHandler(handler)
+    root.setLevel(buffer.level)
+
+    bridge_logger = logging.getLogger('vidurai-bridge')
+    for old in [f for f in bridge_logger.filters if isinstance(f, RateLimitFilter)]:
+        bridge_logger.removeFilter(old)
+    limiter = RateLimitFilter()
+    bridge_logger.addFilter(limiter)
+
+    if LOGURU_AVAILABLE:
+        # Replaces loguru's own stderr sink (which logs everything from DEBUG up)
+        loguru_logger.remove()
+        loguru_logger.add(
+            _forward_loguru, level=logging.getLevelName(buffer.level), format='{message}'
+        )
+
+    _installed = BridgeLogging(stderr_handler, buffer, limiter)
+    if bad_level is not None:
+        bridge_logger.warning("Ignoring VIDURAI_LOG_LEVEL: %s", bad_level)
+    return _installed
@@ -0,0 +1,17 @@
+"""
+Bridge Configuration
+Environment settings shared by the bridge modules
+"""
+import os
+import logging
+
+logger = logging.getLogger('vidurai-bridge')
+
+
+def env_int(name: str, default: int) -> int:
+    """Integer setting from the environment (default if unset or invalid)"""
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        logger.warning("Ignoring invalid %s=%r", name, os.environ.get(name))
+        return default
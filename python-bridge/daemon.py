@@ -0,0 +1,201 @@
+"""
+Bridge Daemon
+One long-lived bridge shared by many VS Code windows over a Unix socket
+
+Usage:
+    python bridge.py daemon [--socket PATH]
+"""
+import os
+import json
+import time
+import socket
+import logging
+import argparse
+import threading
+import socketserver
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger('vidurai-bridge')
+
+SOCKET_PATH = Path(
+    os.environ.get('VIDURAI_BRIDGE_SOCKET', Path.home() / ".vidurai" / "bridge.sock")
+)
+
+
+class ClientSession:
+    """
+    One connected client (usually one VS Code window).
+
+    Sessions are isolated from each other: each has its own response
+    stream and request-id space, and a client going away never affects
+    the others. Memory, caches and DB connections are shared: every
+    client talks to the same ViduraiManager session. The daemon keeps no
+    per-client project; project-scoped requests use their own
+    project_path, so one window switching projects never changes what
+    another window sees.
+    """
+
+    def __init__(self, session_id: int, wfile):
+        self.session_id = session_id
+        self.connected_at = time.time()
+        self.events = 0
+        self.closed = False
+        self._wfile = wfile
+        self._lock = threading.Lock()
+
+    def send(self, response: Dict[str, Any]):
+        """Write one JSON response line to this client"""
+        if self.closed:
+            return
+        data = (json.dumps(response) + '\n').encode('utf-8')
+        with self._lock:
+            try:
+                self._wfile.write(data)
+                self._wfile.flush()
+            except OSError:
+                # Client went away mid-request; drop its pending responses
+                self.closed = True
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            'session_id': self.session_id,
+            'connected_s': round(time.time() - self.connected_at, 1),
+            'events': self.events
+        }
+
+
+class _ClientHandler(socketserver.StreamRequestHandler):
+    """Feed one client's request lines into the shared bridge inbox"""
+
+    def handle(self):
+        daemon: 'BridgeDaemon' = self.server.bridge_daemon
+        session = daemon.open_session(self.wfile)
+        try:
+            for raw in self.rfile:
+                session.events += 1
+                daemon.bridge.submit_line(raw.decode('utf-8', errors='replace'), session.send)
+        except OSError:
+            pass
+        finally:
+            daemon.close_session(session)
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def daemon_running(socket_path: Path = SOCKET_PATH) -> bool:
+    """True if a daemon is accepting connections on socket_path"""
+    if not hasattr(socket, 'AF_UNIX') or not socket_path.exists():
+        return False
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.settimeout(0.5)
+        probe.connect(str(socket_path))
+        return True
+    except OSError:
+        return False
+    finally:
+        probe.close()
+
+
+class BridgeDaemon:
+    """Serve the bridge protocol to many clients from one process"""
+
+    def __init__(self, bridge, socket_path: Path = SOCKET_PATH):
+        self.bridge = bridge
+        self.socket_path = Path(socket_path)
+        self.sessions: Dict[int, ClientSession] = {}
+        self._next_session_id = 1
+        self._lock = threading.Lock()
+        self._server: Optional[_UnixServer] = None
+
+    def open_session(self, wfile) -> ClientSession:
+        with self._lock:
+            session = ClientSession(self._next_session_id, wfile)
+            self._next_session_id += 1
+            self.sessions[session.session_id] = session
+        logger.info("Client %s connected (%d active)", session.session_id, len(self.sessions))
+        return session
+
+    def close_session(self, session: ClientSession):
+        session.closed = True
+        with self._lock:
+            self.sessions.pop(session.session_id, None)
+        logger.info(
+            "Client %s disconnected (%d active)", session.session_id, len(self.sessions)
+        )
+
+    def describe_sessions(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [s.describe() for s in self.sessions.values()]
+
+    def serve(self):
+        """Accept clients on a background thread and process on this one"""
+        if not hasattr(socket, 'AF_UNIX'):
+            raise RuntimeError("Unix domain sockets are not supported on this platform")
+
+        if daemon_running(self.socket_path):
+            raise RuntimeError(f"A bridge daemon is already running on {self.socket_path}")
+
+        # Remove a stale socket left by a daemon that crashed
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Only the current user may connect: the socket is created 0600 by bind()
+        # itself, so there is no window in which others could connect
+        old_umask = os.umask(0o177)
+        try:
+            self._server = _UnixServer(str(self.socket_path), _ClientHandler)
+        finally:
+            os.umask(old_umask)
+        self._server.bridge_daemon = self
+
+        server_thread = threading.Thread(
+            target=self._server.serve_forever,
+            name='vidurai-daemon-accept',
+            daemon=True
+        )
+        server_thread.start()
+        logger.info("Bridge daemon listening on %s", self.socket_path)
+
+        try:
+            self.bridge.serve_inbox()
+        finally:
+            self.shutdown()
+
+    def shutdown(self):
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._server = None
+        try:
+            self.socket_path.unlink()
+        except OSError:
+            pass
+        logger.info("Bridge daemon stopped")
+
+
+def main(bridge_factory, argv: Optional[List[str]] = None) -> int:
+    """CLI entry point for `python bridge.py daemon`"""
+    parser = argparse.ArgumentParser(
+        prog='bridge.py daemon',
+        description='Run one shared Vidurai bridge for all VS Code windows'
+    )
+    parser.add_argument('--socket', type=Path, default=SOCKET_PATH,
+                        help=f'Unix socket path (default: {SOCKET_PATH})')
+    args = parser.parse_args(argv)
+
+    bridge = bridge_factory()
+    daemon = BridgeDaemon(bridge, args.socket)
+    bridge.daemon = daemon
+
+    try:
+        daemon.serve()
+    except RuntimeError as e:
+        logger.error(str(e))
+        return 1
+    return 0
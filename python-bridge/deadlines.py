@@ -0,0 +1,58 @@
+"""
+Request Deadlines
+Absolute client deadlines checked when work is dequeued and at safe checkpoints
+"""
+import time
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from metrics import parse_client_timestamp
+
+# SQLite virtual machine instructions between deadline checks in a query
+SQLITE_CHECK_EVERY = 10000
+
+
+class DeadlineExceeded(Exception):
+    """The client has stopped waiting for this request"""
+
+
+class Deadline:
+    """Point in time (epoch seconds) after which a request's result is useless"""
+
+    def __init__(self, at: Optional[float] = None):
+        self.at = at
+
+    @classmethod
+    def from_event(cls, event: dict) -> 'Deadline':
+        """Deadline from an event's `_deadline` (epoch ms or ISO 8601; none if absent)"""
+        return cls(parse_client_timestamp(event.get('_deadline')))
+
+    def expired(self, now: Optional[float] = None) -> bool:
+        if self.at is None:
+            return False
+        return (time.time() if now is None else now) >= self.at
+
+    def check(self, stage: str = 'processing'):
+        """Checkpoint: raise DeadlineExceeded if the deadline has passed"""
+        if self.expired():
+            raise DeadlineExceeded(f"Deadline exceeded during {stage}")
+
+    @contextmanager
+    def guard_sqlite(self, conn: sqlite3.Connection) -> Iterator[None]:
+        """Interrupt queries on conn once the deadline passes"""
+        if self.at is None:
+            yield
+            return
+        conn.set_progress_handler(lambda: 1 if self.expired() else 0, SQLITE_CHECK_EVERY)
+        try:
+            yield
+        except sqlite3.OperationalError as e:
+            if 'interrupted' in str(e) and self.expired():
+                raise DeadlineExceeded("Deadline exceeded during database query") from e
+            raise
+        finally:
+            conn.set_progress_handler(None, 0)
+
+
+NO_DEADLINE = Deadline()
@@ -0,0 +1,196 @@
+"""
+Near-Duplicate Suppression
+SimHash fingerprints with a banded index to fold repeated memories
+"""
+import re
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, Hashable, List, Optional, Set, Tuple
+
+from config import env_int
+
+logger = logging.getLogger('vidurai-bridge')
+
+FINGERPRINT_BITS = 64
+
+# Fingerprints within this Hamming distance are near-duplicates
+DEFAULT_MAX_DISTANCE = 3
+
+# Split into MAX_DISTANCE + 1 bands: two fingerprints within the distance
+# always agree on at least one band (pigeonhole), so band hits find them all
+BANDS = DEFAULT_MAX_DISTANCE + 1
+BAND_BITS = FINGERPRINT_BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+# Only fold repeats seen within this many seconds of the last occurrence
+DEFAULT_WINDOW_S = 1800
+
+TOKEN_RE = re.compile(r'\w+')
+DIGITS_RE = re.compile(r'\d+')
+
+
+@lru_cache(maxsize=65536)
+def _feature_hash(feature: str) -> int:
+    return int.from_bytes(
+        hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big'
+    )
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over word unigrams and bigrams (numbers normalised)"""
+    words = TOKEN_RE.findall(DIGITS_RE.sub('0', text.lower()))
+    features = words + [f'{a} {b}' for a, b in zip(words, words[1:])]
+    if not features:
+        return 0
+
+    weights = [0] * FINGERPRINT_BITS
+    for feature in features:
+        h = _feature_hash(feature)
+        for bit in range(FINGERPRINT_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+def _bands(fingerprint: int) -> List[Tuple[int, int]]:
+    return [(i, fingerprint >> (i * BAND_BITS) & BAND_MASK) for i in range(BANDS)]
+
+
+class Deduplicator:
+    """
+    Find recent near-duplicates of a new memory.
+
+    Candidates must share a blocking key (event type, file/command and
+    salience) and have a SimHash within max_distance bits. Entries expire
+    window_s seconds after they were last seen, so only bursts are folded.
+    """
+
+    def __init__(self, window_s: Optional[int] = None,
+                 max_distance: int = DEFAULT_MAX_DISTANCE):
+        self.window_s = (
+            window_s if window_s is not None
+            else env_int('VIDURAI_DEDUP_WINDOW_S', DEFAULT_WINDOW_S)
+        )
+        self.max_distance = min(max_distance, DEFAULT_MAX_DISTANCE)
+
+        # memory id -> (key, fingerprint, last_seen), oldest last_seen first
+        self._entries: 'OrderedDict[str, Tuple[Hashable, int, float]]' = OrderedDict()
+        self._bands: Dict[Tuple[int, int], Set[str]] = {}
+
+        self.checked = 0
+        self.folded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window_s > 0
+
+    def _expire(self, now: float):
+        cutoff = now - self.window_s
+        while self._entries:
+            memory_id, (_, fingerprint, last_seen) = next(iter(self._entries.items()))
+            if last_seen >= cutoff:
+                break
+            self._drop(memory_id, fingerprint)
+
+    def _drop(self, memory_id: str, fingerprint: int):
+        self._entries.pop(memory_id, None)
+        for band in _bands(fingerprint):
+            ids = self._bands.get(band)
+            if ids is not None:
+                ids.discard(memory_id)
+                if not ids:
+                    del self._bands[band]
+
+    def find(self, key: Hashable, fingerprint: int,
+             now: Optional[float] = None) -> Optional[str]:
+        """Most recently seen near-duplicate of (key, fingerprint), if any"""
+        if not self.enabled:
+            return None
+        now = time.time() if now is None else now
+        self._expire(now)
+        self.checked += 1
+
+        candidates: Set[str] = set()
+        for band in _bands(fingerprint):
+            candidates |= self._bands.get(band, set())
+
+        best = None
+        best_seen = -1.0
+        for memory_id in candidates:
+            entry_key, entry_fp, last_seen = self._entries[memory_id]
+            if (entry_key == key and last_seen > best_seen
+                    and hamming(fingerprint, entry_fp) <= self.max_distance):
+                best, best_seen = memory_id, last_seen
+        return best
+
+    def add(self, memory_id: str, key: Hashable, fingerprint: int,
+            now: Optional[float] = None):
+        """Track a newly stored memory"""
+        if not self.enabled:
+            return
+        now = time.time() if now is None else now
+        self._entries[memory_id] = (key, fingerprint, now)
+        for band in _bands(fingerprint):
+            self._bands.setdefault(band, set()).add(memory_id)
+
+    def touch(self, memory_id: str, now: Optional[float] = None):
+        """Record that a duplicate was folded into memory_id"""
+        now = time.time() if now is None else now
+        key, fingerprint, _ = self._entries[memory_id]
+        self._entries[memory_id] = (key, fingerprint, now)
+        self._entries.move_to_end(memory_id)
+        self.folded += 1
+
+    def forget(self, memory_id: str):
+        """Stop tracking a memory (e.g. evicted from the working set)"""
+        entry = self._entries.get(memory_id)
+        if entry is not None:
+            self._drop(memory_id, entry[1])
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> int:
+        """Stop tracking every memory, returning how many were tracked"""
+        dropped = len(self._entries)
+        self._entries = OrderedDict()
+        self._bands = {}
+        return dropped
+
+    def snapshot_state(self) -> Dict[str, Any]:
+        return {
+            'entries': list(self._entries.items()),
+            'checked': self.checked,
+            'folded': self.folded
+        }
+
+    def restore_state(self, state: Dict[str, Any]):
+        self._entries = OrderedDict()
+        self._bands = {}
+        for memory_id, (key, fingerprint, last_seen) in state['entries']:
+            self._entries[memory_id] = (key, fingerprint, last_seen)
+            for band in _bands(fingerprint):
+                self._bands.setdefault(band, set()).add(memory_id)
+        self.checked = state['checked']
+        self.folded = state['folded']
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'window_s': self.window_s,
+            'checked': self.checked,
+            'folded': self.folded,
+            'suppression_rate': round(self.folded / self.checked, 3) if self.checked else 0.0,
+            'tracked': len(self._entries)
+        }
@@ -0,0 +1,925 @@
+"""
+Bridge Engine
+The bridge pipeline (validate -> process -> remember) independent of any transport
+
+Transports feed it request lines (stdio in stdio_transport.py, a Unix socket
+in daemon.py); embedding code calls submit() / submit_many() directly.
+"""
+import json
+import time
+import queue
+import logging
+import threading
+from typing import Callable, Dict, Any, Iterable, List, Optional
+from pathlib import Path
+
+from event_processor import EventProcessor
+from secret_scan import SCAN_CACHE_FILE
+from vidurai_manager import ViduraiManager, DB_MEMORY_FIELDS
+from profiler import BridgeProfiler
+from memory_budget import MemoryBudget
+from metrics import BridgeMetrics
+from snapshot import SnapshotManager
+from maintenance import MaintenanceScheduler
+from deadlines import Deadline, DeadlineExceeded, NO_DEADLINE
+from transfer import export_memories, import_memories
+from pagination import clamp_page_size, project, project_lazy, validate_fields
+from interning import STRINGS, dictionary_encode
+from bridge_logging import installed_logging, parse_level
+from vidurai.core.data_structures_v3 import SalienceLevel
+
+logger = logging.getLogger('vidurai-bridge')
+
+
+def _discard(response: Dict[str, Any]):
+    """Reply target for requests nobody is waiting on"""
+
+
+class BridgeEngine:
+    """The bridge's event pipeline, shared by every transport"""
+
+    def __init__(self, session_id: Optional[str] = None,
+                 scan_cache_path: Optional[Path] = SCAN_CACHE_FILE):
+        self.event_processor = EventProcessor(scan_cache_path=scan_cache_path)
+        self.vidurai_manager = ViduraiManager(session_id=session_id)
+        self.profiler = BridgeProfiler()
+        self.metrics = BridgeMetrics()
+        self.daemon = None  # Set when serving many clients (bridge.py daemon)
+        self.running = True
+
+        # Incoming lines: (line, received_at, reply) or None at EOF/shutdown.
+        # `reply` sends a response back to whichever client sent the line.
+        self._inbox: queue.Queue = queue.Queue()
+        # Held per event, so direct submit() calls can run beside a transport
+        self._lock = threading.RLock()
+        self._reply: Callable[[Dict[str, Any]], None] = _discard  # Current request's client
+        self._deadline: Deadline = NO_DEADLINE  # Current request's client deadline
+
+        # Hard cap on bridge memory: the working set first, then these caches in order
+        self.memory_budget = MemoryBudget(
+            size_fn=self.vidurai_manager.working_set_size,
+            evict_fn=self.vidurai_manager.evict
+        )
+        scanner = self.event_processor.secret_scanner
+        self.memory_budget.register_cache('secret_scan', scanner.cache_size, scanner.clear_cache)
+        dedup = self.vidurai_manager.dedup
+        self.memory_budget.register_cache('dedup', lambda: len(dedup), dedup.clear)
+        self.memory_budget.register_cache('interned_strings', lambda: len(STRINGS), STRINGS.clear)
+
+        # Warm restarts: working set and derived indexes from the last snapshot
+        self.snapshots = SnapshotManager(
+            self.vidurai_manager.session_dir / f"{self.vidurai_manager.session_id}.snapshot.pkl"
+        )
+        self.snapshots.register('manager', self.vidurai_manager)
+        self.snapshots.register('secret_scanner', self.event_processor.secret_scanner)
+        self.snapshots.restore()
+
+        # Housekeeping in small preemptible slices while no events arrive
+        self.maintenance = MaintenanceScheduler()
+        self._register_maintenance()
+
+        # Optional profiling from the environment (VIDURAI_BRIDGE_PROFILE)
+        self.profiler.configure_from_env()
+
+        logger.info("Vidurai Bridge initialized")
+
+    def _register_maintenance(self):
+        """Idle-time housekeeping tasks (each step is one bounded unit of work)"""
+        manager = self.vidurai_manager
+
+        def write_snapshot():
+            if self.snapshots.dirty:
+                manager.save_index()
+                yield
+                yield from self.snapshots.write_steps()
+            yield
+
+        def save_state():
+            manager.save_session()  # Also compacts removed rows out of the semantic index
+            yield
+            self.event_processor.secret_scanner.save()
+            yield
+
+        def prune_noise():
+            while manager.prune_noise(limit=500):
+                yield
+
+        def backfill_index():
+            while manager.reindex_missing(limit=1000):
+                yield
+
+        def vacuum_database():
+            while manager.vacuum_step(pages=256):
+                yield
+
+        if self.snapshots.interval_s:
+            self.maintenance.register('snapshot', write_snapshot, self.snapshots.interval_s,
+                                      pending=lambda: int(self.snapshots.dirty))
+        self.maintenance.register('save_state', save_state, 300)
+        self.maintenance.register('prune_noise', prune_noise, 3600, pending=manager.noise_backlog)
+        self.maintenance.register('backfill_index', backfill_index, 600,
+                                  pending=manager.index_backlog)
+        self.maintenance.register('vacuum_database', vacuum_database, 86400)
+
+    def _finish_profiling(self):
+        """Flush an active profiling session to disk before exiting"""
+        if not self.profiler.active:
+            return
+        try:
+            summary = self.profiler.stop()
+            logger.info("Profile written: %s", summary['files'])
+        except Exception as e:
+            logger.error("Error writing profile: %s", e)
+
+    def _validate_event(self, event: Dict[str, Any]) -> bool:
+        """Validate event has required fields"""
+        event_schemas = {
+            'file_edit': ['type', 'file', 'content'],
+            'terminal_output': ['type', 'command', 'output', 'exitCode'],
+            'diagnostic': ['type', 'file', 'severity', 'message'],
+            'recall_context': ['type', 'query'],
+            'get_stats': ['type'],
+            'ping': ['type'],
+            # v2.0: New commands for database queries
+            'get_recent_activity': ['type', 'project_path'],
+            'recall_memories': ['type', 'project_path'],
+            'get_statistics': ['type', 'project_path'],
+            'get_context_for_ai': ['type', 'project_path'],
+            # Diagnostics: on-demand profiling
+            'profile_start': ['type'],
+            'profile_stop': ['type'],
+            'health': ['type'],
+            'get_activity_histogram': ['type'],
+            'get_logs': ['type'],
+            'lookup_error': ['type'],
+            # Streaming NDJSON backup/restore
+            'export_memories': ['type', 'project_path', 'path'],
+            'import_memories': ['type', 'project_path', 'path'],
+        }
+
+        event_type = event.get('type')
+        if event_type not in event_schemas:
+            logger.error("Unknown event type: %s", event_type)
+            return False
+
+        required_fields = event_schemas[event_type]
+        for field in required_fields:
+            if field not in event:
+                logger.error("Missing required field '%s' in %s", field, event_type)
+                return False
+
+        return True
+
+    def process_event(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Process incoming event from VS Code"""
+        event_type = event.get('type')
+
+        try:
+            if event_type == 'ping':
+                return {'status': 'ok', 'message': 'pong'}
+
+            elif event_type == 'file_edit':
+                return self._handle_file_edit(event)
+
+            elif event_type == 'terminal_output':
+                return self._handle_terminal_output(event)
+
+            elif event_type == 'diagnostic':
+                return self._handle_diagnostic(event)
+
+            elif event_type == 'recall_context':
+                return self._handle_recall_context(event)
+
+            elif event_type == 'get_stats':
+                return self._handle_get_stats()
+
+            elif event_type == 'health':
+                return self._handle_health()
+
+            elif event_type == 'get_activity_histogram':
+                return self._handle_get_activity_histogram(event)
+
+            elif event_type == 'get_logs':
+                return self._handle_get_logs(event)
+
+            elif event_type == 'lookup_error':
+                return self._handle_lookup_error(event)
+
+            # v2.0: New database query commands
+            elif event_type == 'get_recent_activity':
+                return self._handle_get_recent_activity(event)
+
+            elif event_type == 'recall_memories':
+                return self._handle_recall_memories(event)
+
+            elif event_type == 'get_statistics':
+                return self._handle_get_statistics(event)
+
+            elif event_type == 'get_context_for_ai':
+                return self._handle_get_context_for_ai(event)
+
+            elif event_type == 'profile_start':
+                return self._handle_profile_start(event)
+
+            elif event_type == 'profile_stop':
+                return self._handle_profile_stop(event)
+
+            elif event_type == 'export_memories':
+                return self._handle_export_memories(event)
+
+            elif event_type == 'import_memories':
+                return self._handle_import_memories(event)
+
+            else:
+                return {
+                    'status': 'error',
+                    'error': f'Unknown event type: {event_type}'
+                }
+
+        except DeadlineExceeded as e:
+            self.metrics.deadline_missed('processing')
+            return {
+                'status': 'deadline_exceeded',
+                'error': str(e)
+            }
+
+        except Exception as e:
+            logger.exception("Error processing %s", event_type)
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+
+    def _handle_file_edit(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle file edit event"""
+        file_path = event['file']
+        content = event['content']
+
+        # Process event (salience classification, secrets detection)
+        processed = self.event_processor.process_file_edit(file_path, content)
+
+        # Store in Vidurai
+        memory_id = self.vidurai_manager.remember(
+            content=processed['gist'],
+            metadata={
+                'type': 'file_edit',
+                'file': file_path,
+                'project_path': event.get('project_path'),
+                'salience': processed['salience'].name
+            },
+            salience=processed['salience']
+        )
+
+        self.memory_budget.note_write()
+        self._record_activity(event, 'file_edit', processed['salience'], file_path)
+        if processed['salience'] != SalienceLevel.NOISE:
+            self.vidurai_manager.errors.record_edit(file_path, memory_id, event.get('project_path'))
+
+        return {
+            'status': 'ok',
+            'memory_id': memory_id,
+            'salience': processed['salience'].name,
+            'gist': processed['gist'],
+            'secrets_detected': processed.get('contains_secrets', False)
+        }
+
+    def _handle_terminal_output(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle terminal output event"""
+        command = event['command']
+        output = event['output']
+        exit_code = event['exitCode']
+
+        # Process event
+        processed = self.event_processor.process_terminal_output(
+            command, output, exit_code
+        )
+
+        # Store in Vidurai
+        memory_id = self.vidurai_manager.remember(
+            content=processed['gist'],
+            metadata={
+                'type': 'terminal',
+                'command': command,
+                'exit_code': exit_code,
+                'project_path': event.get('project_path'),
+                'salience': processed['salience'].name
+            },
+            salience=processed['salience']
+        )
+
+        self.memory_budget.note_write()
+        self._record_activity(event, 'terminal', processed['salience'])
+        if exit_code == 0:
+            self.vidurai_manager.errors.record_success(command)
+
+        return self._record_error(event, processed, memory_id, command=command)
+
+    def _handle_diagnostic(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Handle diagnostic (error/warning) event"""
+        file_path = event['file']
+        severity = event['severity']
+        message = event['message']
+
+        # Process event
+        processed = self.event_processor.process_diagnostic(
+            file_path, severity, message
+        )
+
+        # Store in Vidurai
+        memory_id = self.vidurai_manager.remember(
+            content=processed['gist'],
+            metadata={
+                'type': 'diagnostic',
+                'file': file_path,
+                'severity': severity,
+                'project_path': event.get('project_path'),
+                'salience': processed['salience'].name
+            },
+            salience=processed['salience']
+        )
+
+        self.memory_budget.note_write()
+        self._record_activity(event, 'diagnostic', processed['salience'], file_path)
+
+        return self._record_error(event, processed, memory_id, file_path=file_path)
+
+    def _record_activity(self, event: Dict[str, Any], event_type: str,
+                         salience, file_path: str = None):
+        """Count an event in the project's activity rollups"""
+        self.vidurai_manager.rollups.record(
+            event.get('project_path'), salience.name, event_type, file_path
+        )
+
+    def _record_error(self, event: Dict[str, Any], processed: Dict[str, Any], memory_id: str,
+                      file_path: str = None, command: str = None) -> Dict[str, Any]:
+        """Index a failure's fingerprint; the response says whether it was seen before"""
+        response = {
+            'status': 'ok',
+            'memory_id': memory_id,
+            'salience': processed['salience'].name,
+            'gist': processed['gist']
+        }
+        if processed.get('error_signature'):
+            seen = self.vidurai_manager.errors.record(
+                processed['error_signature'],
+                'terminal' if command is not None else 'diagnostic',
+                memory_id=memory_id,
+                project_path=event.get('project_path'),
+                file_path=file_path,
+                command=command
+            )
+            response['error_fingerprint'] = seen['fingerprint']
+            response['seen_before'] = seen['seen_before']
+        return response
+
+    # Fields recall_context can return; each is computed only when requested
+    MEMORY_FIELDS = {
+        'memory_id': lambda mem: mem.engram_id,
+        'gist': lambda mem: mem.gist or mem.verbatim,
+        'verbatim': lambda mem: mem.verbatim,
+        'salience': lambda mem: mem.salience.name,
+        'age_days': lambda mem: mem.age_days(),
+        'created_at': lambda mem: mem.created_at.isoformat(),
+        'metadata': lambda mem: dict(mem.metadata or {}),
+    }
+    DEFAULT_MEMORY_FIELDS = ['gist', 'verbatim', 'salience', 'age_days', 'metadata']
+
+    def _handle_recall_context(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Recall relevant memories (one page; pass next_cursor back for more)"""
+        query = event['query']
+        try:
+            top_k = clamp_page_size(event.get('top_k'), 10)
+            fields = (validate_fields(event.get('fields'), self.MEMORY_FIELDS)
+                      or self.DEFAULT_MEMORY_FIELDS)
+        except ValueError as e:
+            return {'status': 'error', 'error': str(e)}
+
+        memories, next_cursor = self.vidurai_manager.recall_page(
+            query, top_k, event.get('cursor'), deadline=self._deadline
+        )
+
+        return self._encode_memories(event, {
+            'status': 'ok',
+            'memories': [project_lazy(mem, self.MEMORY_FIELDS, fields) for mem in memories],
+            'count': len(memories),
+            'next_cursor': next_cursor
+        })
+
+    def _encode_memories(self, event: Dict[str, Any], response: Dict[str, Any]) -> Dict[str, Any]:
+        """Dictionary-encode paths and types when the client asks for encoding='dict'"""
+        encoding = event.get('encoding')
+        if encoding is None:
+            return response
+        if encoding != 'dict':
+            raise ValueError(f"Unknown encoding: {encoding!r} (use 'dict')")
+
+        response['memories'], response['strings'] = dictionary_encode(response['memories'])
+        response['encoding'] = 'dict'
+        return response
+
+    def _handle_get_stats(self) -> Dict[str, Any]:
+        """Get current session statistics"""
+        stats = self.vidurai_manager.get_stats()
+        stats['memory_budget'] = self.memory_budget.report()
+        stats['secret_scan'] = self.event_processor.secret_scanner.stats()
+        stats['snapshot'] = self.snapshots.stats()
+        stats['maintenance'] = self.maintenance.stats()
+        logs = installed_logging()
+        if logs is not None:
+            stats['logging'] = logs.stats()
+
+        return {
+            'status': 'ok',
+            'stats': stats
+        }
+
+    def _handle_health(self) -> Dict[str, Any]:
+        """Report lag percentiles, queue depth and process resources"""
+        health = self.metrics.health(queued=self._inbox.qsize())
+        if self.daemon is not None:
+            health['clients'] = self.daemon.describe_sessions()
+
+        return {
+            'status': 'ok',
+            'health': health
+        }
+
+    def _handle_get_logs(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Recent log records from the in-memory buffer (poll with since=last_seq)"""
+        try:
+            level = parse_level(event.get('level'), logging.NOTSET)
+            since = int(event.get('since', 0))
+            limit = clamp_page_size(event.get('limit'), 200)
+        except (TypeError, ValueError) as e:
+            return {'status': 'error', 'error': str(e)}
+
+        logs = installed_logging()
+        if logs is None:
+            return {'status': 'error', 'error': 'Log buffer is not enabled in this process'}
+
+        return {
+            'status': 'ok',
+            'logs': logs.buffer.records(level, since, limit),
+            'last_seq': logs.buffer.last_seq,
+            'suppressed': logs.limiter.suppressed_total
+        }
+
+    def _handle_lookup_error(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Prior occurrences and likely fixes for a failure (by error text or fingerprint)"""
+        source = event.get('source', 'terminal')
+        if source not in ('terminal', 'diagnostic'):
+            return {
+                'status': 'error',
+                'error': f"Invalid source: {source!r} (use 'terminal' or 'diagnostic')"
+            }
+        try:
+            limit = clamp_page_size(event.get('limit'), 5)
+        except ValueError as e:
+            return {'status': 'error', 'error': str(e)}
+
+        if event.get('fingerprint'):
+            result = self.vidurai_manager.errors.lookup(fp=str(event['fingerprint']), limit=limit)
+        elif event.get('error'):
+            signature = self.event_processor.error_signature(str(event['error']), source)
+            result = self.vidurai_manager.errors.lookup(signature, limit=limit)
+        else:
+            return {'status': 'error', 'error': "Provide 'error' text or a 'fingerprint'"}
+
+        return {
+            'status': 'ok',
+            'failure': result
+        }
+
+    # v2.0: New database query handlers
+    def _handle_get_activity_histogram(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Activity timeline from precomputed hourly/daily rollups"""
+        try:
+            histogram = self.vidurai_manager.rollups.histogram(
+                event.get('project_path'),
+                granularity=event.get('granularity', 'hour'),
+                buckets=event.get('buckets', 24)
+            )
+        except (TypeError, ValueError) as e:
+            return {'status': 'error', 'error': str(e)}
+
+        return {
+            'status': 'ok',
+            'histogram': histogram
+        }
+
+    def _handle_get_recent_activity(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Get recent memories for a project (v2.0)"""
+        try:
+            project_path = event['project_path']
+            hours = event.get('hours', 24)
+            limit = clamp_page_size(event.get('limit'), 20)
+            fields = validate_fields(event.get('fields'), DB_MEMORY_FIELDS)
+
+            if 'cursor' in event:
+                memories, next_cursor = self.vidurai_manager.query_database_page(
+                    project_path=project_path,
+                    hours=hours,
+                    limit=limit,
+                    cursor=event['cursor'],
+                    fields=fields,
+                    deadline=self._deadline
+                )
+                return self._encode_memories(event, {
+                    'status': 'ok',
+                    'memories': memories,
+                    'count': len(memories),
+                    'next_cursor': next_cursor
+                })
+
+            memories = self.vidurai_manager.get_recent_activity(
+                project_path=project_path,
+                hours=hours,
+                limit=limit,
+                deadline=self._deadline
+            )
+            memories = [project(mem, fields) for mem in memories]
+
+            return self._encode_memories(event, {
+                'status': 'ok',
+                'memories': memories,
+                'count': len(memories)
+            })
+
+        except ValueError as e:
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.exception("Error getting recent activity: %s", e)
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+
+    def _handle_recall_memories(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Recall memories from database (v2.0)"""
+        try:
+            project_path = event['project_path']
+            query = event.get('query')
+            min_salience = event.get('min_salience', 'MEDIUM')
+            limit = clamp_page_size(event.get('limit'), 10)
+            fields = validate_fields(event.get('fields'), DB_MEMORY_FIELDS)
+
+            if 'cursor' in event:
+                memories, next_cursor = self.vidurai_manager.query_database_page(
+                    project_path=project_path,
+                    min_salience=min_salience,
+                    hours=None,
+                    query=query,
+                    limit=limit,
+                    cursor=event['cursor'],
+                    fields=fields,
+                    deadline=self._deadline
+                )
+                return self._encode_memories(event, {
+                    'status': 'ok',
+                    'memories': memories,
+                    'count': len(memories),
+                    'next_cursor': next_cursor
+                })
+
+            memories = self.vidurai_manager.recall_from_database(
+                project_path=project_path,
+                query=query,
+                min_salience=min_salience,
+                limit=limit,
+                deadline=self._deadline
+            )
+            memories = [project(mem, fields) for mem in memories]
+
+            return self._encode_memories(event, {
+                'status': 'ok',
+                'memories': memories,
+                'count': len(memories)
+            })
+
+        except ValueError as e:
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.exception("Error recalling memories: %s", e)
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+
+    def _handle_get_statistics(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Get database statistics for a project (v2.0)"""
+        try:
+            project_path = event['project_path']
+
+            stats = self.vidurai_manager.get_database_statistics(
+                project_path=project_path
+            )
+
+            return {
+                'status': 'ok',
+                'statistics': stats
+            }
+
+        except Exception as e:
+            logger.exception("Error getting statistics: %s", e)
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+
+    def _handle_get_context_for_ai(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Get formatted context for AI injection (v2.0 - Claude Code integration)"""
+        try:
+            project_path = event['project_path']
+            query = event.get('query')
+            max_tokens = event.get('max_tokens', 2000)
+
+            context = self.vidurai_manager.get_context_for_ai(
+                project_path=project_path,
+                query=query,
+                max_tokens=max_tokens,
+                deadline=self._deadline
+            )
+
+            return {
+                'status': 'ok',
+                'context': context
+            }
+
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            logger.exception("Error getting AI context: %s", e)
+            return {
+                'status': 'error',
+                'error': str(e),
+                'context': f'[Error: {str(e)}]'
+            }
+
+    def _send_progress(self, event: Dict[str, Any], progress: Dict[str, Any]):
+        """Send an interim progress message for a long-running request"""
+        if '_id' not in event:
+            return
+        self._reply({'status': 'progress', 'type': event['type'], '_id': event['_id'], **progress})
+
+    def _handle_export_memories(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Stream a project's memories to an NDJSON file"""
+        try:
+            summary = export_memories(
+                self.vidurai_manager,
+                event['project_path'],
+                Path(event['path']),
+                compress=event.get('compress'),
+                progress=lambda update: self._send_progress(event, update)
+            )
+            return {'status': 'ok', 'export': summary}
+
+        except (OSError, ValueError) as e:
+            logger.error("Export failed: %s", e)
+            return {'status': 'error', 'error': str(e)}
+
+    def _handle_import_memories(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Load memories from an NDJSON export"""
+        try:
+            summary = import_memories(
+                self.vidurai_manager,
+                event['project_path'],
+                Path(event['path']),
+                progress=lambda update: self._send_progress(event, update)
+            )
+            return {'status': 'ok', 'import': summary}
+
+        except (OSError, RuntimeError) as e:
+            logger.error("Import failed: %s", e)
+            return {'status': 'error', 'error': str(e)}
+
+    def _handle_profile_start(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Start sampling CPU/allocation profiles for chosen event types"""
+        try:
+            status = self.profiler.start(
+                event_types=event.get('event_types'),
+                sample_rate=event.get('sample_rate', 0.1),
+                mode=event.get('mode', 'cpu'),
+                top_n=event.get('top_n', 20)
+            )
+
+            return {
+                'status': 'ok',
+                'profile': status
+            }
+
+        except ValueError as e:
+            return {
+                'status': 'error',
+                'error': str(e)
+            }
+
+    def _handle_profile_stop(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Stop profiling, write files under ~/.vidurai/profiles, return top-N"""
+        if not self.profiler.active:
+            return {
+                'status': 'error',
+                'error': 'Profiling is not active'
+            }
+
+        summary = self.profiler.stop(top_n=event.get('top_n'))
+
+        return {
+            'status': 'ok',
+            'profile': summary
+        }
+
+    # =========================================================================
+    # IN-PROCESS API
+    # =========================================================================
+
+    def submit(self, event: Dict[str, Any],
+               progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """Process one event dict on the calling thread and return its response"""
+        return self.submit_many([event], progress)[0]
+
+    def submit_many(self, events: Iterable[Dict[str, Any]],
+                    progress: Optional[Callable[[Dict[str, Any]], None]] = None
+                    ) -> List[Dict[str, Any]]:
+        """
+        Process a batch of event dicts in order on the calling thread.
+
+        No JSON, queue or threads are involved; per-request bookkeeping
+        (snapshot checkpoint, maintenance idle timer) runs once per batch.
+        `progress` receives interim messages from export/import.
+        """
+        received_at = time.time()
+        responses = []
+        try:
+            for event in events:
+                with self._lock:
+                    try:
+                        responses.append(self._process(event, received_at, progress or _discard))
+                    except Exception as e:
+                        logger.exception("Unexpected error processing submitted event")
+                        self.metrics.in_flight = 0
+                        responses.append({'status': 'error', 'error': str(e)})
+        finally:
+            self._after_reply()
+        return responses
+
+    def maintain(self, preempt: Callable[[], bool] = lambda: False) -> bool:
+        """Run one slice of idle maintenance (for embedders without serve_inbox)"""
+        with self._lock:
+            return self.maintenance.run_slice(preempt)
+
+    def shutdown(self):
+        """Persist the session, scan cache, snapshot and any active profile"""
+        with self._lock:
+            self.vidurai_manager.save_session()
+            self.event_processor.secret_scanner.save()
+            self.snapshots.write()
+            self._finish_profiling()
+
+    # =========================================================================
+    # PIPELINE
+    # =========================================================================
+
+    def _process(self, event: Any, received_at: float,
+                 reply: Callable[[Dict[str, Any]], None]) -> Dict[str, Any]:
+        """Validate, check the deadline, process and time one parsed event"""
+        if not isinstance(event, dict):
+            return {'status': 'error', 'error': 'Invalid event format'}
+
+        deadline = Deadline.from_event(event)
+        started_at = time.time()
+        self.metrics.begin()
+
+        if not self._validate_event(event):
+            response = {
+                'status': 'error',
+                'error': 'Invalid event format'
+            }
+        elif deadline.expired():
+            # The client gave up while this waited in the queue
+            self.metrics.deadline_missed('queued')
+            response = {
+                'status': 'deadline_exceeded',
+                'error': 'Deadline exceeded before processing'
+            }
+        else:
+            # Process event (sampled by the profiler if enabled)
+            self._reply = reply
+            self._deadline = deadline
+            with self.profiler.profile(event.get('type')):
+                response = self.process_event(event)
+
+        self.metrics.record(
+            event.get('type'),
+            event.get('_timestamp'),
+            received_at,
+            started_at,
+            time.time(),
+            ok=response.get('status') == 'ok'
+        )
+
+        # Preserve request ID in response for callback matching
+        if '_id' in event:
+            response['_id'] = event['_id']
+        return response
+
+    def _after_reply(self):
+        """Per-request bookkeeping, run once the response is sent"""
+        # Written by idle maintenance, never on the request path
+        self.snapshots.mark_dirty()
+        self.maintenance.note_activity()
+
+    # =========================================================================
+    # TRANSPORT LOOP
+    # =========================================================================
+
+    def submit_line(self, line: str, reply: Callable[[Dict[str, Any]], None]):
+        """Queue a raw request line; its response is passed to `reply`"""
+        self._inbox.put((line, time.time(), reply))
+
+    def close_inbox(self):
+        """Stop serve_inbox() once queued lines are processed"""
+        self._inbox.put(None)
+
+    def _with_load(self, response: Dict[str, Any]) -> Dict[str, Any]:
+        """Attach the flow-control hint clients use to pace their sends"""
+        response['_load'] = self.metrics.load_hint(self._inbox.qsize())
+        return response
+
+    def _next_item(self):
+        """Next inbox item, running maintenance slices while the inbox stays empty"""
+        while True:
+            try:
+                return self._inbox.get(timeout=self.maintenance.wait_timeout())
+            except queue.Empty:
+                with self._lock:
+                    self.maintenance.run_slice(preempt=lambda: not self._inbox.empty())
+
+    def serve_inbox(self):
+        """Process queued lines in arrival order until the inbox is closed"""
+        try:
+            while self.running:
+                item = self._next_item()
+
+                if item is None:
+                    # EOF reached, exit gracefully
+                    logger.info("EOF received, shutting down")
+                    break
+
+                line, received_at, reply = item
+
+                try:
+                    # Parse JSON
+                    event = json.loads(line.strip())
+                    with self._lock:
+                        response = self._process(event, received_at, reply)
+
+                    # Send response
+                    reply(self._with_load(response))
+                    self._after_reply()
+
+                except json.JSONDecodeError as e:
+                    logger.error("Invalid JSON: %s", e)
+                    error_response = {
+                        'status': 'error',
+                        'error': f'Invalid JSON: {str(e)}'
+                    }
+                    # Try to preserve _id if event was parsed
+                    try:
+                        partial_event = json.loads(line.strip())
+                        if '_id' in partial_event:
+                            error_response['_id'] = partial_event['_id']
+                    except:
+                        pass
+                    reply(self._with_load(error_response))
+
+                except Exception as e:
+                    logger.exception("Unexpected error in main loop")
+                    self.metrics.in_flight = 0
+                    error_response = {
+                        'status': 'error',
+                        'error': str(e)
+                    }
+                    # Try to preserve _id from event if available
+                    try:
+                        if 'event' in locals() and '_id' in event:
+                            error_response['_id'] = event['_id']
+                    except:
+                        pass
+                    reply(self._with_load(error_response))
+
+        except KeyboardInterrupt:
+            logger.info("Keyboard interrupt received")
+
+        finally:
+            self.shutdown()
+            logger.info("Bridge stopped")
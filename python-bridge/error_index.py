@@ -0,0 +1,324 @@
+"""
+Error Index
+Stable fingerprints for failures, with their occurrences and the edits that followed
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+from pathlib import Path
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from peers import PeerFiles
+
+logger = logging.getLogger('vidurai-bridge')
+
+ERRORS_FILE = Path.home() / ".vidurai" / "errors.json"
+ERRORS_VERSION = 1
+
+# Fingerprints kept (least recently seen are dropped first)
+MAX_ERRORS = 5000
+
+# Per fingerprint: occurrences and candidate fixes kept
+MAX_OCCURRENCES = 20
+MAX_FIXES = 30
+
+# Edits within this long after a failure (up to MAX_FOLLOWING per failure) are
+# candidate fixes; a later success of the same command confirms them
+FIX_WINDOW_S = 1800
+MAX_FOLLOWING = 10
+MAX_OPEN = 50
+
+# Repeats from the same place within this window are one occurrence
+# (diagnostics are re-sent on every change to a file)
+REPEAT_S = 60
+
+# Lines of error text making up a signature
+MAX_ERROR_LINES = 3
+
+# Terminal output scanned for error lines (errors are usually at the end)
+TAIL_CHARS = 64 * 1024
+
+# Matched against lowercased text (much faster than re.IGNORECASE for alternations)
+ERROR_LINE_RE = re.compile(
+    r'error|exception|traceback|failed|failure|fatal|panic|cannot|could not|not found|denied'
+)
+
+# Variable parts of error text, replaced in this order
+NORMALIZERS = [
+    (re.compile(r'\x1b\[[0-9;?]*[A-Za-z]'), ''),
+    (re.compile(
+        r'\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:[.,]\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?'
+    ), '<ts>'),
+    (re.compile(r'\b\d{1,2}:\d{2}:\d{2}(?:[.,]\d+)?\b'), '<ts>'),
+    (re.compile(
+        r'\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b'
+    ), '<uuid>'),
+    (re.compile(r'\b0x[0-9a-fA-F]+\b'), '<addr>'),
+    (re.compile(r'(?:[A-Za-z]:)?(?:[\w.~@+-]*[/\\])+[\w.@+-]+'), '<path>'),
+    (re.compile(r'\b\d+(?:\.\d+)*\b'), '<n>'),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def extract_error_lines(output: str, max_lines: int = MAX_ERROR_LINES) -> str:
+    """The last few lines of output that look like errors (else its last lines)"""
+    tail = output[-TAIL_CHARS:]
+    lowered = tail.lower()
+    any_errors = ERROR_LINE_RE.search(lowered) is not None
+
+    # Walk back from the end, stopping as soon as enough lines are found
+    lines: List[str] = []
+    end = len(tail)
+    while end > 0 and len(lines) < max_lines:
+        start = tail.rfind('\n', 0, end) + 1
+        line = tail[start:end].strip()
+        if line and (not any_errors or ERROR_LINE_RE.search(lowered, start, end)):
+            lines.append(line)
+        end = start - 1
+    return '\n'.join(reversed(lines))
+
+
+def normalize_error(text: str) -> str:
+    """Error text with paths, line numbers, addresses and timestamps stripped"""
+    for pattern, replacement in NORMALIZERS:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+
+def fingerprint(signature: str) -> str:
+    return hashlib.blake2b(signature.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(ts).isoformat() if ts else None
+
+
+class ErrorIndex:
+    """
+    Fingerprint -> occurrences and likely fixes, for "seen this before?" lookups.
+
+    A failure opens a short window in which later file edits are recorded
+    as candidate fixes. When the same command later succeeds, those edits
+    are marked confirmed. Lookups are a dict access per file: with
+    `peer_pattern`, each bridge saves only its own file and lookups add in
+    the other files matching it.
+    """
+
+    def __init__(self, path: Optional[Path] = ERRORS_FILE, peer_pattern: Optional[str] = None):
+        self.path = Path(path) if path else None
+        # Least recently seen first
+        self._errors: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._open: Dict[str, Dict[str, Any]] = {}  # Failures still collecting following edits
+        self.updated = 0.0  # Time of the newest change, to pick the fresher of file and snapshot
+        self.peers = (
+            PeerFiles(self.path, peer_pattern, ErrorIndex.load)
+            if self.path and peer_pattern else None
+        )
+
+    def __len__(self) -> int:
+        return len(self._errors)
+
+    def record(self, signature: str, source: str, memory_id: Optional[str] = None,
+               project_path: Optional[str] = None, file_path: Optional[str] = None,
+               command: Optional[str] = None, ts: Optional[float] = None) -> Dict[str, Any]:
+        """Count one failure; returns its fingerprint and how often it was seen before"""
+        ts = time.time() if ts is None else ts
+        self.updated = max(self.updated, ts)
+        fp = fingerprint(signature)
+
+        entry = self._errors.get(fp)
+        if entry is None:
+            entry = self._errors[fp] = {
+                'signature': signature,
+                'source': source,
+                'count': 0,
+                'first_seen': ts,
+                'last_seen': ts,
+                'occurrences': [],
+                'fixes': []
+            }
+            if len(self._errors) > MAX_ERRORS:
+                dropped, _ = self._errors.popitem(last=False)
+                self._open.pop(dropped, None)
+        else:
+            self._errors.move_to_end(fp)
+        seen_before = entry['count'] + sum(
+            peer._errors[fp]['count'] for peer in self._peer_states() if fp in peer._errors
+        )
+
+        occurrences = entry['occurrences']
+        last = occurrences[-1] if occurrences else None
+        if (last and ts - last['ts'] < REPEAT_S and last.get('file') == file_path
+                and last.get('command') == command):
+            last['ts'] = ts
+        else:
+            entry['count'] += 1
+            occurrences.append({
+                'ts': ts,
+                'source': source,
+                'memory_id': memory_id,
+                'project_path': project_path,
+                'file': file_path,
+                'command': command
+            })
+            del occurrences[:-MAX_OCCURRENCES]
+        entry['last_seen'] = ts
+
+        if fp not in self._open:
+            if len(self._open) >= MAX_OPEN:
+                self._close(min(self._open, key=lambda k: self._open[k]['opened']), confirmed=False)
+            self._open[fp] = {
+                'opened': ts, 'project_path': project_path, 'command': command, 'edits': []
+            }
+        else:
+            self._open[fp]['opened'] = ts
+
+        return {'fingerprint': fp, 'seen_before': seen_before}
+
+    def record_edit(self, file_path: str, memory_id: Optional[str] = None,
+                    project_path: Optional[str] = None, ts: Optional[float] = None):
+        """Attach an edit to recent failures in the same project"""
+        if not self._open:
+            return
+        ts = time.time() if ts is None else ts
+        self.updated = max(self.updated, ts)
+        expired = [
+            fp for fp, failure in self._open.items() if ts - failure['opened'] > FIX_WINDOW_S
+        ]
+        for fp in expired:
+            self._close(fp, confirmed=False)
+
+        for failure in self._open.values():
+            if project_path and failure['project_path'] and failure['project_path'] != project_path:
+                continue
+            edits = failure['edits']
+            for edit in edits:
+                if edit['file'] == file_path:
+                    edit['ts'] = ts
+                    edit['memory_id'] = memory_id
+                    break
+            else:
+                if len(edits) < MAX_FOLLOWING:
+                    edits.append({'file': file_path, 'ts': ts, 'memory_id': memory_id})
+
+    def record_success(self, command: str):
+        """A command succeeded: edits since it last failed are confirmed fixes"""
+        self.updated = max(self.updated, time.time())
+        for fp in [fp for fp, failure in self._open.items() if failure['command'] == command]:
+            self._close(fp, confirmed=True)
+
+    def _close(self, fp: str, confirmed: bool):
+        failure = self._open.pop(fp)
+        entry = self._errors.get(fp)
+        if entry is None:
+            return
+        for edit in failure['edits']:
+            entry['fixes'].append(dict(edit, confirmed=confirmed))
+        del entry['fixes'][:-MAX_FIXES]
+
+    def lookup(self, signature: Optional[str] = None, fp: Optional[str] = None,
+               limit: int = 5) -> Dict[str, Any]:
+        """Prior occurrences (newest first) and likely fixing edits for a failure"""
+        if fp is None:
+            fp = fingerprint(signature or '')
+        entries = [
+            source._errors[fp] for source in [self] + self._peer_states() if fp in source._errors
+        ]
+        if not entries:
+            return {
+                'fingerprint': fp, 'seen': False, 'count': 0, 'occurrences': [], 'likely_fixes': []
+            }
+
+        # Edits grouped by file: confirmed fixes first, then the most often edited
+        failure = self._open.get(fp)
+        pending = [dict(edit, confirmed=False) for edit in failure['edits']] if failure else []
+        by_file: Dict[str, Dict[str, Any]] = {}
+        for edit in [fix for entry in entries for fix in entry['fixes']] + pending:
+            fix = by_file.setdefault(edit['file'], {
+                'file': edit['file'], 'edits': 0, 'confirmed': 0, 'last_edit': 0, 'memory_ids': []
+            })
+            fix['edits'] += 1
+            fix['confirmed'] += edit['confirmed']
+            fix['last_edit'] = max(fix['last_edit'], edit['ts'])
+            if edit.get('memory_id') and edit['memory_id'] not in fix['memory_ids']:
+                fix['memory_ids'].append(edit['memory_id'])
+        fixes = sorted(
+            by_file.values(), key=lambda f: (-f['confirmed'], -f['edits'], -f['last_edit'])
+        )
+        for fix in fixes:
+            fix['last_edit'] = _iso(fix['last_edit'])
+
+        occurrences = sorted(
+            (occurrence for entry in entries for occurrence in entry['occurrences']),
+            key=lambda occurrence: occurrence['ts'], reverse=True
+        )
+        return {
+            'fingerprint': fp,
+            'seen': True,
+            'signature': entries[0]['signature'],
+            'source': entries[0]['source'],
+            'count': sum(entry['count'] for entry in entries),
+            'first_seen': _iso(min(entry['first_seen'] for entry in entries)),
+            'last_seen': _iso(max(entry['last_seen'] for entry in entries)),
+            'occurrences': [
+                dict(occurrence, ts=_iso(occurrence['ts'])) for occurrence in occurrences[:limit]
+            ],
+            'likely_fixes': fixes[:limit]
+        }
+
+    def _peer_states(self) -> List['ErrorIndex']:
+        return self.peers.states() if self.peers else []
+
+    def snapshot_state(self) -> Dict[str, Any]:
+        return {'errors': self._errors, 'open': self._open, 'updated': self.updated}
+
+    def restore_state(self, state: Dict[str, Any]):
+        # The saved file may be newer than the snapshot
+        if state['updated'] >= self.updated:
+            self._errors = state['errors']
+            self._open = state['open']
+            self.updated = state['updated']
+
+    def save(self):
+        """Write the index atomically"""
+        if self.path is None:
+            return
+        data = {
+            'version': ERRORS_VERSION,
+            'updated': self.updated,
+            'errors': list(self._errors.items()),
+            'open': self._open
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + '.tmp')
+            tmp.write_text(json.dumps(data), encoding='utf-8')
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.error("Error saving error index: %s", e)
+
+    @classmethod
+    def load(cls, path: Path = ERRORS_FILE, peer_pattern: Optional[str] = None) -> 'ErrorIndex':
+        """Load a saved index, or start empty if missing or unreadable"""
+        index = cls(path, peer_pattern)
+        try:
+            data = json.loads(Path(path).read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return index
+        except (OSError, ValueError) as e:
+            logger.warning("Could not load error index: %s", e)
+            return index
+
+        if data.get('version') != ERRORS_VERSION:
+            return index
+        index.updated = data.get('updated', 0.0)
+        index._errors = OrderedDict((fp, entry) for fp, entry in data.get('errors', []))
+        index._open = {
+            fp: failure for fp, failure in data.get('open', {}).items() if fp in index._errors
+        }
+        return index
@@ -4,11 +4,13 @@ Handles salience classification, secrets detection, and gist extraction
 """
 import re
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 from pathlib import Path
 
 from vidurai.core.data_structures_v3 import SalienceLevel
 from gist_extractor import GistExtractor
+from secret_scan import SecretScanner
+from error_index import MAX_ERROR_LINES, extract_error_lines, normalize_error
 
 logger = logging.getLogger('vidurai-bridge')
 
@@ -64,8 +66,10 @@ IGNORED_FILES = [
 class EventProcessor:
     """Process VS Code events with salience classification and secrets detection"""
 
-    def __init__(self):
+    def __init__(self, scan_cache_path: Optional[Path] = None):
         self.gist_extractor = GistExtractor()
+        # Incremental scanner for file contents (cache persisted if a path is given)
+        self.secret_scanner = SecretScanner(SECRET_PATTERNS, scan_cache_path)
 
     def _contains_secrets(self, content: str) -> bool:
         """Check if content contains secrets"""
@@ -81,6 +85,16 @@ class EventProcessor:
             sanitized = re.sub(pattern, '[REDACTED]', sanitized, flags=re.IGNORECASE)
         return sanitized
 
+    def error_signature(self, error_text: str, source: str = 'terminal') -> Optional[str]:
+        """Normalized, secret-free error text as keyed in the error index"""
+        if source == 'diagnostic':
+            error_text = '\n'.join(error_text.strip().splitlines()[:MAX_ERROR_LINES])
+        else:
+            error_text = extract_error_lines(error_text)
+        if self._contains_secrets(error_text):
+            error_text = self._sanitize_content(error_text)
+        return normalize_error(error_text) or None
+
     def _should_ignore_file(self, file_path: str) -> bool:
         """Check if file should be ignored"""
         file_name = Path(file_path).name
@@ -99,14 +113,18 @@ class EventProcessor:
 
         return False
 
-    def _classify_file_edit(self, file_path: str, content: str) -> SalienceLevel:
-        """Classify salience of file edit"""
+    def _classify_file_edit(self, file_path: str, content: str,
+                            contains_secrets: Optional[bool] = None) -> SalienceLevel:
+        """Classify salience of file edit (pass contains_secrets if already scanned)"""
         file_lower = file_path.lower()
         file_name = Path(file_path).name.lower()
 
+        if contains_secrets is None:
+            contains_secrets = self._contains_secrets(content)
+
         # CRITICAL: Contains secrets (should be ignored, but if not caught)
-        if self._contains_secrets(content):
-            logger.warning(f"Secrets detected in {file_path}")
+        if contains_secrets:
+            logger.warning("Secrets detected in %s", file_path)
             return SalienceLevel.CRITICAL
 
         # HIGH: Test files (important for debugging)
@@ -146,6 +164,28 @@ class EventProcessor:
         # MEDIUM: Successful commands
         return SalienceLevel.MEDIUM
 
+    def _classify_commit(self, subject: str, files: List[str]) -> SalienceLevel:
+        """Classify salience of a git commit"""
+        subject_lower = subject.lower()
+
+        # HIGH: Bug fixes and reverts (important to remember)
+        if subject_lower.startswith(('fix', 'hotfix', 'revert')) or 'bug' in subject_lower:
+            return SalienceLevel.HIGH
+
+        # HIGH: Test or config changes
+        for file_path in files:
+            file_name = Path(file_path).name.lower()
+            if 'test' in file_path.lower() or \
+                    file_name.endswith(('.json', '.yaml', '.yml', '.toml')):
+                return SalienceLevel.HIGH
+
+        # LOW: Documentation-only commits
+        if files and all(f.lower().endswith(('.md', '.txt', '.rst')) for f in files):
+            return SalienceLevel.LOW
+
+        # MEDIUM: Normal commits
+        return SalienceLevel.MEDIUM
+
     def _classify_diagnostic(self, severity: str) -> SalienceLevel:
         """Classify salience of diagnostic"""
         # CRITICAL: Errors
@@ -163,20 +203,20 @@ class EventProcessor:
         """Process file edit event"""
         # Check if file should be ignored
         if self._should_ignore_file(file_path):
-            logger.info(f"Ignoring file: {file_path}")
+            logger.debug("Ignoring file: %s", file_path)
             return {
                 'salience': SalienceLevel.NOISE,
                 'gist': f"Ignored file: {file_path}",
                 'contains_secrets': True
             }
 
-        # Check for secrets
-        contains_secrets = self._contains_secrets(content)
+        # Check for secrets (only chunks changed since the last scan are rescanned)
+        contains_secrets = self.secret_scanner.contains_secrets(content)
         if contains_secrets:
             content = self._sanitize_content(content)
 
         # Classify salience
-        salience = self._classify_file_edit(file_path, content)
+        salience = self._classify_file_edit(file_path, content, contains_secrets)
 
         # Extract gist
         gist = self.gist_extractor.extract_file_edit_gist(file_path, content)
@@ -196,9 +236,18 @@ class EventProcessor:
         # Extract gist
         gist = self.gist_extractor.extract_terminal_gist(command, exit_code)
 
+        # Failures: the error lines (or, with no output, the command) for the error index
+        error_signature = None
+        if exit_code != 0:
+            error_signature = (
+                self.error_signature(output)
+                or self.error_signature(f"{command} exited with code {exit_code}")
+            )
+
         return {
             'salience': salience,
-            'gist': gist
+            'gist': gist,
+            'error_signature': error_signature
         }
 
     def process_diagnostic(self, file_path: str, severity: str,
@@ -212,7 +261,31 @@ class EventProcessor:
             file_path, severity, message
         )
 
+        error_signature = None
+        if severity == 'error':
+            error_signature = self.error_signature(message, 'diagnostic')
+
+        return {
+            'salience': salience,
+            'gist': gist,
+            'error_signature': error_signature
+        }
+
+    def process_git_commit(self, subject: str, files: List[str]) -> Dict[str, Any]:
+        """Process git commit event"""
+        # Commit messages occasionally contain pasted credentials
+        contains_secrets = self._contains_secrets(subject)
+        if contains_secrets:
+            subject = self._sanitize_content(subject)
+
+        # Classify salience
+        salience = self._classify_commit(subject, files)
+
+        # Extract gist
+        gist = self.gist_extractor.extract_commit_gist(subject, files)
+
         return {
             'salience': salience,
-            'gist': gist
+            'gist': gist,
+            'contains_secrets': contains_secrets
         }
@@ -3,6 +3,7 @@ Gist Extractor
 Rule-based semantic gist extraction (no LLM needed for v1.0)
 """
 from pathlib import Path
+from typing import List
 
 
 class GistExtractor:
@@ -50,6 +51,18 @@ class GistExtractor:
         else:
             return f"Ran command: {command}"
 
+    def extract_commit_gist(self, subject: str, files: List[str]) -> str:
+        """Extract gist from a git commit"""
+        # Truncate long subjects
+        if len(subject) > 100:
+            subject = subject[:97] + "..."
+
+        if not files:
+            return f"Committed: {subject}"
+        if len(files) == 1:
+            return f"Committed {Path(files[0]).name}: {subject}"
+        return f"Committed {len(files)} files: {subject}"
+
     def extract_diagnostic_gist(self, file_path: str, severity: str,
                                  message: str) -> str:
         """Extract gist from diagnostic"""
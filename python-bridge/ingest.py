@@ -0,0 +1,396 @@
+"""
+Bulk Ingest
+Seeds Vidurai memory from shell history and git log, offline and in batches
+
+Usage:
+    python bridge.py ingest --bash-history ~/.bash_history --git-log . --project .
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import logging
+import subprocess
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional
+
+from timeutil import sql_timestamp
+
+logger = logging.getLogger('vidurai-bridge')
+
+CHECKPOINT_FILE = Path.home() / ".vidurai" / "ingest" / "checkpoint.json"
+
+DEFAULT_BATCH_SIZE = 5000
+
+# zsh extended history: ": <start>:<elapsed>;<command>"
+ZSH_EXTENDED_RE = re.compile(r'^: (\d+):\d+;(.*)$', re.DOTALL)
+
+# git log record/field separators (ASCII RS / US never appear in subjects)
+GIT_RECORD_SEP = '\x1e'
+GIT_FIELD_SEP = '\x1f'
+
+
+# =============================================================================
+# SOURCES (streaming, resumable by byte offset or commit hash)
+# =============================================================================
+
+def iter_bash_history(path: Path, start_offset: int = 0) -> Iterator[Dict[str, Any]]:
+    """
+    Stream commands from a bash history file.
+
+    Supports HISTTIMEFORMAT "#<epoch>" lines. Each record carries the byte
+    offset just past it, which is what the checkpoint stores.
+    """
+    timestamp = None
+    with open(path, 'rb') as f:
+        f.seek(start_offset)
+        offset = start_offset
+        for raw in f:
+            offset += len(raw)
+            line = raw.decode('utf-8', errors='replace').rstrip('\n')
+
+            if line.startswith('#') and line[1:].isdigit():
+                timestamp = int(line[1:])
+                continue
+
+            command = line.strip()
+            if command:
+                yield {
+                    'kind': 'terminal',
+                    'command': command,
+                    'timestamp': timestamp,
+                    'offset': offset
+                }
+            timestamp = None
+
+
+def iter_zsh_history(path: Path, start_offset: int = 0) -> Iterator[Dict[str, Any]]:
+    """Stream commands from a zsh history file (plain or extended format)"""
+    with open(path, 'rb') as f:
+        f.seek(start_offset)
+        offset = start_offset
+        pending = ''
+        for raw in f:
+            offset += len(raw)
+            line = raw.decode('utf-8', errors='replace').rstrip('\n')
+
+            # Multi-line commands end each continued line with a backslash
+            if line.endswith('\\'):
+                pending += line[:-1] + '\n'
+                continue
+            entry = pending + line
+            pending = ''
+
+            timestamp = None
+            match = ZSH_EXTENDED_RE.match(entry)
+            if match:
+                timestamp = int(match.group(1))
+                entry = match.group(2)
+
+            command = entry.strip()
+            if command:
+                yield {
+                    'kind': 'terminal',
+                    'command': command,
+                    'timestamp': timestamp,
+                    'offset': offset
+                }
+
+
+def iter_git_log(repo: Path, since_commit: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Stream commits oldest first, optionally only those after since_commit"""
+    cmd = [
+        'git', '-C', str(repo), 'log', '--reverse', '--no-merges', '--name-only',
+        f'--pretty=format:{GIT_RECORD_SEP}%H{GIT_FIELD_SEP}%at{GIT_FIELD_SEP}%s'
+    ]
+    if since_commit:
+        cmd.append(f'{since_commit}..HEAD')
+
+    proc = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        encoding='utf-8',
+        errors='replace'
+    )
+
+    def build(header: str, files: List[str]) -> Dict[str, Any]:
+        commit, timestamp, subject = header.split(GIT_FIELD_SEP, 2)
+        return {
+            'kind': 'git_commit',
+            'commit': commit,
+            'subject': subject,
+            'files': files,
+            'timestamp': int(timestamp),
+            'offset': commit
+        }
+
+    header = None
+    files: List[str] = []
+    try:
+        for line in proc.stdout:
+            line = line.rstrip('\n')
+            if line.startswith(GIT_RECORD_SEP):
+                if header:
+                    yield build(header, files)
+                header, files = line[1:], []
+            elif line:
+                files.append(line)
+        if header:
+            yield build(header, files)
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+
+# =============================================================================
+# CLASSIFICATION (runs in worker processes)
+# =============================================================================
+
+_processor = None
+
+
+def _init_worker():
+    """Create one EventProcessor per worker process"""
+    global _processor
+    from event_processor import EventProcessor
+    _processor = EventProcessor()
+
+
+def classify_batch(records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Run a batch through the EventProcessor pipeline"""
+    if _processor is None:
+        _init_worker()
+
+    classified = []
+    for record in records:
+        if record['kind'] == 'terminal':
+            command = record['command']
+            # History files often hold exported keys; never store them
+            if _processor._contains_secrets(command):
+                command = _processor._sanitize_content(command)
+
+            # Shell history does not record exit codes
+            processed = _processor.process_terminal_output(command, '', 0)
+            verbatim = command
+            event_type = 'terminal'
+            file_path = None
+        else:
+            processed = _processor.process_git_commit(record['subject'], record['files'])
+            verbatim = record['subject'] + '\n' + '\n'.join(record['files'])
+            if processed['contains_secrets']:
+                verbatim = _processor._sanitize_content(verbatim)
+            event_type = 'git_commit'
+            file_path = record['files'][0] if len(record['files']) == 1 else None
+
+        classified.append({
+            'verbatim': verbatim,
+            'gist': processed['gist'],
+            'salience': processed['salience'].name,
+            'event_type': event_type,
+            'file_path': file_path,
+            'created_at': sql_timestamp(record['timestamp'])
+        })
+
+    return classified
+
+
+# =============================================================================
+# CHECKPOINTS
+# =============================================================================
+
+def load_checkpoint(path: Path) -> Dict[str, Any]:
+    """Load per-source resume positions"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def save_checkpoint(path: Path, checkpoint: Dict[str, Any]):
+    """Atomically persist per-source resume positions"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, indent=2)
+    os.replace(tmp, path)
+
+
+# =============================================================================
+# PIPELINE
+# =============================================================================
+
+def _batched(records: Iterator[Dict[str, Any]], size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch: List[Dict[str, Any]] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Ingestor:
+    """
+    Stream sources through classification in parallel and write in bulk.
+
+    Batches are classified by a process pool (bounded to a few batches in
+    flight so memory stays flat) and written in source order, one
+    transaction per batch. The checkpoint advances only after a batch is
+    committed, so an interrupted run resumes without duplicates.
+    """
+
+    def __init__(self, manager=None, project_path: str = '.',
+                 batch_size: int = DEFAULT_BATCH_SIZE, workers: Optional[int] = None,
+                 checkpoint_path: Path = CHECKPOINT_FILE, resume: bool = True,
+                 dry_run: bool = False):
+        self.manager = manager
+        self.project_path = str(Path(project_path).resolve())
+        self.batch_size = batch_size
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint = load_checkpoint(checkpoint_path) if resume else {}
+        self.dry_run = dry_run
+        self.stats: Dict[str, Any] = {'read': 0, 'written': 0, 'by_salience': {}, 'sources': {}}
+
+    def _source_key(self, kind: str, path: Path) -> str:
+        return f"{kind}:{Path(path).resolve()}"
+
+    def _history_start(self, key: str, path: Path) -> int:
+        offset = self.checkpoint.get(key, 0)
+        # History was truncated or rotated since the last run: start over
+        if not isinstance(offset, int) or offset > path.stat().st_size:
+            return 0
+        return offset
+
+    def ingest_source(self, kind: str, path: Path) -> int:
+        """Ingest one source, returning the number of records written"""
+        key = self._source_key(kind, path)
+
+        if kind == 'bash':
+            records = iter_bash_history(path, self._history_start(key, path))
+        elif kind == 'zsh':
+            records = iter_zsh_history(path, self._history_start(key, path))
+        elif kind == 'git':
+            records = iter_git_log(path, self.checkpoint.get(key))
+        else:
+            raise ValueError(f"Unknown source kind: {kind}")
+
+        written = self._run(key, records)
+        self.stats['sources'][key] = written
+        return written
+
+    def _run(self, key: str, records: Iterator[Dict[str, Any]]) -> int:
+        written = 0
+        batches = _batched(records, self.batch_size)
+
+        if self.workers <= 1:
+            for batch in batches:
+                written += self._commit(key, batch, classify_batch(batch))
+            return written
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker) as pool:
+            in_flight: deque = deque()
+            for batch in batches:
+                in_flight.append((batch, pool.submit(classify_batch, batch)))
+                # Bound memory: keep at most two batches per worker in flight
+                if len(in_flight) >= self.workers * 2:
+                    batch_done, future = in_flight.popleft()
+                    written += self._commit(key, batch_done, future.result())
+            while in_flight:
+                batch_done, future = in_flight.popleft()
+                written += self._commit(key, batch_done, future.result())
+
+        return written
+
+    def _commit(self, key: str, batch: List[Dict[str, Any]],
+                classified: List[Dict[str, Any]]) -> int:
+        self.stats['read'] += len(batch)
+        for record in classified:
+            by_salience = self.stats['by_salience']
+            by_salience[record['salience']] = by_salience.get(record['salience'], 0) + 1
+
+        if not self.dry_run:
+            self.manager.store_many(self.project_path, classified)
+            self.stats['written'] += len(classified)
+
+        self.checkpoint[key] = batch[-1]['offset']
+        if not self.dry_run:
+            save_checkpoint(self.checkpoint_path, self.checkpoint)
+        return len(classified)
+
+
+def _default_sources() -> List[tuple]:
+    home = Path.home()
+    sources = []
+    if (home / '.bash_history').exists():
+        sources.append(('bash', home / '.bash_history'))
+    if (home / '.zsh_history').exists():
+        sources.append(('zsh', home / '.zsh_history'))
+    return sources
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """CLI entry point for `python bridge.py ingest`"""
+    parser = argparse.ArgumentParser(
+        prog='bridge.py ingest',
+        description='Seed Vidurai memory from shell history and git log'
+    )
+    parser.add_argument('--bash-history', action='append', default=[], metavar='PATH')
+    parser.add_argument('--zsh-history', action='append', default=[], metavar='PATH')
+    parser.add_argument('--git-log', action='append', default=[], metavar='REPO')
+    parser.add_argument('--project', default='.', help='Project path memories belong to')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Classification processes (default: CPU count)')
+    parser.add_argument('--checkpoint', type=Path, default=CHECKPOINT_FILE)
+    parser.add_argument('--no-resume', action='store_true', help='Ignore the checkpoint')
+    parser.add_argument('--dry-run', action='store_true', help='Classify without writing')
+    args = parser.parse_args(argv)
+
+    sources = (
+        [('bash', Path(p).expanduser()) for p in args.bash_history]
+        + [('zsh', Path(p).expanduser()) for p in args.zsh_history]
+        + [('git', Path(p).expanduser()) for p in args.git_log]
+    ) or _default_sources()
+
+    if not sources:
+        logger.error("Nothing to ingest: no history files found and no sources given")
+        return 1
+
+    manager = None
+    if not args.dry_run:
+        from vidurai_manager import ViduraiManager
+        manager = ViduraiManager()
+        if not manager.db:
+            logger.error("Database not available, cannot ingest (use --dry-run to classify only)")
+            return 1
+
+    ingestor = Ingestor(
+        manager=manager,
+        project_path=args.project,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        checkpoint_path=args.checkpoint,
+        resume=not args.no_resume,
+        dry_run=args.dry_run
+    )
+
+    started = time.time()
+    for kind, path in sources:
+        if not path.exists():
+            logger.warning("Skipping missing source: %s", path)
+            continue
+        logger.info("Ingesting %s source: %s", kind, path)
+        ingestor.ingest_source(kind, path)
+
+    ingestor.stats['elapsed_s'] = round(time.time() - started, 2)
+    sys.stdout.write(json.dumps({'status': 'ok', 'ingest': ingestor.stats}) + '\n')
+    return 0
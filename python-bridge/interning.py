@@ -0,0 +1,158 @@
+"""
+String Interning
+Shared path/string table, compact metadata records and dictionary-encoded payloads
+"""
+from collections.abc import Mapping, MutableMapping
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
+
+# Cap on process-wide interned strings (past it, values are stored as given)
+MAX_INTERNED = 100000
+
+# Metadata values repeated across many memories
+INTERNED_KEYS = frozenset({
+    'type', 'file', 'command', 'severity', 'salience', 'language', 'project_path'
+})
+
+# Response keys whose string values are replaced by string table indexes
+ENCODED_KEYS = ('file', 'file_path', 'type', 'event_type', 'severity', 'salience')
+
+_UNSET = object()
+
+
+class StringTable:
+    """Canonical copies of repeated strings, each with a small integer id"""
+
+    def __init__(self, max_size: Optional[int] = None):
+        self.max_size = max_size
+        self._ids: Dict[str, int] = {}
+        self._strings: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def id_of(self, value: str) -> Optional[int]:
+        """Id for value, adding it if new (None once the table is full)"""
+        string_id = self._ids.get(value)
+        if string_id is None:
+            if self.max_size is not None and len(self._strings) >= self.max_size:
+                return None
+            string_id = self._ids[value] = len(self._strings)
+            self._strings.append(value)
+        return string_id
+
+    def intern(self, value: str) -> str:
+        """The table's copy of value, so equal strings share one object"""
+        string_id = self.id_of(value)
+        return value if string_id is None else self._strings[string_id]
+
+    def lookup(self, string_id: int) -> str:
+        return self._strings[string_id]
+
+    def strings(self) -> List[str]:
+        return list(self._strings)
+
+    def clear(self) -> int:
+        """
+        Forget every string, returning how many were held.
+
+        Values already interned keep working (records hold the strings,
+        not ids); only sharing with strings interned later is lost.
+        """
+        dropped = len(self._strings)
+        self._ids = {}
+        self._strings = []
+        return dropped
+
+
+# Process-wide table for memory metadata (file paths, event types, ...)
+STRINGS = StringTable(MAX_INTERNED)
+
+
+class MemoryMetadata(MutableMapping):
+    """
+    Memory metadata as a fixed-slot record instead of a per-memory dict.
+
+    Behaves like the dict the SDK expects. Common keys live in slots and
+    repeated strings are shared through STRINGS; any other key goes into
+    a small overflow dict created on first use.
+    """
+
+    FIELDS = ('type', 'file', 'command', 'severity', 'salience', 'exit_code',
+              'project_path', 'occurrence_count', 'last_seen')
+    __slots__ = FIELDS + ('_extra',)
+
+    def __init__(self, data: Optional[Mapping] = None):
+        self._extra: Optional[Dict[str, Any]] = None
+        if data:
+            for key, value in data.items():
+                self[key] = value
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELD_SET:
+            value = getattr(self, key, _UNSET)
+            if value is _UNSET:
+                raise KeyError(key)
+            return value
+        if self._extra is None:
+            raise KeyError(key)
+        return self._extra[key]
+
+    def __setitem__(self, key: str, value: Any):
+        if key in INTERNED_KEYS and isinstance(value, str):
+            value = STRINGS.intern(value)
+        if key in _FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str):
+        if key in _FIELD_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        elif self._extra is None:
+            raise KeyError(key)
+        else:
+            del self._extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for key in self.FIELDS:
+            if hasattr(self, key):
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"MemoryMetadata({dict(self)!r})"
+
+
+_FIELD_SET = frozenset(MemoryMetadata.FIELDS)
+
+
+def dictionary_encode(records: Sequence[Dict[str, Any]],
+                      keys: Sequence[str] = ENCODED_KEYS) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Replace string values under `keys` (including inside a nested
+    'metadata' mapping) with indexes into a string table sent once.
+    """
+    table = StringTable()
+    encoded_keys = frozenset(keys)
+
+    def encode(record: Mapping) -> Dict[str, Any]:
+        out = {}
+        for key, value in record.items():
+            if key in encoded_keys and isinstance(value, str):
+                out[key] = table.id_of(value)
+            elif key == 'metadata' and isinstance(value, Mapping):
+                out[key] = encode(value)
+            else:
+                out[key] = value
+        return out
+
+    return [encode(record) for record in records], table.strings()
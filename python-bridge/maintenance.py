@@ -0,0 +1,176 @@
+"""
+Idle Maintenance
+Cooperative scheduler running housekeeping in small slices while the bridge is idle
+"""
+import time
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Any, Iterable, Iterator, List, Optional
+
+from config import env_int
+
+logger = logging.getLogger('vidurai-bridge')
+
+# Seconds without events before maintenance starts
+DEFAULT_IDLE_AFTER_S = 3
+
+# Longest a slice runs before re-checking for new events
+SLICE_S = 0.02
+
+
+class MaintenanceTask:
+    """
+    A housekeeping job split into small steps.
+
+    `run` returns an iterable; each next() performs one bounded unit of
+    work, so the scheduler can pause between steps and resume later.
+    `pending` optionally reports how much work is waiting.
+    """
+
+    def __init__(self, name: str, run: Callable[[], Iterable[Any]], interval_s: float,
+                 pending: Optional[Callable[[], int]] = None):
+        self.name = name
+        self.run = run
+        self.interval_s = interval_s
+        self.pending = pending
+
+        self.next_due = 0.0  # First run at the first idle period
+        self.runs = 0
+        self.preemptions = 0
+        self.last_run: Optional[float] = None
+        self.last_duration_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+        self._steps: Optional[Iterator[Any]] = None  # Set while a run is in progress
+        self._active_s = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._steps is not None
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            pending = self.pending() if self.pending else None
+        except Exception as e:
+            pending = None
+            logger.debug("Could not count pending work for %s: %s", self.name, e)
+        last_run = datetime.fromtimestamp(self.last_run).isoformat() if self.last_run else None
+        return {
+            'interval_s': self.interval_s,
+            'state': 'paused' if self.running else 'idle',
+            'runs': self.runs,
+            'preemptions': self.preemptions,
+            'last_run': last_run,
+            'last_duration_ms': self.last_duration_ms,
+            'last_error': self.last_error,
+            'pending': pending
+        }
+
+
+class MaintenanceScheduler:
+    """
+    Run registered tasks while no events are arriving.
+
+    The bridge loop blocks on its inbox with wait_timeout(); when that
+    times out it calls run_slice(), which works for at most SLICE_S and
+    returns as soon as preempt() reports a new event. A paused task
+    resumes where it left off on the next idle slice.
+    """
+
+    def __init__(self, idle_after_s: Optional[float] = None, slice_s: float = SLICE_S):
+        self.idle_after_s = (
+            idle_after_s if idle_after_s is not None
+            else env_int('VIDURAI_MAINTENANCE_IDLE_S', DEFAULT_IDLE_AFTER_S)
+        )
+        self.slice_s = slice_s
+        self.tasks: List[MaintenanceTask] = []
+        self._last_activity = time.time()
+
+    @property
+    def enabled(self) -> bool:
+        return self.idle_after_s > 0 and bool(self.tasks)
+
+    def register(self, name: str, run: Callable[[], Iterable[Any]], interval_s: float,
+                 pending: Optional[Callable[[], int]] = None) -> MaintenanceTask:
+        task = MaintenanceTask(name, run, interval_s, pending)
+        self.tasks.append(task)
+        return task
+
+    def note_activity(self):
+        """Record that an event was handled (postpones maintenance)"""
+        self._last_activity = time.time()
+
+    def _next_task(self, now: float) -> Optional[MaintenanceTask]:
+        # Finish a paused run before starting anything else
+        for task in self.tasks:
+            if task.running:
+                return task
+        due = [t for t in self.tasks if t.next_due <= now]
+        return min(due, key=lambda t: t.next_due) if due else None
+
+    def wait_timeout(self, now: Optional[float] = None) -> Optional[float]:
+        """Seconds to block waiting for events before run_slice() has work (None = forever)"""
+        if not self.enabled:
+            return None
+        now = time.time() if now is None else now
+        earliest = min(now if t.running else t.next_due for t in self.tasks)
+        return max(0.0, max(self._last_activity + self.idle_after_s, earliest) - now)
+
+    def run_slice(self, preempt: Callable[[], bool] = lambda: False) -> bool:
+        """Run due tasks for up to one slice; False if there was nothing to do"""
+        if not self.enabled:
+            return False
+        started = time.time()
+        if started - self._last_activity < self.idle_after_s:
+            return False
+
+        worked = False
+        while time.time() - started < self.slice_s:
+            if preempt():
+                break
+            task = self._next_task(time.time())
+            if task is None:
+                break
+            worked = True
+            self._step(task, started, preempt)
+
+        # Pausing mid-run counts as a preemption
+        for task in self.tasks:
+            if task.running and preempt():
+                task.preemptions += 1
+        return worked
+
+    def _step(self, task: MaintenanceTask, slice_started: float,
+              preempt: Callable[[], bool]):
+        step_started = time.time()
+        try:
+            if task._steps is None:
+                task._steps = iter(task.run())
+                task._active_s = 0.0
+            # Steps of this task until it finishes, the slice is used up or an event arrives
+            while True:
+                next(task._steps)
+                if time.time() - slice_started >= self.slice_s or preempt():
+                    break
+            task._active_s += time.time() - step_started
+            return
+        except StopIteration:
+            task.last_error = None
+        except Exception as e:
+            logger.error("Maintenance task %s failed: %s", task.name, e)
+            task.last_error = str(e)
+
+        finished = time.time()
+        task._active_s += finished - step_started
+        task._steps = None
+        task.runs += 1
+        task.last_run = finished
+        task.last_duration_ms = round(task._active_s * 1000, 1)
+        task.next_due = finished + task.interval_s
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'idle_after_s': self.idle_after_s,
+            'tasks': {task.name: task.stats() for task in self.tasks}
+        }
@@ -0,0 +1,163 @@
+"""
+Memory Budget
+Caps bridge memory use by evicting the in-memory working set, then caches
+"""
+import os
+import gc
+import sys
+import logging
+from typing import Dict, Any, Callable, Optional
+
+from config import env_int
+
+logger = logging.getLogger('vidurai-bridge')
+
+# Optional: psutil gives accurate RSS on every platform
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+DEFAULT_RSS_BUDGET_MB = 512
+DEFAULT_MAX_MEMORIES = 20000
+
+# Evict down to this fraction of max_memories so we don't evict on every write
+LOW_WATER_RATIO = 0.9
+
+# Fraction of the working set evicted per check while RSS is over budget
+RSS_EVICT_STEP = 0.1
+
+# Never shrink the working set below this many entries because of RSS alone
+MIN_WORKING_SET = 500
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Resident set size of this process in bytes (None if unknown)"""
+    if PSUTIL_AVAILABLE:
+        try:
+            return psutil.Process().memory_info().rss
+        except Exception:
+            pass
+
+    # Linux: current RSS from /proc
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    # Fallback: peak RSS (kilobytes on Linux, bytes on macOS)
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+    except Exception:
+        return None
+
+
+class MemoryBudget:
+    """
+    Enforce an RSS budget and a working-set cap for the bridge process.
+
+    Eviction order:
+    1. Working-set memories, lowest salience and oldest first
+       (the manager archives them, so they stay recoverable)
+    2. Registered caches, in registration order
+
+    Budgets come from VIDURAI_BRIDGE_MEMORY_BUDGET_MB and
+    VIDURAI_BRIDGE_MAX_MEMORIES unless passed explicitly (0 disables a limit).
+    """
+
+    def __init__(self, size_fn: Callable[[], int], evict_fn: Callable[[int], int],
+                 rss_budget_mb: Optional[int] = None,
+                 max_memories: Optional[int] = None,
+                 check_every: int = 50):
+        self.size_fn = size_fn
+        self.evict_fn = evict_fn
+        self.rss_budget_mb = (
+            rss_budget_mb if rss_budget_mb is not None
+            else env_int('VIDURAI_BRIDGE_MEMORY_BUDGET_MB', DEFAULT_RSS_BUDGET_MB)
+        )
+        self.max_memories = (
+            max_memories if max_memories is not None
+            else env_int('VIDURAI_BRIDGE_MAX_MEMORIES', DEFAULT_MAX_MEMORIES)
+        )
+        self.check_every = max(1, check_every)
+
+        self._caches: Dict[str, Dict[str, Callable[[], int]]] = {}
+        self._writes_since_check = 0
+        self.memories_evicted = 0
+        self.cache_entries_evicted = 0
+        self.enforcements = 0
+
+    def register_cache(self, name: str, size_fn: Callable[[], int],
+                       clear_fn: Callable[[], int]):
+        """
+        Register a cache that may be dropped under memory pressure.
+
+        size_fn returns the current number of entries; clear_fn empties the
+        cache and returns the number of entries freed.
+        """
+        self._caches[name] = {'size': size_fn, 'clear': clear_fn}
+
+    def note_write(self):
+        """Record a write; enforce the budget every check_every writes"""
+        self._writes_since_check += 1
+        if self._writes_since_check >= self.check_every:
+            self._writes_since_check = 0
+            self.enforce()
+
+    def _rss_over_budget(self) -> bool:
+        if not self.rss_budget_mb:
+            return False
+        rss = current_rss_bytes()
+        return rss is not None and rss > self.rss_budget_mb * 1024 * 1024
+
+    def enforce(self) -> Dict[str, int]:
+        """Evict until within budget, returning what was freed"""
+        freed = {'memories': 0, 'cache_entries': 0}
+
+        # 1. Hard cap on working-set entries
+        size = self.size_fn()
+        if self.max_memories and size > self.max_memories:
+            target = int(self.max_memories * LOW_WATER_RATIO)
+            freed['memories'] += self.evict_fn(size - target)
+
+        # 2. RSS budget: shrink the working set a step at a time, then caches
+        if self._rss_over_budget():
+            size = self.size_fn()
+            step = min(int(size * RSS_EVICT_STEP), max(0, size - MIN_WORKING_SET))
+            if step > 0:
+                freed['memories'] += self.evict_fn(step)
+                gc.collect()
+
+            if self._rss_over_budget():
+                for name, cache in self._caches.items():
+                    freed['cache_entries'] += cache['clear']()
+                    logger.info("Cleared cache '%s' under memory pressure", name)
+                gc.collect()
+
+        if freed['memories'] or freed['cache_entries']:
+            self.enforcements += 1
+            self.memories_evicted += freed['memories']
+            self.cache_entries_evicted += freed['cache_entries']
+            logger.info("Memory budget enforced: evicted %d memories, %d cache entries",
+                        freed['memories'], freed['cache_entries'])
+
+        return freed
+
+    def report(self) -> Dict[str, Any]:
+        """Current usage against the budget (for get_stats)"""
+        rss = current_rss_bytes()
+        return {
+            'rss_mb': round(rss / (1024 * 1024), 1) if rss is not None else None,
+            'rss_budget_mb': self.rss_budget_mb or None,
+            'working_set': self.size_fn(),
+            'max_memories': self.max_memories or None,
+            'caches': {name: cache['size']() for name, cache in self._caches.items()},
+            'memories_evicted': self.memories_evicted,
+            'cache_entries_evicted': self.cache_entries_evicted,
+            'enforcements': self.enforcements
+        }
@@ -0,0 +1,207 @@
+"""
+Bridge Metrics
+Client-to-bridge lag, processing time and process health
+"""
+import os
+import time
+import logging
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Any, Deque, List, Optional
+
+from memory_budget import current_rss_bytes, PSUTIL_AVAILABLE
+
+logger = logging.getLogger('vidurai-bridge')
+
+# Rolling window size for percentile calculations
+DEFAULT_WINDOW = 1000
+
+# Thresholds above which the bridge reports itself as degraded
+DEGRADED_LAG_P95_MS = 1000
+DEGRADED_PROCESSING_P95_MS = 1000
+DEGRADED_QUEUE_DEPTH = 20
+
+# Load hints (`_load` on every response): smoothing for the average service
+# time, queued events per extra event a client should coalesce, and caps
+SERVICE_EWMA_ALPHA = 0.2
+BATCH_STEP_DEPTH = 5
+MAX_HINT_BATCH = 20
+MAX_HINT_DEBOUNCE_MS = 60000
+
+DB_SUFFIXES = ('.db', '.sqlite', '.sqlite3', '.db-wal', '.db-journal')
+
+
+def parse_client_timestamp(value: Any) -> Optional[float]:
+    """Convert a client `_timestamp` (ISO 8601 or epoch ms) to epoch seconds"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return value / 1000.0
+    try:
+        # JS toISOString() uses a trailing 'Z', which fromisoformat rejects before 3.11
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def open_db_handles() -> Optional[int]:
+    """Count open file handles pointing at database files (None if unknown)"""
+    if PSUTIL_AVAILABLE:
+        try:
+            import psutil
+            return sum(
+                1 for f in psutil.Process().open_files()
+                if f.path.endswith(DB_SUFFIXES)
+            )
+        except Exception:
+            pass
+
+    fd_dir = '/proc/self/fd'
+    if not os.path.isdir(fd_dir):
+        return None
+
+    count = 0
+    for fd in os.listdir(fd_dir):
+        try:
+            if os.readlink(os.path.join(fd_dir, fd)).endswith(DB_SUFFIXES):
+                count += 1
+        except OSError:
+            continue
+    return count
+
+
+class RollingWindow:
+    """Fixed-size window of recent samples with percentile summaries"""
+
+    def __init__(self, size: int = DEFAULT_WINDOW):
+        self.samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, value: float):
+        self.samples.append(value)
+
+    def summary(self) -> Dict[str, Any]:
+        if not self.samples:
+            return {'samples': 0, 'p50': None, 'p95': None, 'p99': None, 'max': None}
+        ordered = sorted(self.samples)
+
+        def pick(p: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))], 2)
+
+        return {
+            'samples': len(ordered),
+            'p50': pick(0.50),
+            'p95': pick(0.95),
+            'p99': pick(0.99),
+            'max': round(ordered[-1], 2)
+        }
+
+
+class BridgeMetrics:
+    """
+    Track per-event lag and processing time for the health command.
+
+    lag_ms      client `_timestamp` -> bridge read the line
+    queue_ms    bridge read the line -> processing started
+    processing  processing started -> response ready
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.started_at = time.time()
+
+        # Set by the extension when it restarts a crashed bridge
+        try:
+            self.restart_count = int(os.environ.get('VIDURAI_BRIDGE_RESTARTS', 0))
+        except ValueError:
+            self.restart_count = 0
+
+        self.lag_ms = RollingWindow(window)
+        self.queue_ms = RollingWindow(window)
+        self.processing_ms = RollingWindow(window)
+        self.events_total = 0
+        self.errors_total = 0
+        self.events_by_type: Dict[str, int] = {}
+        self.in_flight = 0
+        self.service_ms = 0.0  # Moving average of processing time, for load hints
+        # Requests dropped past their client deadline, by where it was noticed
+        self.deadline_exceeded: Dict[str, int] = {'queued': 0, 'processing': 0}
+
+    def begin(self):
+        """Mark an event as in flight"""
+        self.in_flight += 1
+
+    def record(self, event_type: Optional[str], client_timestamp: Any,
+               received_at: float, started_at: float, finished_at: float,
+               ok: bool = True):
+        """Record timings for one processed event"""
+        self.in_flight = max(0, self.in_flight - 1)
+        self.events_total += 1
+        if event_type:
+            self.events_by_type[event_type] = self.events_by_type.get(event_type, 0) + 1
+        if not ok:
+            self.errors_total += 1
+
+        sent_at = parse_client_timestamp(client_timestamp)
+        if sent_at is not None:
+            # Clamp negative values caused by clock skew
+            self.lag_ms.add(max(0.0, (received_at - sent_at) * 1000))
+
+        self.queue_ms.add((started_at - received_at) * 1000)
+        processing_ms = (finished_at - started_at) * 1000
+        self.processing_ms.add(processing_ms)
+        self.service_ms += SERVICE_EWMA_ALPHA * (processing_ms - self.service_ms)
+
+    def deadline_missed(self, stage: str):
+        """Count a request abandoned because its client deadline passed"""
+        self.deadline_exceeded[stage] = self.deadline_exceeded.get(stage, 0) + 1
+
+    def load_hint(self, queued: int) -> Dict[str, Any]:
+        """
+        Back-pressure hint attached to every response as `_load`.
+
+        min_debounce_ms is roughly the time needed to drain what is already
+        queued, so clients sending no faster than that keep the queue from
+        growing. batch_size is how many pending events a client should fold
+        into one request.
+        """
+        drain_ms = queued * self.service_ms
+        return {
+            'queue_depth': queued,
+            'min_debounce_ms': int(min(drain_ms, MAX_HINT_DEBOUNCE_MS)),
+            'batch_size': min(MAX_HINT_BATCH, 1 + queued // BATCH_STEP_DEPTH)
+        }
+
+    def health(self, queued: int = 0) -> Dict[str, Any]:
+        """Snapshot for the health command"""
+        lag = self.lag_ms.summary()
+        processing = self.processing_ms.summary()
+        rss = current_rss_bytes()
+
+        reasons: List[str] = []
+        if lag['p95'] is not None and lag['p95'] > DEGRADED_LAG_P95_MS:
+            reasons.append(f"p95 lag {lag['p95']} ms")
+        if processing['p95'] is not None and processing['p95'] > DEGRADED_PROCESSING_P95_MS:
+            reasons.append(f"p95 processing {processing['p95']} ms")
+        if queued > DEGRADED_QUEUE_DEPTH:
+            reasons.append(f"{queued} events queued")
+
+        return {
+            'uptime_s': round(time.time() - self.started_at, 1),
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat(),
+            'restart_count': self.restart_count,
+            'events_total': self.events_total,
+            'errors_total': self.errors_total,
+            'deadline_exceeded': dict(self.deadline_exceeded),
+            'events_by_type': dict(self.events_by_type),
+            'in_flight': self.in_flight,
+            'queued': queued,
+            'lag_ms': lag,
+            'queue_ms': self.queue_ms.summary(),
+            'processing_ms': processing,
+            'rss_mb': round(rss / (1024 * 1024), 1) if rss is not None else None,
+            'open_db_handles': open_db_handles(),
+            'degraded': bool(reasons),
+            'degraded_reasons': reasons
+        }
@@ -0,0 +1,64 @@
+"""
+Pagination
+Opaque keyset cursors and field projection for read commands
+"""
+import json
+import base64
+from typing import Dict, Any, Callable, Iterable, List, Optional, Sequence
+
+# Upper bound on page size so a single response line stays small
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(key: Sequence[Any]) -> str:
+    """Encode a sort key as an opaque, URL-safe cursor"""
+    raw = json.dumps(list(key), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[List[Any]]:
+    """Decode a cursor from encode_cursor (None/empty means first page)"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    if not isinstance(key, list):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+    return key
+
+
+def clamp_page_size(limit: Any, default: int) -> int:
+    """Validate a requested page size"""
+    try:
+        limit = int(limit) if limit is not None else default
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid limit: {limit!r}")
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def project(record: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+    """Keep only the requested fields (all fields when fields is None)"""
+    if fields is None:
+        return record
+    return {name: record[name] for name in fields if name in record}
+
+
+def project_lazy(obj: Any, getters: Dict[str, Callable[[Any], Any]],
+                 fields: Iterable[str]) -> Dict[str, Any]:
+    """Build a record computing only the requested fields"""
+    return {name: getters[name](obj) for name in fields if name in getters}
+
+
+def validate_fields(fields: Any, allowed: Iterable[str]) -> Optional[List[str]]:
+    """Check a `fields` projection parameter against the allowed names"""
+    if fields is None:
+        return None
+    if not isinstance(fields, list) or not all(isinstance(f, str) for f in fields):
+        raise ValueError("fields must be a list of field names")
+    unknown = sorted(set(fields) - set(allowed))
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
@@ -0,0 +1,58 @@
+"""
+Peer State Files
+Read-only view of the state files other bridge processes write
+"""
+import time
+import logging
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple, TypeVar
+
+logger = logging.getLogger('vidurai-bridge')
+
+T = TypeVar('T')
+
+# Seconds between re-listing the directory for new or changed files
+REFRESH_S = 5.0
+
+
+class PeerFiles:
+    """
+    Other bridges' copies of a per-process state file, loaded on demand.
+
+    Each bridge writes only its own file (e.g. rollups.default-2.json), so
+    saves never overwrite another process's counts; readers merge in the
+    others. A file is re-parsed only when its mtime changes.
+    """
+
+    def __init__(self, own_path: Path, pattern: str, load: Callable[[Path], T],
+                 refresh_s: float = REFRESH_S):
+        self.own_path = Path(own_path)
+        self.pattern = pattern
+        self.load = load
+        self.refresh_s = refresh_s
+        self._loaded: Dict[Path, Tuple[float, T]] = {}  # path -> (mtime, state)
+        self._checked = 0.0
+
+    def states(self) -> List[T]:
+        """Current state of every other file matching the pattern"""
+        now = time.monotonic()
+        if now - self._checked >= self.refresh_s:
+            self._checked = now
+            self._refresh()
+        return [state for _, state in self._loaded.values()]
+
+    def _refresh(self):
+        seen = set()
+        for path in self.own_path.parent.glob(self.pattern):
+            if path == self.own_path:
+                continue
+            try:
+                mtime = path.stat().st_mtime
+            except OSError:
+                continue
+            seen.add(path)
+            cached = self._loaded.get(path)
+            if cached is None or cached[0] != mtime:
+                self._loaded[path] = (mtime, self.load(path))
+        for path in set(self._loaded) - seen:
+            del self._loaded[path]
@@ -0,0 +1,262 @@
+"""
+Bridge Profiler
+On-demand cProfile / tracemalloc sampling scoped to event types
+"""
+import os
+import time
+import random
+import cProfile
+import pstats
+import logging
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set
+
+logger = logging.getLogger('vidurai-bridge')
+
+PROFILE_DIR = Path.home() / ".vidurai" / "profiles"
+
+PROFILE_MODES = ('cpu', 'alloc', 'both')
+
+# Defaults used when profiling is enabled via VIDURAI_BRIDGE_PROFILE
+DEFAULT_SAMPLE_RATE = 0.1
+DEFAULT_TOP_N = 20
+
+# Profiler commands are never profiled themselves
+UNPROFILED_EVENTS = {'profile_start', 'profile_stop'}
+
+
+class BridgeProfiler:
+    """
+    Sample CPU and allocation profiles for selected event types.
+
+    Only sampled events pay the profiling cost: cProfile is enabled and
+    tracemalloc is started just around the sampled event and switched off
+    again afterwards. All output goes to files and structured summaries,
+    never to stdout (reserved for the JSON channel).
+    """
+
+    def __init__(self, profile_dir: Optional[Path] = None):
+        self.profile_dir = Path(profile_dir) if profile_dir else PROFILE_DIR
+        self.active = False
+        self.mode = 'cpu'
+        self.event_types: Optional[Set[str]] = None  # None = all event types
+        self.sample_rate = DEFAULT_SAMPLE_RATE
+        self.top_n = DEFAULT_TOP_N
+
+        self._cpu: Optional[cProfile.Profile] = None
+        self._alloc_stats: Dict[str, List[int]] = {}
+        self._peak_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._peak_size = 0
+        self._started_at = 0.0
+        self._seen: Dict[str, int] = {}
+        self._sampled: Dict[str, int] = {}
+
+    def configure_from_env(self, value: Optional[str] = None) -> bool:
+        """
+        Start profiling from VIDURAI_BRIDGE_PROFILE.
+
+        The variable holds a comma-separated list of event types ("all" or
+        "1" profiles everything). VIDURAI_BRIDGE_PROFILE_MODE and
+        VIDURAI_BRIDGE_PROFILE_RATE override the mode and sample rate.
+        Returns False (with a warning) if those settings are invalid.
+        """
+        value = value if value is not None else os.environ.get('VIDURAI_BRIDGE_PROFILE', '')
+        value = value.strip()
+        if not value or value.lower() in ('0', 'false', 'off'):
+            return False
+
+        event_types = None
+        if value.lower() not in ('1', 'true', 'on', 'all'):
+            event_types = [t.strip() for t in value.split(',') if t.strip()]
+
+        try:
+            sample_rate = float(os.environ.get('VIDURAI_BRIDGE_PROFILE_RATE', DEFAULT_SAMPLE_RATE))
+        except ValueError:
+            sample_rate = DEFAULT_SAMPLE_RATE
+
+        try:
+            self.start(
+                event_types=event_types,
+                sample_rate=sample_rate,
+                mode=os.environ.get('VIDURAI_BRIDGE_PROFILE_MODE', 'cpu')
+            )
+        except ValueError as e:
+            # A bad setting must not keep the bridge from starting
+            logger.warning("Ignoring VIDURAI_BRIDGE_PROFILE settings, not profiling: %s", e)
+            return False
+        return True
+
+    def start(self, event_types: Optional[List[str]] = None,
+              sample_rate: float = DEFAULT_SAMPLE_RATE, mode: str = 'cpu',
+              top_n: int = DEFAULT_TOP_N) -> Dict[str, Any]:
+        """Begin a profiling session (restarts any session in progress)"""
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode} (expected one of {PROFILE_MODES})")
+        if not 0.0 < sample_rate <= 1.0:
+            raise ValueError(f"sample_rate must be in (0, 1], got {sample_rate}")
+
+        if self.active:
+            self._reset()
+
+        self.mode = mode
+        self.event_types = set(event_types) if event_types else None
+        self.sample_rate = sample_rate
+        self.top_n = top_n
+        self._cpu = cProfile.Profile() if mode in ('cpu', 'both') else None
+        self._started_at = time.time()
+        self.active = True
+
+        logger.info("Profiling started (mode: %s, rate: %s, events: %s)", mode, sample_rate,
+                    sorted(self.event_types) if self.event_types else 'all')
+        return self.status()
+
+    def stop(self, top_n: Optional[int] = None) -> Dict[str, Any]:
+        """End the session, write profile files and return a top-N summary"""
+        if not self.active:
+            raise RuntimeError("Profiling is not active")
+
+        top_n = top_n or self.top_n
+        summary = self.status()
+        summary['duration_s'] = round(time.time() - self._started_at, 3)
+        summary['files'] = self._write_files()
+
+        if self._cpu is not None:
+            summary['top_cpu'] = self._top_cpu(top_n) if self._sampled else []
+        if self.mode in ('alloc', 'both'):
+            summary['top_alloc'] = self._top_alloc(top_n)
+
+        self._reset()
+        summary['active'] = False
+        logger.info("Profiling stopped, wrote %d file(s)", len(summary['files']))
+        return summary
+
+    def status(self) -> Dict[str, Any]:
+        """Describe the current session"""
+        return {
+            'active': self.active,
+            'mode': self.mode,
+            'event_types': sorted(self.event_types) if self.event_types else None,
+            'sample_rate': self.sample_rate,
+            'seen_events': dict(self._seen),
+            'sampled_events': dict(self._sampled)
+        }
+
+    def _should_sample(self, event_type: Optional[str]) -> bool:
+        if not self.active or not event_type or event_type in UNPROFILED_EVENTS:
+            return False
+        if self.event_types is not None and event_type not in self.event_types:
+            return False
+
+        self._seen[event_type] = self._seen.get(event_type, 0) + 1
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return False
+
+        self._sampled[event_type] = self._sampled.get(event_type, 0) + 1
+        return True
+
+    @contextmanager
+    def profile(self, event_type: Optional[str]):
+        """Profile the wrapped block if this event is sampled"""
+        if not self._should_sample(event_type):
+            yield
+            return
+
+        trace_alloc = self.mode in ('alloc', 'both')
+        owns_tracing = trace_alloc and not tracemalloc.is_tracing()
+        if owns_tracing:
+            tracemalloc.start()
+        elif trace_alloc:
+            tracemalloc.clear_traces()
+
+        if self._cpu is not None:
+            self._cpu.enable()
+        try:
+            yield
+        finally:
+            if self._cpu is not None:
+                self._cpu.disable()
+            if trace_alloc:
+                self._record_allocations(tracemalloc.take_snapshot())
+                if owns_tracing:
+                    tracemalloc.stop()
+
+    def _record_allocations(self, snapshot: tracemalloc.Snapshot):
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+        total = 0
+        for stat in snapshot.statistics('lineno'):
+            frame = stat.traceback[0]
+            key = f"{frame.filename}:{frame.lineno}"
+            entry = self._alloc_stats.setdefault(key, [0, 0])
+            entry[0] += stat.size
+            entry[1] += stat.count
+            total += stat.size
+
+        # Keep the heaviest sampled event for the on-disk snapshot
+        if total >= self._peak_size:
+            self._peak_size = total
+            self._peak_snapshot = snapshot
+
+    def _top_cpu(self, top_n: int) -> List[Dict[str, Any]]:
+        stats = pstats.Stats(self._cpu, stream=_NullStream())
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                'function': f"{Path(filename).name}:{lineno}({name})",
+                'calls': calls,
+                'tottime': round(tottime, 6),
+                'cumtime': round(cumtime, 6)
+            }
+            for (filename, lineno, name), (_, calls, tottime, cumtime, _) in rows[:top_n]
+        ]
+
+    def _top_alloc(self, top_n: int) -> List[Dict[str, Any]]:
+        rows = sorted(self._alloc_stats.items(), key=lambda item: item[1][0], reverse=True)
+        return [
+            {'location': location, 'size_kb': round(size / 1024, 2), 'count': count}
+            for location, (size, count) in rows[:top_n]
+        ]
+
+    def _write_files(self) -> List[str]:
+        files = []
+        if not any(self._sampled.values()):
+            return files
+
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        stem = datetime.now().strftime('bridge-%Y%m%d-%H%M%S')
+
+        if self._cpu is not None:
+            prof_path = self.profile_dir / f"{stem}.prof"
+            self._cpu.dump_stats(str(prof_path))
+            files.append(str(prof_path))
+
+        if self._peak_snapshot is not None:
+            snap_path = self.profile_dir / f"{stem}.snapshot"
+            self._peak_snapshot.dump(str(snap_path))
+            files.append(str(snap_path))
+
+        return files
+
+    def _reset(self):
+        self.active = False
+        self._cpu = None
+        self._alloc_stats = {}
+        self._peak_snapshot = None
+        self._peak_size = 0
+        self._seen = {}
+        self._sampled = {}
+
+
+class _NullStream:
+    """Sink for pstats output so nothing reaches stdout"""
+
+    def write(self, _text: str) -> int:
+        return 0
+
+    def flush(self):
+        pass
@@ -0,0 +1,207 @@
+"""
+Activity Rollups
+Hourly and daily activity counts per project, updated on every write
+"""
+import os
+import json
+import time
+import logging
+from pathlib import Path
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+from peers import PeerFiles
+
+logger = logging.getLogger('vidurai-bridge')
+
+ROLLUPS_FILE = Path.home() / ".vidurai" / "rollups.json"
+ROLLUPS_VERSION = 1
+
+HOUR = 3600
+DAY = 86400
+
+BUCKET_S = {'hour': HOUR, 'day': DAY}
+
+# How long buckets are kept, by granularity
+RETENTION_S = {'hour': 14 * DAY, 'day': 400 * DAY}
+
+# Files listed per histogram
+TOP_FILES = 5
+
+# Used when an event carries no project_path
+UNKNOWN_PROJECT = ''
+
+
+def bucket_start(ts: float, granularity: str) -> int:
+    """Start of the hour, or of the local calendar day, containing ts"""
+    ts = int(ts)
+    if granularity == 'hour':
+        return ts - ts % HOUR
+    offset = time.localtime(ts).tm_gmtoff
+    return ts - (ts + offset) % DAY
+
+
+def _empty_counts() -> Dict[str, Any]:
+    return {'total': 0, 'salience': Counter(), 'type': Counter(), 'file': Counter()}
+
+
+class ActivityRollups:
+    """
+    Time-bucketed activity counts by salience, event type and file.
+
+    Every write increments one hourly and one daily bucket, so timelines
+    and totals for any range are a merge of a few buckets instead of a
+    scan over raw memories. With `peer_pattern`, each bridge saves only
+    its own file and histograms add in the other files matching it.
+    """
+
+    def __init__(self, path: Optional[Path] = ROLLUPS_FILE, peer_pattern: Optional[str] = None):
+        self.path = Path(path) if path else None
+        # project -> granularity -> bucket start -> counts
+        self._projects: Dict[str, Dict[str, Dict[int, Dict[str, Any]]]] = {}
+        self._last_prune = 0
+        self.updated = 0.0  # Time of the newest count, to pick the fresher of file and snapshot
+        self.peers = (
+            PeerFiles(self.path, peer_pattern, ActivityRollups.load)
+            if self.path and peer_pattern else None
+        )
+
+    def record(self, project_path: Optional[str], salience: str, event_type: str,
+               file_path: Optional[str] = None, ts: Optional[float] = None):
+        """Count one event"""
+        ts = time.time() if ts is None else ts
+        self.updated = max(self.updated, ts)
+        project = self._projects.setdefault(
+            project_path or UNKNOWN_PROJECT, {'hour': {}, 'day': {}}
+        )
+
+        for granularity, buckets in project.items():
+            start = bucket_start(ts, granularity)
+            counts = buckets.get(start)
+            if counts is None:
+                counts = buckets[start] = _empty_counts()
+            counts['total'] += 1
+            counts['salience'][salience] += 1
+            counts['type'][event_type] += 1
+            if file_path:
+                counts['file'][file_path] += 1
+
+        if ts - self._last_prune > HOUR:
+            self._prune(ts)
+
+    def _prune(self, now: float):
+        self._last_prune = now
+        for project in self._projects.values():
+            for granularity, buckets in project.items():
+                cutoff = now - RETENTION_S[granularity]
+                for start in [s for s in buckets if s < cutoff]:
+                    del buckets[start]
+
+    def histogram(self, project_path: Optional[str], granularity: str = 'hour',
+                  buckets: int = 24, now: Optional[float] = None) -> Dict[str, Any]:
+        """Counts for the last `buckets` hours/days plus merged totals for the range"""
+        if granularity not in RETENTION_S:
+            raise ValueError(f"Invalid granularity: {granularity!r} (use 'hour' or 'day')")
+        buckets = max(1, min(int(buckets), RETENTION_S[granularity] // BUCKET_S[granularity]))
+        now = time.time() if now is None else now
+
+        # Walk back from the current bucket (day lengths vary with DST)
+        starts = [bucket_start(now, granularity)]
+        while len(starts) < buckets:
+            starts.append(bucket_start(starts[-1] - 1, granularity))
+        starts.reverse()
+
+        sources = [self] + (self.peers.states() if self.peers else [])
+        stored = [
+            source._projects.get(project_path or UNKNOWN_PROJECT, {}).get(granularity, {})
+            for source in sources
+        ]
+        merged = _empty_counts()
+        counts = []
+        for start in starts:
+            total = 0
+            for buckets in stored:
+                bucket = buckets.get(start)
+                if bucket is None:
+                    continue
+                total += bucket['total']
+                merged['salience'].update(bucket['salience'])
+                merged['type'].update(bucket['type'])
+                merged['file'].update(bucket['file'])
+            counts.append(total)
+            merged['total'] += total
+
+        return {
+            'granularity': granularity,
+            'starts': [datetime.fromtimestamp(s).isoformat() for s in starts],
+            'counts': counts,
+            'total': merged['total'],
+            'by_salience': dict(merged['salience']),
+            'by_type': dict(merged['type']),
+            'top_files': merged['file'].most_common(TOP_FILES)
+        }
+
+    def snapshot_state(self) -> Dict[str, Any]:
+        return {'projects': self._projects, 'updated': self.updated}
+
+    def restore_state(self, state: Dict[str, Any]):
+        # The saved file may be newer than the snapshot
+        if state['updated'] >= self.updated:
+            self._projects = state['projects']
+            self.updated = state['updated']
+
+    def save(self):
+        """Write rollups atomically"""
+        if self.path is None:
+            return
+        data = {
+            'version': ROLLUPS_VERSION,
+            'updated': self.updated,
+            'projects': {
+                project: {
+                    granularity: {str(start): counts for start, counts in buckets.items()}
+                    for granularity, buckets in granularities.items()
+                }
+                for project, granularities in self._projects.items()
+            }
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + '.tmp')
+            tmp.write_text(json.dumps(data), encoding='utf-8')
+            os.replace(tmp, self.path)
+        except OSError as e:
+            logger.error("Error saving activity rollups: %s", e)
+
+    @classmethod
+    def load(cls, path: Path = ROLLUPS_FILE,
+             peer_pattern: Optional[str] = None) -> 'ActivityRollups':
+        """Load saved rollups, or start empty if missing or unreadable"""
+        rollups = cls(path, peer_pattern)
+        try:
+            data = json.loads(Path(path).read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return rollups
+        except (OSError, ValueError) as e:
+            logger.warning("Could not load activity rollups: %s", e)
+            return rollups
+
+        if data.get('version') != ROLLUPS_VERSION:
+            return rollups
+
+        rollups.updated = data.get('updated', 0.0)
+        for project, granularities in data.get('projects', {}).items():
+            rollups._projects[project] = {
+                granularity: {
+                    int(start): {
+                        'total': counts['total'],
+                        'salience': Counter(counts['salience']),
+                        'type': Counter(counts['type']),
+                        'file': Counter(counts['file'])
+                    }
+                    for start, counts in buckets.items()
+                }
+                for granularity, buckets in granularities.items()
+            }
+        return rollups
@@ -0,0 +1,177 @@
+"""
+Incremental Secret Scanning
+Content-defined chunks with a persistent per-chunk scan cache
+"""
+import os
+import re
+import json
+import zlib
+import hashlib
+import logging
+from pathlib import Path
+from collections import OrderedDict
+from typing import List, Optional, Sequence
+
+logger = logging.getLogger('vidurai-bridge')
+
+SCAN_CACHE_FILE = Path.home() / ".vidurai" / "secret_scan_cache.json"
+SCAN_CACHE_VERSION = 1
+
+# Chunks end after a boundary line (one whose hash is 0 mod BOUNDARY_EVERY)
+# once at least MIN_CHUNK long, so boundaries follow the content rather than
+# the offset and an edit only moves the boundaries next to it. Without a
+# boundary line, chunks are cut at the last line start before MAX_CHUNK
+# (or mid-line for minified code)
+MIN_CHUNK = 1024
+MAX_CHUNK = 8192
+BOUNDARY_EVERY = 8
+
+# Each chunk is scanned together with this many trailing characters of the
+# previous one, so a secret straddling a boundary is still matched
+OVERLAP = 256
+
+MAX_CACHE_ENTRIES = 50000
+
+
+def is_boundary(line: str) -> bool:
+    """Whether a chunk may end after this line (blank lines never qualify)"""
+    stripped = line.strip()
+    if not stripped:
+        return False
+    return zlib.crc32(stripped.encode('utf-8', 'surrogatepass')) % BOUNDARY_EVERY == 0
+
+
+def split_chunks(content: str) -> List[str]:
+    """Split content at boundary lines into chunks that concatenate back to it"""
+    chunks: List[str] = []
+    start = pos = 0
+    while pos < len(content):
+        if pos - start < MIN_CHUNK:
+            # Jump to the line that brings the chunk to MIN_CHUNK; none before it can end it
+            pos = max(pos, content.rfind('\n', pos, start + MIN_CHUNK - 1) + 1)
+        end = content.find('\n', pos) + 1 or len(content)
+        if end - start > MAX_CHUNK:
+            # Close the chunk before this line, or cut a line longer than MAX_CHUNK
+            cut = pos if pos > start else start + MAX_CHUNK
+            chunks.append(content[start:cut])
+            start = pos = cut
+            continue
+
+        line_start, pos = pos, end
+        if pos - start >= MIN_CHUNK and is_boundary(content[line_start:pos]):
+            chunks.append(content[start:pos])
+            start = pos
+
+    if start < len(content):
+        chunks.append(content[start:])
+    return chunks
+
+
+class SecretScanner:
+    """
+    Scan documents for secrets, re-scanning only chunks not seen before.
+
+    The cache maps a chunk's hash (including its overlap with the previous
+    chunk) to whether it matched, so editing one line of a large file
+    costs a regex pass over one or two chunks. Only hashing is proportional
+    to the file size. The cache is invalidated when the pattern list changes.
+    """
+
+    def __init__(self, patterns: Sequence[str], cache_path: Optional[Path] = None,
+                 max_entries: int = MAX_CACHE_ENTRIES):
+        # One alternation pass per chunk instead of one pass per pattern
+        self._regex = re.compile('|'.join(f'(?:{p})' for p in patterns), re.IGNORECASE)
+        self._patterns_digest = hashlib.sha1('\n'.join(patterns).encode('utf-8')).hexdigest()
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.max_entries = max_entries
+
+        self._cache: 'OrderedDict[bytes, bool]' = OrderedDict()
+        self.chunks_scanned = 0
+        self.chunks_cached = 0
+
+        if self.cache_path:
+            self._load()
+
+    def _matches(self, text: str) -> bool:
+        return self._regex.search(text) is not None
+
+    def contains_secrets(self, content: str) -> bool:
+        """True if any chunk of content contains a secret"""
+        found = False
+        previous = ''
+        for chunk in split_chunks(content):
+            window = previous[-OVERLAP:] + chunk
+            key = hashlib.blake2b(window.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+
+            hit = self._cache.get(key)
+            if hit is None:
+                hit = self._matches(window)
+                self.chunks_scanned += 1
+                self._cache[key] = hit
+                if len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+            else:
+                self.chunks_cached += 1
+                self._cache.move_to_end(key)
+
+            # Keep going after a hit so every chunk of the new version is cached
+            found = found or hit
+            previous = chunk
+        return found
+
+    def cache_size(self) -> int:
+        return len(self._cache)
+
+    def clear_cache(self) -> int:
+        """Drop every cached chunk result, returning how many were dropped"""
+        dropped = len(self._cache)
+        self._cache = OrderedDict()
+        return dropped
+
+    def stats(self):
+        return {
+            'cache_entries': len(self._cache),
+            'chunks_scanned': self.chunks_scanned,
+            'chunks_cached': self.chunks_cached
+        }
+
+    def snapshot_state(self):
+        return {'patterns': self._patterns_digest, 'chunks': list(self._cache.items())}
+
+    def restore_state(self, state):
+        if state['patterns'] != self._patterns_digest:
+            raise ValueError("secret patterns changed")
+        self._cache = OrderedDict(state['chunks'])
+
+    def save(self):
+        """Persist the cache so restarts don't rescan unchanged files"""
+        if self.cache_path is None:
+            return
+        data = {
+            'version': SCAN_CACHE_VERSION,
+            'patterns': self._patterns_digest,
+            'chunks': [[key.hex(), int(hit)] for key, hit in self._cache.items()]
+        }
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.cache_path.with_name(self.cache_path.name + '.tmp')
+            tmp.write_text(json.dumps(data), encoding='utf-8')
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            logger.error("Error saving secret scan cache: %s", e)
+
+    def _load(self):
+        try:
+            data = json.loads(self.cache_path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logger.warning("Could not load secret scan cache: %s", e)
+            return
+
+        if data.get('version') != SCAN_CACHE_VERSION or \
+                data.get('patterns') != self._patterns_digest:
+            logger.info("Secret patterns changed, discarding scan cache")
+            return
+        for key, hit in data.get('chunks', [])[-self.max_entries:]:
+            self._cache[bytes.fromhex(key)] = bool(hit)
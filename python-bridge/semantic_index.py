@@ -0,0 +1,379 @@
+"""
+Semantic Index
+Offline TF-IDF over exact terms with inverted-index top-k (no model, no network)
+"""
+import os
+import re
+import json
+import math
+import logging
+from array import array
+from pathlib import Path
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger('vidurai-bridge')
+
+# Optional: numpy for scoring (semantic recall is disabled without it)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# 2: exact term ids replaced 256 hashed buckets (collisions ranked unrelated memories)
+INDEX_VERSION = 2
+
+# Words, plus camelCase / snake_case parts so "parseConfig" matches "config"
+WORD_RE = re.compile(r'[A-Za-z0-9]+')
+PART_RE = re.compile(r'[A-Z]?[a-z]+|[A-Z]+(?![a-z])|\d+')
+
+# (memory id, cosine score, row) - row breaks score ties for keyset paging
+Hit = Tuple[str, float, int]
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased words and their camelCase parts (2+ characters)"""
+    tokens = []
+    for word in WORD_RE.findall(text):
+        lowered = word.lower()
+        if len(lowered) > 1:
+            tokens.append(lowered)
+        parts = PART_RE.findall(word)
+        if len(parts) > 1:
+            tokens.extend(p.lower() for p in parts if len(p) > 1)
+    return tokens
+
+
+class SemanticIndex:
+    """
+    Sparse term vectors, one row per memory, with an inverted index per term.
+
+    Rows are L2-normalised sublinear TF weights over exact term ids. IDF
+    weighting is applied to the query only, so stored rows never need
+    re-weighting as document frequencies drift. A memory only scores above
+    zero when it shares at least one term with the query.
+
+    After load() the saved rows stay memory-mapped and their postings are
+    rebuilt in one vectorized pass; new rows go to an append-only tail.
+    save() merges both and drops removed rows and unused terms.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("numpy is required for the semantic index")
+        self.path = Path(path) if path else None
+
+        self._terms: Dict[str, int] = {}  # term -> term id
+        self._vocab: List[str] = []       # term id -> term
+        self._df: List[int] = []          # term id -> live memories containing it
+        self._docs = 0                    # Live memories
+
+        # Saved rows as CSR arrays (memory-mapped after load) and their postings
+        self._base_indptr = np.zeros(1, dtype=np.int64)
+        self._base_terms = np.zeros(0, dtype=np.int32)
+        self._base_weights = np.zeros(0, dtype=np.float32)
+        self._post_start = np.zeros(1, dtype=np.int64)  # term id -> slice of _post_*
+        self._post_rows = np.zeros(0, dtype=np.int32)
+        self._post_weights = np.zeros(0, dtype=np.float32)
+
+        # Rows added since, and their postings by term id
+        self._tail_indptr = array('q', [0])
+        self._tail_terms = array('i')
+        self._tail_weights = array('f')
+        self._tail_postings: Dict[int, Tuple[array, array]] = {}
+
+        self._alive = bytearray()
+        self._ids: List[str] = []
+        self._rows: Dict[str, int] = {}  # memory id -> row
+        self._dirty = False  # Changed since the last save()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, memory_id: str) -> bool:
+        return memory_id in self._rows
+
+    @property
+    def count(self) -> int:
+        """Rows in the index, including removed ones"""
+        return len(self._ids)
+
+    @property
+    def _base_count(self) -> int:
+        return self._base_indptr.shape[0] - 1
+
+    # =========================================================================
+    # VECTORISING
+    # =========================================================================
+
+    @staticmethod
+    def _normalised(weights: Dict[int, float]) -> Dict[int, float]:
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        return {t: w / norm for t, w in weights.items()}
+
+    def _doc_weights(self, text: str) -> Dict[int, float]:
+        """Normalised TF weights by term id, adding new terms to the vocabulary"""
+        counts = Counter(tokenize(text))
+        weights = {}
+        for token, n in counts.items():
+            term = self._terms.get(token)
+            if term is None:
+                term = self._terms[token] = len(self._vocab)
+                self._vocab.append(token)
+                self._df.append(0)
+            weights[term] = 1.0 + math.log(n)
+        return self._normalised(weights) if weights else weights
+
+    def _query_weights(self, text: str) -> Dict[int, float]:
+        """Normalised TF-IDF weights for the query's terms that are indexed"""
+        weights = {}
+        for token, n in Counter(tokenize(text)).items():
+            term = self._terms.get(token)
+            if term is not None and self._df[term] > 0:
+                idf = math.log((1.0 + self._docs) / (1.0 + self._df[term])) + 1.0
+                weights[term] = (1.0 + math.log(n)) * idf
+        return self._normalised(weights) if weights else weights
+
+    def _row_terms(self, row: int):
+        if row < self._base_count:
+            return self._base_terms[self._base_indptr[row]:self._base_indptr[row + 1]]
+        local = row - self._base_count
+        return self._tail_terms[self._tail_indptr[local]:self._tail_indptr[local + 1]]
+
+    # =========================================================================
+    # WRITES
+    # =========================================================================
+
+    def add(self, memory_id: str, text: str) -> bool:
+        """Index one memory; False if the text has no indexable terms"""
+        return self.add_many([(memory_id, text)]) == 1
+
+    def add_many(self, items: Iterable[Tuple[str, str]]) -> int:
+        """Index a batch of (memory id, text) pairs, returning how many were added"""
+        added = 0
+        for memory_id, text in items:
+            if not memory_id or memory_id in self._rows:
+                continue
+            weights = self._doc_weights(text)
+            if not weights:
+                continue
+
+            row = len(self._ids)
+            for term, weight in weights.items():
+                self._tail_terms.append(term)
+                self._tail_weights.append(weight)
+                rows, row_weights = self._tail_postings.setdefault(
+                    term, (array('i'), array('f'))
+                )
+                rows.append(row)
+                row_weights.append(weight)
+                self._df[term] += 1
+            self._tail_indptr.append(len(self._tail_terms))
+            self._ids.append(memory_id)
+            self._rows[memory_id] = row
+            self._alive.append(1)
+            added += 1
+
+        self._docs += added
+        self._dirty = self._dirty or added > 0
+        return added
+
+    def remove(self, memory_ids: Iterable[str]) -> int:
+        """Drop memories from results and document frequencies (rows reclaimed on save)"""
+        removed = 0
+        for memory_id in memory_ids:
+            row = self._rows.pop(memory_id, None)
+            if row is None:
+                continue
+            self._alive[row] = 0
+            for term in self._row_terms(row):
+                self._df[term] -= 1
+            removed += 1
+        self._docs -= removed
+        self._dirty = self._dirty or removed > 0
+        return removed
+
+    # =========================================================================
+    # QUERIES
+    # =========================================================================
+
+    def _scores(self, weights: Dict[int, float]):
+        """Cosine score of every row against one query (0 where no term is shared)"""
+        scores = np.zeros(self.count, dtype=np.float32)
+        for term, query_weight in weights.items():
+            if term + 1 < self._post_start.shape[0]:
+                start, stop = self._post_start[term], self._post_start[term + 1]
+                # Rows are unique within a posting list, so += does not drop repeats
+                scores[self._post_rows[start:stop]] += (
+                    query_weight * self._post_weights[start:stop]
+                )
+            tail = self._tail_postings.get(term)
+            if tail is not None:
+                # Copies: a live view would stop add() from growing the arrays
+                rows = np.array(tail[0], dtype=np.int32)
+                scores[rows] += query_weight * np.array(tail[1], dtype=np.float32)
+        return scores
+
+    def search(self, query: str, top_k: int = 10,
+               after: Optional[Sequence] = None,
+               accept: Optional[Callable[[str], bool]] = None) -> List[Hit]:
+        """Top-k hits for one query, best first (see search_many)"""
+        return self.search_many([query], top_k, after, accept)[0]
+
+    def search_many(self, queries: Sequence[str], top_k: int = 10,
+                    after: Optional[Sequence] = None,
+                    accept: Optional[Callable[[str], bool]] = None) -> List[List[Hit]]:
+        """
+        Top-k hits for a batch of queries, scored through the postings of
+        their terms only.
+
+        Hits are ordered by (score desc, row asc). `after` is the (score, row)
+        of the last hit already returned, for keyset paging. `accept` filters
+        memory ids (e.g. to skip memories no longer in the working set).
+        """
+        results: List[List[Hit]] = [[] for _ in queries]
+        if not self._rows or top_k <= 0:
+            return results
+
+        rows = np.arange(self.count)
+        alive = np.array(self._alive, dtype=np.bool_)
+        for i, query in enumerate(queries):
+            weights = self._query_weights(query)
+            if not weights:
+                continue
+            column = self._scores(weights)
+            mask = alive & (column > 0)
+            if after is not None:
+                after_score, after_row = np.float32(after[0]), int(after[1])
+                mask &= (column < after_score) | ((column == after_score) & (rows > after_row))
+            candidates = np.flatnonzero(mask)
+            results[i] = self._top(candidates, column, top_k, accept)
+
+        return results
+
+    def _top(self, candidates, column, top_k: int,
+             accept: Optional[Callable[[str], bool]]) -> List[Hit]:
+        window = top_k * 2 + 16  # Headroom for ids rejected by accept()
+        while True:
+            if len(candidates) > window:
+                # Everything scoring at least the window's k-th best, so ties stay whole
+                threshold = np.partition(column[candidates], -window)[-window]
+                selected = candidates[column[candidates] >= threshold]
+            else:
+                selected = candidates
+            ordered = selected[np.lexsort((selected, -column[selected]))]
+
+            hits: List[Hit] = []
+            for row in ordered:
+                memory_id = self._ids[row]
+                if accept is None or accept(memory_id):
+                    hits.append((memory_id, float(column[row]), int(row)))
+                    if len(hits) == top_k:
+                        return hits
+            if len(selected) == len(candidates):
+                return hits
+            window *= 4
+
+    # =========================================================================
+    # PERSISTENCE
+    # =========================================================================
+
+    def save(self):
+        """Write the index atomically (terms.npy and weights.npy are memory-mapped on load)"""
+        if self.path is None or not self._dirty:
+            return
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        # Removed rows and terms no live row uses are dropped here rather than on remove()
+        tail_indptr = np.array(self._tail_indptr, dtype=np.int64)
+        indptr = np.concatenate([self._base_indptr, tail_indptr[1:] + self._base_indptr[-1]])
+        terms = np.concatenate([self._base_terms, np.array(self._tail_terms, dtype=np.int32)])
+        weights = np.concatenate([
+            self._base_weights, np.array(self._tail_weights, dtype=np.float32)
+        ])
+        keep = np.array(self._alive, dtype=np.bool_)
+        lengths = np.diff(indptr)
+        entries = np.repeat(keep, lengths)
+        terms, weights = terms[entries], weights[entries]
+        indptr = np.concatenate([[0], np.cumsum(lengths[keep])]).astype(np.int64)
+
+        used = np.flatnonzero(np.bincount(terms, minlength=len(self._vocab)))
+        remap = np.full(len(self._vocab), -1, dtype=np.int32)
+        remap[used] = np.arange(len(used), dtype=np.int32)
+        terms = remap[terms]
+        vocab = [self._vocab[t] for t in used]
+        ids = [self._ids[row] for row in np.flatnonzero(keep)]
+
+        files = {
+            'indptr.npy': lambda f: np.save(f, indptr),
+            'terms.npy': lambda f: np.save(f, terms),
+            'weights.npy': lambda f: np.save(f, weights),
+            'vocab.json': lambda f: f.write(json.dumps(vocab).encode('utf-8')),
+            'ids.json': lambda f: f.write(json.dumps(ids).encode('utf-8')),
+            # Written last: a crash before this leaves the old, consistent meta behind
+            'meta.json': lambda f: f.write(json.dumps({
+                'version': INDEX_VERSION,
+                'rows': len(ids),
+                'terms': len(vocab)
+            }).encode('utf-8')),
+        }
+        for name, write in files.items():
+            tmp = self.path / (name + '.tmp')
+            with open(tmp, 'wb') as f:
+                write(f)
+            os.replace(tmp, self.path / name)
+        self._dirty = False
+
+        logger.debug("Saved semantic index (%d memories) to %s", len(self), self.path)
+
+    @classmethod
+    def load(cls, path: Path) -> 'SemanticIndex':
+        """Load a saved index (rows memory-mapped), or start empty if missing/stale"""
+        index = cls(path)
+        path = Path(path)
+        try:
+            meta = json.loads((path / 'meta.json').read_text())
+            if meta.get('version') != INDEX_VERSION:
+                logger.info("Semantic index format changed, rebuilding")
+                return index
+
+            indptr = np.load(path / 'indptr.npy')
+            terms = np.load(path / 'terms.npy', mmap_mode='r')
+            weights = np.load(path / 'weights.npy', mmap_mode='r')
+            vocab = json.loads((path / 'vocab.json').read_text())
+            ids = json.loads((path / 'ids.json').read_text())
+            rows = meta['rows']
+            if (indptr.shape != (rows + 1,) or len(ids) != rows
+                    or terms.shape != weights.shape or terms.shape[0] != indptr[-1]
+                    or len(vocab) != meta['terms']
+                    or (terms.shape[0] and int(terms.max()) >= len(vocab))):
+                logger.warning("Semantic index files are inconsistent, rebuilding")
+                return index
+        except FileNotFoundError:
+            return index
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Could not load semantic index: %s", e)
+            return index
+
+        # Postings: every (row, weight) grouped by term id
+        order = np.argsort(terms, kind='stable')
+        sorted_terms = terms[order]
+        index._post_rows = np.repeat(
+            np.arange(rows, dtype=np.int32), np.diff(indptr)
+        )[order]
+        index._post_weights = weights[order]
+        index._post_start = np.searchsorted(sorted_terms, np.arange(len(vocab) + 1))
+
+        index._base_indptr = indptr
+        index._base_terms = terms
+        index._base_weights = weights
+        index._vocab = vocab
+        index._terms = {term: i for i, term in enumerate(vocab)}
+        index._df = np.bincount(terms, minlength=len(vocab)).tolist()
+        index._docs = rows
+        index._alive = bytearray(b'\x01' * rows)
+        index._ids = ids
+        index._rows = {mid: row for row, mid in enumerate(ids)}
+        logger.info("Loaded semantic index (%d memories) from %s", len(index), path)
+        return index
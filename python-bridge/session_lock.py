@@ -0,0 +1,66 @@
+"""
+Session Locks
+One bridge process per session's snapshot, index and pickle files
+"""
+import os
+import logging
+from pathlib import Path
+from typing import Dict, IO
+
+# Optional: fcntl (POSIX); msvcrt is used on Windows
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    import msvcrt
+    FCNTL_AVAILABLE = False
+
+logger = logging.getLogger('vidurai-bridge')
+
+# Bridges sharing a session id (one per VS Code window) try "default",
+# "default-2", ... so a restarted window reuses a free slot's files
+MAX_SLOTS = 16
+
+# Lock files held by this process, by path (held until exit)
+_held: Dict[Path, IO] = {}
+
+
+def _try_lock(path: Path) -> bool:
+    if path in _held:
+        return True
+    f = open(path, 'a+')
+    try:
+        if FCNTL_AVAILABLE:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        f.close()
+        return False
+    _held[path] = f
+    return True
+
+
+def claim_session(session_dir: Path, session_id: str) -> str:
+    """
+    Lock a session slot for this process and return its id.
+
+    The first slot not held by another process wins; within one process
+    the same slot is returned every time.
+    """
+    for slot in range(1, MAX_SLOTS + 1):
+        candidate = session_id if slot == 1 else f"{session_id}-{slot}"
+        if _try_lock(session_dir / f"{candidate}.lock"):
+            if slot > 1:
+                logger.info(
+                    "Session %s is in use by another bridge, using %s", session_id, candidate
+                )
+            return candidate
+
+    # Every slot busy: private files that are never restored
+    candidate = f"{session_id}-pid{os.getpid()}"
+    logger.warning("All %d slots of session %s are in use, using %s",
+                   MAX_SLOTS, session_id, candidate)
+    return candidate
+
@@ -0,0 +1,190 @@
+"""
+State Snapshots
+Periodic, versioned checkpoints of derived in-memory state for warm restarts
+"""
+import os
+import time
+import pickle
+import logging
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional
+
+from config import env_int
+
+logger = logging.getLogger('vidurai-bridge')
+
+# Bump when any component's snapshot_state() layout changes
+# (3: the file is a stream of records rather than one pickle)
+SNAPSHOT_VERSION = 3
+
+DEFAULT_INTERVAL_S = 60
+
+# Snapshots older than this are ignored and state is rebuilt from scratch
+DEFAULT_MAX_AGE_S = 7 * 86400
+
+# Items of a top-level list in a component's state pickled per write step
+# (500 memories take ~8 ms; the full 20k working set ~0.5 s in one go)
+CHUNK_ITEMS = 500
+
+
+def _records(name: str, state: Any) -> Iterator[tuple]:
+    """A component's state as records, its top-level lists split into chunks"""
+    if not isinstance(state, dict):
+        yield ('state', name, state)
+        return
+    lists = [key for key, value in state.items() if isinstance(value, list)]
+    yield ('state', name, {key: [] if key in lists else value for key, value in state.items()})
+    for key in lists:
+        items = state[key]
+        for start in range(0, len(items), CHUNK_ITEMS):
+            yield ('items', name, key, items[start:start + CHUNK_ITEMS])
+
+
+class SnapshotManager:
+    """
+    Checkpoint registered components to one pickle file and restore them.
+
+    A component implements snapshot_state() -> picklable object and
+    restore_state(state). Snapshots are written atomically (temp file +
+    rename) by idle maintenance in bounded steps (see write_steps), at most
+    every interval_s while there are changes. A missing, corrupt, stale or
+    version-mismatched snapshot is ignored, so components keep the state
+    they built on their own.
+    """
+
+    def __init__(self, path: Path, interval_s: Optional[int] = None,
+                 max_age_s: Optional[int] = None):
+        self.path = Path(path)
+        self.interval_s = (
+            interval_s if interval_s is not None
+            else env_int('VIDURAI_SNAPSHOT_INTERVAL_S', DEFAULT_INTERVAL_S)
+        )
+        self.max_age_s = max_age_s if max_age_s is not None else DEFAULT_MAX_AGE_S
+
+        self._components: Dict[str, Any] = {}
+        self._dirty = False
+        self.writes = 0
+        self.last_write_ms: Optional[float] = None
+        self.restored_from: Optional[str] = None
+
+    def register(self, name: str, component: Any):
+        self._components[name] = component
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty
+
+    def mark_dirty(self):
+        """Record that state changed since the last snapshot"""
+        self._dirty = True
+
+    def write(self) -> bool:
+        """Write a snapshot now, in one go (e.g. at shutdown)"""
+        writes = self.writes
+        for _ in self.write_steps():
+            pass
+        return self.writes > writes
+
+    def write_steps(self) -> Iterator[None]:
+        """
+        Write a snapshot, yielding after each bounded step so maintenance
+        can pause for incoming events.
+
+        Component states are captured in the first step (lists are copied
+        there, so later steps pickle that membership); each following step
+        pickles at most CHUNK_ITEMS list items. Changes made meanwhile keep
+        the snapshot dirty for the next run.
+        """
+        created_at = time.time()
+        busy = 0.0
+        self._dirty = False
+        try:
+            resumed = time.time()
+            states = {
+                name: component.snapshot_state()
+                for name, component in self._components.items()
+            }
+            busy += time.time() - resumed
+            yield
+
+            resumed = time.time()
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp, 'wb') as f:
+                # One pickler, so objects shared between chunks are written once
+                pickler = pickle.Pickler(f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickler.dump({'version': SNAPSHOT_VERSION, 'created_at': created_at})
+                for name, state in states.items():
+                    for record in _records(name, state):
+                        pickler.dump(record)
+                        busy += time.time() - resumed
+                        yield
+                        resumed = time.time()
+                pickler.dump(('end',))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            busy += time.time() - resumed
+        except Exception as e:
+            self._dirty = True
+            logger.error("Error writing state snapshot: %s", e)
+            return
+
+        self.writes += 1
+        self.last_write_ms = round(busy * 1000, 1)
+        logger.debug("Wrote state snapshot in %s ms", self.last_write_ms)
+
+    def restore(self) -> List[str]:
+        """Restore components from the snapshot, returning the names restored"""
+        started = time.time()
+        try:
+            with open(self.path, 'rb') as f:
+                unpickler = pickle.Unpickler(f)
+                header = unpickler.load()
+                if not isinstance(header, dict) or header.get('version') != SNAPSHOT_VERSION:
+                    logger.info("State snapshot version changed, rebuilding")
+                    return []
+                age = started - header.get('created_at', 0)
+                if age > self.max_age_s:
+                    logger.info("State snapshot is stale (%.0f h old), rebuilding", age / 3600)
+                    return []
+
+                states: Dict[str, Any] = {}
+                record = unpickler.load()
+                while record[0] != 'end':
+                    if record[0] == 'state':
+                        states[record[1]] = record[2]
+                    else:
+                        _, name, key, items = record
+                        states[name][key].extend(items)
+                    record = unpickler.load()
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            logger.warning("Ignoring unreadable state snapshot: %s", e)
+            return []
+
+        restored = []
+        for name, state in states.items():
+            component = self._components.get(name)
+            if component is None:
+                continue
+            try:
+                component.restore_state(state)
+                restored.append(name)
+            except Exception as e:
+                logger.warning("Could not restore %s from snapshot, rebuilding it: %s", name, e)
+
+        self.restored_from = self.path.name
+        logger.info("Restored %s from snapshot in %.0f ms",
+                    ', '.join(restored) or 'nothing', (time.time() - started) * 1000)
+        return restored
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'path': str(self.path),
+            'interval_s': self.interval_s,
+            'writes': self.writes,
+            'last_write_ms': self.last_write_ms,
+            'restored_from': self.restored_from
+        }
@@ -0,0 +1,54 @@
+"""
+Stdio Transport
+Serves the bridge protocol to one client over stdin/stdout
+"""
+import sys
+import json
+import logging
+import threading
+from typing import Dict, Any, Optional, TextIO
+
+from engine import BridgeEngine
+
+logger = logging.getLogger('vidurai-bridge')
+
+
+class StdioTransport:
+    """Serve the bridge protocol to one client over stdin/stdout"""
+
+    def __init__(self, engine: BridgeEngine, stdin: Optional[TextIO] = None,
+                 stdout: Optional[TextIO] = None):
+        self.engine = engine
+        self.stdin = stdin or sys.stdin
+        self.stdout = stdout or sys.stdout
+
+    def send(self, response: Dict[str, Any]):
+        """Send JSON response to stdout with immediate flush"""
+        json_str = json.dumps(response)
+        self.stdout.write(json_str + '\n')
+        self.stdout.flush()  # Critical: ensure immediate delivery to parent process
+        logger.debug("Sent response: %s", response.get('status', 'unknown'))
+
+    def _read(self):
+        """Reader thread: queue each line with the time it arrived"""
+        try:
+            for line in iter(self.stdin.readline, ''):
+                self.engine.submit_line(line, self.send)
+        except Exception:
+            logger.exception("Error reading stdin")
+        finally:
+            self.engine.close_inbox()
+
+    def serve(self):
+        """Main loop: read from stdin, process, write to stdout"""
+        logger.info("Bridge started, waiting for events...")
+
+        # Reading on a separate thread lets us measure queueing delay and depth
+        reader = threading.Thread(
+            target=self._read,
+            name='vidurai-stdin-reader',
+            daemon=True
+        )
+        reader.start()
+
+        self.engine.serve_inbox()
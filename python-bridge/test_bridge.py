@@ -1,14 +1,45 @@
 """
 Unit Tests for Vidurai Bridge
 """
+import io
+import os
 import json
+import pickle
+import random
+import logging
+import sqlite3
 import subprocess
 import pytest
 import time
 from pathlib import Path
+from datetime import timedelta
 
 from event_processor import EventProcessor, SECRET_PATTERNS
 from gist_extractor import GistExtractor
+from profiler import BridgeProfiler
+from memory_budget import MemoryBudget
+from vidurai_manager import ViduraiManager
+from metrics import BridgeMetrics, parse_client_timestamp
+from transfer import export_memories, import_memories, open_ndjson
+from semantic_index import SemanticIndex, NUMPY_AVAILABLE, tokenize
+from dedup import Deduplicator, simhash, hamming
+from rollups import ActivityRollups, bucket_start
+from secret_scan import SecretScanner, split_chunks
+from snapshot import SnapshotManager
+from maintenance import MaintenanceScheduler
+from deadlines import Deadline, DeadlineExceeded
+from interning import MemoryMetadata, StringTable, dictionary_encode
+from engine import BridgeEngine
+from stdio_transport import StdioTransport
+from error_index import ErrorIndex, extract_error_lines, fingerprint, normalize_error
+from bridge_logging import RateLimitFilter, RingBufferHandler, configure_logging
+from benchmarks import (
+    REFERENCE, build_benchmarks, build_corpus, compare, load_baseline, run as run_benchmarks
+)
+from pagination import encode_cursor, decode_cursor, project, validate_fields
+from ingest import (
+    Ingestor, classify_batch, iter_bash_history, iter_zsh_history, save_checkpoint
+)
 from vidurai.core.data_structures_v3 import SalienceLevel
 
 
@@ -60,6 +91,16 @@ class TestEventProcessor:
         )
         assert result['salience'] == SalienceLevel.HIGH
 
+    def test_salience_fix_commit(self):
+        """Test HIGH salience for bug-fix commits"""
+        result = self.processor.process_git_commit('Fix crash on save', ['src/app.py'])
+        assert result['salience'] == SalienceLevel.HIGH
+
+    def test_salience_docs_commit(self):
+        """Test LOW salience for documentation-only commits"""
+        result = self.processor.process_git_commit('Update docs', ['README.md'])
+        assert result['salience'] == SalienceLevel.LOW
+
     def test_secrets_detection_openai(self):
         """Test OpenAI key detection"""
         content = 'OPENAI_API_KEY="sk-abcd1234567890abcd1234567890abcd1234567890abcd12"'
@@ -126,6 +167,1361 @@ class TestGistExtractor:
         assert 'failed' in gist.lower()
 
 
+class TestBridgeProfiler:
+    """Test on-demand profiling"""
+
+    def setup_method(self):
+        self.processor = EventProcessor()
+
+    def test_cpu_profile_summary(self, tmp_path):
+        """Test sampled CPU profile returns top-N and writes .prof"""
+        profiler = BridgeProfiler(profile_dir=tmp_path)
+        profiler.start(event_types=['file_edit'], sample_rate=1.0, mode='cpu')
+
+        with profiler.profile('file_edit'):
+            self.processor.process_file_edit('main.py', 'def main(): pass')
+
+        summary = profiler.stop(top_n=5)
+        assert summary['sampled_events'] == {'file_edit': 1}
+        assert 0 < len(summary['top_cpu']) <= 5
+        assert any(f.endswith('.prof') for f in summary['files'])
+        assert not profiler.active
+
+    def test_profile_scoped_to_event_types(self, tmp_path):
+        """Test events outside the chosen types are not sampled"""
+        profiler = BridgeProfiler(profile_dir=tmp_path)
+        profiler.start(event_types=['file_edit'], sample_rate=1.0)
+
+        with profiler.profile('diagnostic'):
+            self.processor.process_diagnostic('main.py', 'error', 'Boom')
+
+        summary = profiler.stop()
+        assert summary['sampled_events'] == {}
+        assert summary['files'] == []
+
+    def test_alloc_profile_snapshot(self, tmp_path):
+        """Test allocation profiling writes a tracemalloc snapshot"""
+        profiler = BridgeProfiler(profile_dir=tmp_path)
+        profiler.start(sample_rate=1.0, mode='alloc')
+
+        with profiler.profile('file_edit'):
+            self.processor.process_file_edit('main.py', 'x = 1\n' * 1000)
+
+        summary = profiler.stop()
+        assert 'top_alloc' in summary
+        assert any(f.endswith('.snapshot') for f in summary['files'])
+
+    def test_bad_env_settings_ignored(self, tmp_path, monkeypatch):
+        """Test invalid profiling settings from the environment don't raise"""
+        profiler = BridgeProfiler(profile_dir=tmp_path)
+        monkeypatch.setenv('VIDURAI_BRIDGE_PROFILE_MODE', 'gpu')
+        assert not profiler.configure_from_env('all')
+        monkeypatch.setenv('VIDURAI_BRIDGE_PROFILE_MODE', 'cpu')
+        monkeypatch.setenv('VIDURAI_BRIDGE_PROFILE_RATE', '5')
+        assert not profiler.configure_from_env('all')
+        assert not profiler.active
+
+    def test_invalid_mode_rejected(self, tmp_path):
+        """Test unknown profile modes are rejected"""
+        profiler = BridgeProfiler(profile_dir=tmp_path)
+        with pytest.raises(ValueError):
+            profiler.start(mode='gpu')
+
+
+class TestMemoryBudget:
+    """Test memory budget enforcement and eviction"""
+
+    def _manager(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('HOME', str(tmp_path))
+        return ViduraiManager(session_id='budget-test')
+
+    def test_evicts_lowest_salience_oldest_first(self, tmp_path, monkeypatch):
+        """Test eviction order and archive of evicted memories"""
+        manager = self._manager(tmp_path, monkeypatch)
+        manager.remember('old low', {'type': 'file_edit'}, SalienceLevel.LOW)
+        manager.remember('critical', {'type': 'diagnostic'}, SalienceLevel.CRITICAL)
+        manager.remember('new low', {'type': 'file_edit'}, SalienceLevel.LOW)
+
+        assert manager.evict(2) == 2
+
+        remaining = [m.gist for m in manager.memory.memories]
+        assert remaining == ['critical']
+        archived = [m['gist'] for m in manager.iter_evicted()]
+        assert archived == ['old low', 'new low']
+
+    def test_enforces_working_set_cap(self, tmp_path, monkeypatch):
+        """Test the working set is trimmed below max_memories"""
+        manager = self._manager(tmp_path, monkeypatch)
+        budget = MemoryBudget(
+            size_fn=manager.working_set_size,
+            evict_fn=manager.evict,
+            rss_budget_mb=0,
+            max_memories=10,
+            check_every=1
+        )
+
+        for i in range(11):
+            manager.remember(
+                f'edit {i}', {'type': 'file_edit', 'file': f'f{i}.py'}, SalienceLevel.MEDIUM
+            )
+            budget.note_write()
+
+        assert manager.working_set_size() == 9
+        report = budget.report()
+        assert report['memories_evicted'] == 2
+        assert report['max_memories'] == 10
+
+    def test_clears_caches_when_rss_over_budget(self, tmp_path, monkeypatch):
+        """Test caches are dropped once evicting memories is not enough"""
+        manager = self._manager(tmp_path, monkeypatch)
+        cache = {'a': 1, 'b': 2}
+
+        def clear_cache():
+            freed = len(cache)
+            cache.clear()
+            return freed
+
+        budget = MemoryBudget(
+            size_fn=manager.working_set_size,
+            evict_fn=manager.evict,
+            rss_budget_mb=1,  # Always exceeded
+            max_memories=0
+        )
+        budget.register_cache('test', lambda: len(cache), clear_cache)
+
+        freed = budget.enforce()
+        assert freed['cache_entries'] == 2
+        assert budget.report()['caches'] == {'test': 0}
+
+    def test_engine_registers_caches(self, tmp_path, monkeypatch):
+        """Test the bridge's droppable caches are reported and cleared in order"""
+        monkeypatch.setenv('HOME', str(tmp_path))
+        engine = BridgeEngine(session_id='budget-test', scan_cache_path=tmp_path / 'scan.json')
+        engine.submit({'type': 'file_edit', 'file': 'a.py', 'content': 'x = 1\n' * 100})
+        caches = engine.memory_budget.report()['caches']
+        assert list(caches) == ['secret_scan', 'dedup', 'interned_strings']
+        assert caches['secret_scan'] > 0 and caches['dedup'] == 1
+
+    def test_evicted_archive_rotates(self, tmp_path, monkeypatch):
+        """Test the archive is rotated at its size cap and both files are read back"""
+        manager = self._manager(tmp_path, monkeypatch)
+        manager.evicted_max_bytes = 1
+        for gist in ('first', 'second', 'third'):
+            manager.remember(gist, {'type': 'file_edit', 'file': f'{gist}.py'}, SalienceLevel.LOW)
+            manager.evict(1)
+
+        assert [m['gist'] for m in manager.iter_evicted()] == ['second', 'third']
+        assert len(list(manager.session_dir.glob('budget-test.evicted.ndjson*'))) == 2
+
+
+class TestBridgeMetrics:
+    """Test lag measurement and health reporting"""
+
+    def test_parse_client_timestamp(self):
+        """Test ISO 8601 (JS toISOString) and epoch-ms timestamps"""
+        assert parse_client_timestamp('1970-01-01T00:00:01.500Z') == 1.5
+        assert parse_client_timestamp(2500) == 2.5
+        assert parse_client_timestamp('not a timestamp') is None
+        assert parse_client_timestamp(None) is None
+
+    def test_lag_and_processing_percentiles(self):
+        """Test lag is measured from the client timestamp"""
+        metrics = BridgeMetrics()
+        for i in range(100):
+            metrics.begin()
+            metrics.record('file_edit', 1000 * 1000, 1000.0 + i / 1000.0,
+                           1000.1, 1000.1 + i / 1000.0)
+
+        health = metrics.health()
+        assert health['events_total'] == 100
+        assert health['in_flight'] == 0
+        assert health['lag_ms']['p50'] == pytest.approx(50, abs=1)
+        assert health['processing_ms']['max'] == pytest.approx(99, abs=1)
+        assert not health['degraded']
+
+    def test_degraded_when_queue_backs_up(self):
+        """Test a deep queue marks the bridge as degraded"""
+        health = BridgeMetrics().health(queued=100)
+        assert health['degraded']
+        assert health['queued'] == 100
+
+    def test_load_hint_tracks_backlog(self):
+        """Test the load hint asks clients to slow down and batch as the queue grows"""
+        metrics = BridgeMetrics()
+        for _ in range(50):
+            metrics.begin()
+            metrics.record('file_edit', None, 1000.0, 1000.0, 1000.1)
+
+        idle = metrics.load_hint(0)
+        assert idle == {'queue_depth': 0, 'min_debounce_ms': 0, 'batch_size': 1}
+
+        busy = metrics.load_hint(12)
+        assert busy['min_debounce_ms'] == pytest.approx(1200, abs=10)
+        assert busy['batch_size'] == 3
+        assert metrics.load_hint(10 ** 6)['min_debounce_ms'] == 60000
+
+
+class TestIngest:
+    """Test offline bulk ingest of shell history"""
+
+    def test_bash_history_timestamps_and_offsets(self, tmp_path):
+        """Test HISTTIMEFORMAT lines attach to the following command"""
+        history = tmp_path / '.bash_history'
+        history.write_text('#1700000000\nnpm test\nls\n')
+
+        records = list(iter_bash_history(history))
+        assert [r['command'] for r in records] == ['npm test', 'ls']
+        assert records[0]['timestamp'] == 1700000000
+        assert records[1]['timestamp'] is None
+        assert records[-1]['offset'] == history.stat().st_size
+
+    def test_zsh_extended_multiline(self, tmp_path):
+        """Test zsh extended format and backslash continuations"""
+        history = tmp_path / '.zsh_history'
+        history.write_text(': 1700000000:0;echo one \\\ntwo\n: 1700000001:0;git status\n')
+
+        records = list(iter_zsh_history(history))
+        assert [r['command'] for r in records] == ['echo one \ntwo', 'git status']
+        assert records[1]['timestamp'] == 1700000001
+
+    def test_classify_batch_redacts_secrets(self):
+        """Test exported keys in history are never stored"""
+        key = 'sk-' + 'a' * 48
+        classified = classify_batch([{
+            'kind': 'terminal',
+            'command': f'export OPENAI_API_KEY={key}',
+            'timestamp': None,
+            'offset': 1
+        }])
+        assert key not in classified[0]['verbatim']
+        assert key not in classified[0]['gist']
+        assert classified[0]['created_at'] is None
+
+    def test_resume_from_checkpoint(self, tmp_path):
+        """Test a resumed run only reads entries added since the checkpoint"""
+        history = tmp_path / '.bash_history'
+        history.write_text('ls\npwd\n')
+        checkpoint = tmp_path / 'checkpoint.json'
+
+        first = Ingestor(workers=1, checkpoint_path=checkpoint, dry_run=True)
+        assert first.ingest_source('bash', history) == 2
+        save_checkpoint(checkpoint, first.checkpoint)
+
+        with open(history, 'a') as f:
+            f.write('make build\n')
+
+        second = Ingestor(workers=1, checkpoint_path=checkpoint, dry_run=True)
+        assert second.ingest_source('bash', history) == 1
+
+
+class TestDeadlines:
+    """Test client deadlines and cancellation checkpoints"""
+
+    def test_deadline_from_event(self):
+        """Test epoch-ms deadlines expire and missing ones never do"""
+        assert not Deadline.from_event({}).expired()
+        past = Deadline.from_event({'_deadline': (time.time() - 1) * 1000})
+        assert past.expired()
+        with pytest.raises(DeadlineExceeded):
+            past.check('recall')
+        Deadline.from_event({'_deadline': (time.time() + 60) * 1000}).check()
+
+    def test_sqlite_query_interrupted(self):
+        """Test a long query is aborted once the deadline passes"""
+        conn = sqlite3.connect(':memory:')
+        deadline = Deadline(time.time() + 0.05)
+        started = time.time()
+        with pytest.raises(DeadlineExceeded):
+            with deadline.guard_sqlite(conn):
+                conn.execute(
+                    'WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) '
+                    'SELECT count(*) FROM (SELECT i FROM n LIMIT 100000000)'
+                ).fetchall()
+        assert time.time() - started < 5
+        assert conn.execute('SELECT 1').fetchone() == (1,)
+
+    def test_recall_checkpoint(self, tmp_path, monkeypatch):
+        """Test recall stops at a checkpoint without touching access counts"""
+        monkeypatch.setenv('HOME', str(tmp_path))
+        manager = ViduraiManager(session_id='deadline-test')
+        memory_id = manager.remember('Fixed parser bug', {'type': 'file_edit', 'file': 'parser.py'},
+                                     SalienceLevel.HIGH)
+        accesses = manager._by_id[memory_id].access_count
+
+        with pytest.raises(DeadlineExceeded):
+            manager.recall_page('parser', deadline=Deadline(time.time() - 1))
+        assert manager._by_id[memory_id].access_count == accesses
+
+    def test_sdk_queries_checkpoint(self, tmp_path, monkeypatch):
+        """Test database and context queries stop at their checkpoints and interrupt SQLite"""
+        monkeypatch.setenv('HOME', str(tmp_path))
+        manager = ViduraiManager(session_id='deadline-test')
+        calls = []
+        monkeypatch.setattr(manager.memory, 'get_context_for_ai',
+                            lambda **kwargs: calls.append(kwargs), raising=False)
+        with pytest.raises(DeadlineExceeded):
+            manager.get_context_for_ai('/proj', deadline=Deadline(time.time() - 1))
+        assert calls == []
+
+        class SlowDatabase:
+            conn = sqlite3.connect(':memory:')
+
+            def recall_memories(self, **kwargs):
+                return self.conn.execute(
+                    'WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n) '
+                    'SELECT count(*) FROM (SELECT i FROM n LIMIT 100000000)'
+                ).fetchall()
+
+        monkeypatch.setattr(manager, 'db', SlowDatabase())
+        monkeypatch.setattr('vidurai_manager.DBSalienceLevel', SalienceLevel, raising=False)
+        started = time.time()
+        with pytest.raises(DeadlineExceeded):
+            manager.recall_from_database('/proj', deadline=Deadline(time.time() + 0.05))
+        assert time.time() - started < 5
+
+    def test_expired_request_skipped(self):
+        """Test the bridge skips queued work past its deadline and counts it"""
+        proc = subprocess.Popen(
+            ['python', 'bridge.py'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1
+        )
+
+        try:
+            proc.stdin.write(json.dumps({'type': 'ping', '_id': 1, '_deadline': 1000}) + '\n')
+            proc.stdin.write(json.dumps({'type': 'health', '_id': 2}) + '\n')
+            proc.stdin.flush()
+
+            skipped = json.loads(proc.stdout.readline())
+            health = json.loads(proc.stdout.readline())
+            assert skipped['status'] == 'deadline_exceeded'
+            assert skipped['_id'] == 1
+            assert health['health']['deadline_exceeded']['queued'] == 1
+        finally:
+            proc.terminate()
+            proc.wait(timeout=2)
+
+
+class TestMaintenance:
+    """Test the idle-time maintenance scheduler"""
+
+    def _scheduler(self, steps, log):
+        scheduler = MaintenanceScheduler(idle_after_s=1, slice_s=10)
+        scheduler._last_activity -= 2
+
+        def task():
+            for i in range(steps):
+                log.append(i)
+                yield
+
+        scheduler.register('task', task, interval_s=60, pending=lambda: steps - len(log))
+        return scheduler
+
+    def test_runs_only_when_idle(self):
+        """Test tasks wait for the idle period and then run to completion"""
+        log = []
+        scheduler = self._scheduler(3, log)
+        scheduler.note_activity()
+        assert scheduler.wait_timeout() == pytest.approx(1, abs=0.1)
+        assert not scheduler.run_slice()
+
+        scheduler._last_activity -= 2
+        assert scheduler.run_slice()
+        assert log == [0, 1, 2]
+        stats = scheduler.stats()['tasks']['task']
+        assert stats['runs'] == 1
+        assert stats['pending'] == 0
+        assert stats['last_run'] is not None
+        assert scheduler.wait_timeout() == pytest.approx(60, abs=1)
+
+    def test_preempted_by_new_event_and_resumed(self):
+        """Test a run pauses when an event arrives and resumes where it left off"""
+        log = []
+        scheduler = self._scheduler(10, log)
+
+        scheduler.run_slice(preempt=lambda: len(log) >= 4)
+        assert log == [0, 1, 2, 3]
+        stats = scheduler.stats()['tasks']['task']
+        assert stats['state'] == 'paused'
+        assert stats['preemptions'] == 1
+        assert scheduler.wait_timeout() == 0
+
+        scheduler.run_slice()
+        assert log == list(range(10))
+        assert scheduler.stats()['tasks']['task']['runs'] == 1
+
+    def test_failing_task_is_reported(self):
+        """Test a task error is recorded and the task is rescheduled"""
+        scheduler = MaintenanceScheduler(idle_after_s=1)
+        scheduler._last_activity -= 2
+
+        def broken():
+            raise RuntimeError('disk full')
+            yield
+
+        scheduler.register('broken', broken, interval_s=60)
+        scheduler.run_slice()
+        stats = scheduler.stats()['tasks']['broken']
+        assert stats['last_error'] == 'disk full'
+        assert stats['state'] == 'idle'
+
+    def test_prune_old_noise(self, tmp_path, monkeypatch):
+        """Test old NOISE memories are archived and dropped, others kept"""
+        monkeypatch.setenv('HOME', str(tmp_path))
+        manager = ViduraiManager(session_id='maintenance-test')
+        old_id = manager.remember(
+            'progress bar', {'type': 'terminal', 'command': 'npm i'}, SalienceLevel.NOISE
+        )
+        manager.remember(
+            'progress bar 2', {'type': 'terminal', 'command': 'pip install'}, SalienceLevel.NOISE
+        )
+        manager.remember(
+            'Edited app.py', {'type': 'file_edit', 'file': 'app.py'}, SalienceLevel.HIGH
+        )
+        manager._by_id[old_id].created_at -= timedelta(days=2)
+
+        assert manager.noise_backlog() == 1
+        assert manager.prune_noise() == 1
+        assert old_id not in {m.engram_id for m in manager.memory.memories}
+        assert [e['engram_id'] for e in manager.iter_evicted()] == [old_id]
+
+    @pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed")
+    def test_reindex_skips_memories_without_terms(self, tmp_path, monkeypatch):
+        """Test memories with no indexable terms don't keep the backfill busy"""
+        monkeypatch.setenv('HOME', str(tmp_path))
+        manager = ViduraiManager(session_id='maintenance-test')
+        manager.remember('Edited app.py', {'type': 'file_edit'}, SalienceLevel.HIGH)
+        manager.remember('!!! ??', {}, SalienceLevel.LOW)
+        manager.semantic_index = SemanticIndex()
+        manager._unindexable.clear()
+
+        assert manager.index_backlog() == 2
+        assert manager.reindex_missing() == 2
+        assert manager.reindex_missing() == 0
+        assert manager.index_backlog() == 0
+
+
+class TestInterning:
+    """Test shared strings, slotted metadata and dictionary encoding"""
+
+    def test_metadata_behaves_like_dict(self):
+        """Test slotted metadata supports the dict operations the SDK uses"""
+        source = {'type': 'file_edit', 'file': 'src/app.py', 'salience': 'HIGH', 'line': 4}
+        metadata = MemoryMetadata(source)
+        assert metadata == source
+        assert metadata.get('command') is None
+        assert metadata['line'] == 4
+
+        metadata['occurrence_count'] = 2
+        del metadata['line']
+        assert dict(metadata) == {'type': 'file_edit', 'file': 'src/app.py',
+                                  'salience': 'HIGH', 'occurrence_count': 2}
+        assert not hasattr(metadata, '__dict__')
+        assert pickle.loads(pickle.dumps(metadata)) == metadata
+
+    def test_paths_are_shared(self):
+        """Test equal paths from separate events share one string object"""
+        first = MemoryMetadata({'file': ''.join(['src/', 'shared.py'])})
+        second = MemoryMetadata({'file': ''.join(['src/', 'shared.py'])})
+        assert first['file'] is second['file']
+
+        table = StringTable(max_size=1)
+        assert table.id_of('a') == 0
+        assert table.id_of('b') is None
+
+    def test_dictionary_encode(self):
+        """Test repeated paths and types are sent once in the string table"""
+        records = [
+            {'gist': 'one', 'metadata': MemoryMetadata({'type': 'file_edit', 'file': 'a.py'})},
+            {'gist': 'two', 'metadata': {'type': 'file_edit', 'file': 'a.py'}},
+            {'gist': 'three', 'file_path': 'b.py', 'event_type': 'diagnostic'},
+        ]
+        encoded, strings = dictionary_encode(records)
+        assert strings == ['file_edit', 'a.py', 'b.py', 'diagnostic']
+        assert encoded[1] == {'gist': 'two', 'metadata': {'type': 0, 'file': 1}}
+        assert encoded[2] == {'gist': 'three', 'file_path': 2, 'event_type': 3}
+
+
+class TestPagination:
+    """Test keyset cursors and field projection"""
+
+    def test_cursor_roundtrip(self):
+        """Test cursors decode back to the key they were built from"""
+        key = [3, '2025-01-01T10:00:00', 'abc']
+        assert decode_cursor(encode_cursor(key)) == key
+        assert decode_cursor(None) is None
+
+        with pytest.raises(ValueError):
+            decode_cursor('not a cursor!')
+
+    def test_projection(self):
+        """Test only requested fields are returned"""
+        record = {'id': 1, 'gist': 'g', 'verbatim': 'long text'}
+        assert project(record, ['id', 'gist']) == {'id': 1, 'gist': 'g'}
+        assert project(record, None) == record
+
+        with pytest.raises(ValueError):
+            validate_fields(['gist', 'password'], ['gist', 'id'])
+
+    def test_recall_page_only_accesses_returned(self, tmp_path, monkeypatch):
+        """Test pages are disjoint and only returned memories count as accessed"""
+        monkeypatch.setenv('HOME', str(tmp_path))
+        manager = ViduraiManager(session_id='pagination-test')
+        for i in range(5):
+            manager.remember(f'Edited page{i}.py', {'type': 'file_edit', 'file': f'page{i}.py'},
+                             SalienceLevel.MEDIUM)
+        manager.remember(
+            'Ran pytest', {'type': 'terminal', 'command': 'pytest'}, SalienceLevel.HIGH
+        )
+
+        first, cursor = manager.recall_page('', limit=2)
+        assert first[0].gist == 'Ran pytest'
+        assert sum(m.access_count for m in manager.memory.memories) == 2
+
+        second, cursor = manager.recall_page('', limit=4, cursor=cursor)
+        assert cursor is None
+        assert len(second) == 4
+        assert not {m.engram_id for m in first} & {m.engram_id for m in second}
+        assert sum(m.access_count for m in manager.memory.memories) == 6
+
+    def test_recall_context_pages(self):
+        """Test recall_context returns projected pages with a cursor"""
+        proc = subprocess.Popen(
+            ['python', 'bridge.py'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1
+        )
+
+        try:
+            for i in range(3):
+                proc.stdin.write(json.dumps({
+                    'type': 'file_edit', 'file': f'page{i}.py', 'content': f'x = {i}'
+                }) + '\n')
+            proc.stdin.write(json.dumps({
+                'type': 'recall_context', 'query': '', 'top_k': 2,
+                'fields': ['memory_id', 'salience']
+            }) + '\n')
+            proc.stdin.flush()
+
+            for _ in range(3):
+                proc.stdout.readline()
+            first = json.loads(proc.stdout.readline())
+
+            assert first['count'] == 2
+            assert set(first['memories'][0]) == {'memory_id', 'salience'}
+            assert first['next_cursor']
+
+            proc.stdin.write(json.dumps({
+                'type': 'recall_context', 'query': '', 'top_k': 2,
+                'fields': ['memory_id'], 'cursor': first['next_cursor']
+            }) + '\n')
+            proc.stdin.flush()
+            second = json.loads(proc.stdout.readline())
+
+            first_ids = {m['memory_id'] for m in first['memories']}
+            assert second['count'] >= 1
+            assert not first_ids & {m['memory_id'] for m in second['memories']}
+
+            proc.stdin.write(json.dumps({
+                'type': 'recall_context', 'query': '', 'top_k': 3,
+                'fields': ['metadata'], 'encoding': 'dict'
+            }) + '\n')
+            proc.stdin.flush()
+            encoded = json.loads(proc.stdout.readline())
+            assert encoded['encoding'] == 'dict'
+            assert all(isinstance(m['metadata']['type'], int) for m in encoded['memories'])
+            assert 'file_edit' in encoded['strings']
+        finally:
+            proc.terminate()
+            proc.wait(timeout=2)
+
+
+class TestTransfer:
+    """Test NDJSON export and import"""
+
+    class _RecordingManager:
+        """Stands in for a database-backed manager, recording bulk inserts"""
+        db = True
+
+        def __init__(self):
+            self.batches = []
+
+        def store_many(self, project_path, records):
+            self.batches.append(list(records))
+            return len(records)
+
+    def test_export_working_set_gzip(self, tmp_path, monkeypatch):
+        """Test export falls back to working set and evicted archive"""
+        monkeypatch.setenv('HOME', str(tmp_path))
+        manager = ViduraiManager(session_id='export-test')
+        manager.db = None
+        manager.remember('kept', {'type': 'file_edit', 'file': 'a.py', 'project_path': '/proj'},
+                         SalienceLevel.HIGH)
+        manager.remember(
+            'evicted', {'type': 'terminal', 'project_path': '/proj'}, SalienceLevel.LOW
+        )
+        manager.remember('elsewhere', {'type': 'terminal', 'project_path': '/other'},
+                         SalienceLevel.MEDIUM)
+        manager.evict(1)
+
+        out = tmp_path / 'memories.ndjson.gz'
+        summary = export_memories(manager, '/proj', out)
+
+        assert summary['exported'] == 2
+        assert out.read_bytes()[:2] == b'\x1f\x8b'
+        with open_ndjson(out, 'r') as f:
+            lines = [json.loads(line) for line in f]
+        assert lines[0]['vidurai_export'] == 1
+        assert [r['gist'] for r in lines[1:]] == ['kept', 'evicted']
+        assert lines[1]['file_path'] == 'a.py'
+
+        def interrupt(update):
+            raise OSError('disk full')
+
+        monkeypatch.setattr('transfer.PROGRESS_EVERY', 1)
+        with pytest.raises(OSError):
+            export_memories(manager, '/proj', tmp_path / 'partial.ndjson', progress=interrupt)
+        assert not list(tmp_path.glob('partial.ndjson*'))
+
+    def test_import_batches_and_skips_bad_lines(self, tmp_path):
+        """Test import inserts in batches and skips malformed records"""
+        source = tmp_path / 'memories.ndjson'
+        with open(source, 'w') as f:
+            f.write(json.dumps({'vidurai_export': 1}) + '\n')
+            for i in range(5):
+                f.write(json.dumps({
+                    'verbatim': f'v{i}', 'gist': f'g{i}', 'salience': 'MEDIUM',
+                    'event_type': 'file_edit'
+                }) + '\n')
+            f.write('not json\n')
+            f.write(json.dumps({'gist': 'missing fields'}) + '\n')
+
+        manager = self._RecordingManager()
+        progress = []
+        summary = import_memories(manager, '/proj', source, progress.append, batch_size=2)
+
+        assert summary['imported'] == 5
+        assert summary['skipped'] == 2
+        assert [len(b) for b in manager.batches] == [2, 2, 1]
+        assert progress[-1]['imported'] == 4
+
+    def test_import_requires_database(self, tmp_path, monkeypatch):
+        """Test import refuses to run without a database"""
+        monkeypatch.setenv('HOME', str(tmp_path))
+        manager = ViduraiManager(session_id='import-test')
+        manager.db = None
+        source = tmp_path / 'empty.ndjson'
+        source.write_text('')
+
+        with pytest.raises(RuntimeError):
+            import_memories(manager, '/proj', source)
+
+
+class TestSecretScanner:
+    """Test chunked, cached secret scanning"""
+
+    DOC = '\n\n'.join(f'def f{i}(x):\n    return x + {i}\n' * 20 for i in range(50))
+
+    def test_chunks_concatenate_back(self):
+        """Test chunking is lossless and bounded"""
+        chunks = split_chunks(self.DOC + 'x' * 20000)
+        assert ''.join(chunks) == self.DOC + 'x' * 20000
+        assert max(len(c) for c in chunks) <= 8192
+
+    def test_only_changed_chunks_rescanned(self):
+        """Test an edit rescans only the chunks around it"""
+        scanner = SecretScanner(SECRET_PATTERNS)
+        assert not scanner.contains_secrets(self.DOC)
+        first_pass = scanner.chunks_scanned
+
+        middle = len(self.DOC) // 2
+        edited = self.DOC[:middle] + 'api_key = "abcdefghijklmnopqrstuvwxyz"' + self.DOC[middle:]
+        assert scanner.contains_secrets(edited)
+        assert scanner.chunks_scanned - first_pass <= 2
+
+    def test_edit_near_top_rescans_constant_chunks(self):
+        """Test boundaries follow the content, so an early edit doesn't shift later chunks"""
+        doc = ''.join(f'# note {i:05d} ' + 'lorem ipsum ' * 15 + '\n\n' for i in range(3000))
+        scanner = SecretScanner(SECRET_PATTERNS)
+        scanner.contains_secrets(doc)
+        first_pass = scanner.chunks_scanned
+        assert first_pass > 100
+
+        edited = doc[:20] + 'extra words ' * 40 + doc[20:]
+        scanner.contains_secrets(edited)
+        assert scanner.chunks_scanned - first_pass <= 3
+
+    def test_secret_across_chunk_boundary(self):
+        """Test the overlap catches a secret split by a chunk boundary"""
+        for i in range(1000):
+            content = '#' * 1100 + f' {i} api_key =\n"' + 'a' * 24 + '"\n'
+            chunks = split_chunks(content)
+            if len(chunks) == 2:
+                break
+        assert chunks[0].endswith('api_key =\n')
+        assert SecretScanner(SECRET_PATTERNS).contains_secrets(content)
+
+    def test_cache_persists(self, tmp_path):
+        """Test the cache reloads, and is dropped when patterns change"""
+        path = tmp_path / 'scan.json'
+        scanner = SecretScanner(SECRET_PATTERNS, path)
+        scanner.contains_secrets(self.DOC)
+        scanner.save()
+
+        reloaded = SecretScanner(SECRET_PATTERNS, path)
+        reloaded.contains_secrets(self.DOC)
+        assert reloaded.chunks_scanned == 0
+        assert SecretScanner(SECRET_PATTERNS[:3], path).stats()['cache_entries'] == 0
+
+    def test_file_with_secret_is_critical(self):
+        """Test a file edit with a secret is classified CRITICAL, scanned once"""
+        result = EventProcessor().process_file_edit('main.py', 'password = "hunter2hunter2"')
+        assert result['contains_secrets']
+        assert result['salience'] == SalienceLevel.CRITICAL
+
+
+class TestDeduplicator:
+    """Test near-duplicate memory folding"""
+
+    def test_simhash_distance(self):
+        """Test near-identical gists hash close and different ones far"""
+        a = simhash('Edited foo.py: added function parse at line 12')
+        b = simhash('Edited foo.py: added function parse at line 48')
+        c = simhash('Build failed: missing module requests')
+        assert hamming(a, b) == 0  # Numbers are normalised
+        assert hamming(a, c) > 3
+
+    def test_window_and_key(self):
+        """Test folding needs the same key and a recent occurrence"""
+        dedup = Deduplicator(window_s=60)
+        fp = simhash('Edited foo.py')
+        dedup.add('m1', ('file_edit', 'foo.py'), fp, now=1000)
+
+        assert dedup.find(('file_edit', 'foo.py'), fp, now=1030) == 'm1'
+        assert dedup.find(('file_edit', 'bar.py'), fp, now=1030) is None
+        assert dedup.find(('file_edit', 'foo.py'), fp, now=1100) is None
+        assert dedup.stats()['tracked'] == 0
+
+    def test_manager_folds_repeats(self, tmp_path, monkeypatch):
+        """Test repeated edits fold into one memory with a count"""
+        monkeypatch.setenv('HOME', str(tmp_path))
+        manager = ViduraiManager(session_id='dedup-test')
+        metadata = {'type': 'file_edit', 'file': 'foo.py'}
+
+        first = manager.remember('Edited foo.py', dict(metadata), SalienceLevel.LOW)
+        second = manager.remember('Edited foo.py', dict(metadata), SalienceLevel.LOW)
+        other = manager.remember('Edited foo.py', dict(metadata), SalienceLevel.HIGH)
+
+        assert first == second
+        assert other != first
+        assert manager.working_set_size() == 2
+        assert manager._by_id[first].metadata['occurrence_count'] == 2
+        stats = manager.get_stats()['dedup']
+        assert stats['folded'] == 1
+        assert stats['suppression_rate'] == round(1 / 3, 3)
+
+
+class TestActivityRollups:
+    """Test hourly/daily activity rollups"""
+
+    NOW = 1_700_000_000
+
+    def test_histogram_merges_buckets(self):
+        """Test counts land in hourly buckets and totals merge across the range"""
+        rollups = ActivityRollups(path=None)
+        rollups.record('/proj', 'HIGH', 'file_edit', 'a.py', ts=self.NOW)
+        rollups.record('/proj', 'LOW', 'terminal', ts=self.NOW - 3600)
+        rollups.record('/proj', 'HIGH', 'file_edit', 'a.py', ts=self.NOW - 3600)
+        rollups.record('/other', 'LOW', 'file_edit', 'b.py', ts=self.NOW)
+
+        histogram = rollups.histogram('/proj', 'hour', 3, now=self.NOW)
+        assert histogram['counts'] == [0, 2, 1]
+        assert histogram['total'] == 3
+        assert histogram['by_salience'] == {'HIGH': 2, 'LOW': 1}
+        assert histogram['top_files'] == [('a.py', 2)]
+
+    def test_daily_buckets_and_retention(self):
+        """Test daily buckets and that old hourly buckets are pruned"""
+        rollups = ActivityRollups(path=None)
+        old = self.NOW - 30 * 86400
+        rollups.record('/proj', 'LOW', 'file_edit', ts=old)
+        rollups.record('/proj', 'LOW', 'file_edit', ts=self.NOW)
+
+        assert rollups.histogram('/proj', 'day', 31, now=self.NOW)['total'] == 2
+        assert bucket_start(old, 'hour') not in rollups._projects['/proj']['hour']
+
+        with pytest.raises(ValueError):
+            rollups.histogram('/proj', 'minute')
+
+    def test_save_and_load(self, tmp_path):
+        """Test rollups survive a restart"""
+        path = tmp_path / 'rollups.json'
+        rollups = ActivityRollups(path)
+        rollups.record('/proj', 'MEDIUM', 'diagnostic', 'c.py', ts=self.NOW)
+        rollups.save()
+
+        loaded = ActivityRollups.load(path)
+        histogram = loaded.histogram('/proj', 'hour', 1, now=self.NOW)
+        assert histogram['counts'] == [1]
+        assert histogram['by_type'] == {'diagnostic': 1}
+
+    def test_bridges_save_own_file_and_read_peers(self, tmp_path):
+        """Test two bridges' saves don't overwrite each other and both are counted"""
+        first = ActivityRollups(tmp_path / 'rollups.a.json', peer_pattern='rollups*.json')
+        second = ActivityRollups(tmp_path / 'rollups.b.json', peer_pattern='rollups*.json')
+        first.record('/proj', 'HIGH', 'file_edit', 'a.py', ts=self.NOW)
+        second.record('/proj', 'LOW', 'terminal', ts=self.NOW)
+        first.save()
+        second.save()
+
+        assert first.histogram('/proj', 'hour', 1, now=self.NOW)['counts'] == [2]
+        restarted = ActivityRollups.load(tmp_path / 'rollups.a.json', peer_pattern='rollups*.json')
+        assert restarted.histogram('/proj', 'hour', 1, now=self.NOW)['by_type'] == {
+            'file_edit': 1, 'terminal': 1
+        }
+
+    def test_restore_keeps_newer_saved_counts(self, tmp_path):
+        """Test an older snapshot doesn't replace counts saved after it"""
+        rollups = ActivityRollups(tmp_path / 'rollups.json')
+        rollups.record('/proj', 'LOW', 'terminal', ts=self.NOW)
+        state = pickle.loads(pickle.dumps(rollups.snapshot_state()))
+        rollups.record('/proj', 'LOW', 'terminal', ts=self.NOW + 1)
+        rollups.save()
+
+        loaded = ActivityRollups.load(tmp_path / 'rollups.json')
+        loaded.restore_state(state)
+        assert loaded.histogram('/proj', 'hour', 1, now=self.NOW)['total'] == 2
+
+
+@pytest.mark.skipif(not NUMPY_AVAILABLE, reason="numpy not installed")
+class TestSemanticIndex:
+    """Test TF-IDF semantic recall"""
+
+    def _index(self, path=None):
+        index = SemanticIndex(path)
+        index.add_many([
+            ('db', 'Fixed database connection timeout in pool.py'),
+            ('css', 'Edited README styles and layout'),
+            ('cfg', 'Added parseConfig loader'),
+        ])
+        return index
+
+    def test_ranks_related_memories_first(self):
+        """Test the closest memory ranks first and camelCase parts match"""
+        index = self._index()
+        assert tokenize('parseConfig') == ['parseconfig', 'parse', 'config']
+        assert index.search('database timeout')[0][0] == 'db'
+        assert index.search('config')[0][0] == 'cfg'
+
+    def test_batched_matches_single_queries(self):
+        """Test search_many returns the same hits as one query at a time"""
+        index = self._index()
+        queries = ['database timeout', 'readme layout', 'config loader']
+        assert index.search_many(queries, 2) == [index.search(q, 2) for q in queries]
+
+    def test_keyset_paging_and_remove(self):
+        """Test pages continue after the cursor and removed ids disappear"""
+        index = SemanticIndex()
+        index.add_many((f'm{i}', f'edited module file {i}') for i in range(10))
+        first = index.search('module', 4)
+        second = index.search('module', 4, after=first[-1][1:])
+        assert len(second) == 4
+        assert not {h[0] for h in first} & {h[0] for h in second}
+
+        index.remove(['m0'])
+        assert 'm0' not in {h[0] for h in index.search('module', 10)}
+
+    def test_single_term_precision(self):
+        """Test single-term queries only return memories containing the term"""
+        rng = random.Random(7)
+        letters = 'abcdefghijklmnopqrstuvwxyz'
+        vocab = sorted({''.join(rng.choice(letters) for _ in range(8)) for _ in range(2000)})
+        docs = {f'm{i}': rng.sample(vocab, 6) for i in range(5000)}
+        index = SemanticIndex()
+        index.add_many((mid, ' '.join(words)) for mid, words in docs.items())
+
+        for term in vocab[:50]:
+            hits = index.search(term, 5)
+            assert hits
+            assert all(term in docs[mid] for mid, _, _ in hits)
+        assert index.search('notindexed') == []
+
+    def test_remove_updates_document_frequencies(self):
+        """Test removed memories no longer count towards IDF"""
+        index = SemanticIndex()
+        index.add_many([('a', 'shared alpha'), ('b', 'shared beta'), ('c', 'gamma shared')])
+        fresh = SemanticIndex()
+        fresh.add_many([('c', 'gamma shared')])
+
+        index.remove(['a', 'b'])
+        assert len(index) == index._docs == 1
+        assert index._df[index._terms['alpha']] == 0
+        assert index.search('alpha') == []
+        score = index.search('gamma shared')[0][1]
+        assert score == pytest.approx(fresh.search('gamma shared')[0][1])
+
+    def test_save_and_mmap_reload(self, tmp_path):
+        """Test the index persists, reloads memory-mapped and keeps appending"""
+        index = self._index(tmp_path / 'index')
+        index.remove(['css'])
+        index.save()
+
+        loaded = SemanticIndex.load(tmp_path / 'index')
+        assert len(loaded) == 2
+        assert loaded.search('database timeout')[0][0] == 'db'
+
+        loaded.add('new', 'database migration script')
+        assert {h[0] for h in loaded.search('database', 5)} == {'db', 'new'}
+
+
+class TestSnapshot:
+    """Test warm-restart state snapshots"""
+
+    def _manager(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('HOME', str(tmp_path))
+        manager = ViduraiManager(session_id='snapshot-test')
+        snapshots = SnapshotManager(tmp_path / 'state.snapshot.pkl')
+        snapshots.register('manager', manager)
+        return manager, snapshots
+
+    def test_restores_working_set_and_dedup(self, tmp_path, monkeypatch):
+        """Test a restarted manager gets back its memories and still folds repeats"""
+        manager, snapshots = self._manager(tmp_path, monkeypatch)
+        metadata = {'type': 'file_edit', 'file': 'foo.py'}
+        memory_id = manager.remember('Edited foo.py', dict(metadata), SalienceLevel.LOW)
+        manager.remember(
+            'Ran pytest', {'type': 'terminal', 'command': 'pytest'}, SalienceLevel.HIGH
+        )
+        assert snapshots.write()
+
+        restarted, snapshots = self._manager(tmp_path, monkeypatch)
+        assert snapshots.restore() == ['manager']
+        assert restarted.working_set_size() == 2
+        assert restarted.remember('Edited foo.py', dict(metadata), SalienceLevel.LOW) == memory_id
+        assert restarted.get_stats()['dedup']['folded'] == 1
+
+    def test_written_in_bounded_steps(self, tmp_path, monkeypatch):
+        """Test a large working set is pickled in chunks and changes meanwhile stay dirty"""
+        manager, snapshots = self._manager(tmp_path, monkeypatch)
+        monkeypatch.setattr('snapshot.CHUNK_ITEMS', 2)
+        for word in ('alpha', 'beta', 'gamma', 'delta', 'epsilon'):
+            manager.remember(f'Edited {word}.py', {'type': 'file_edit'}, SalienceLevel.HIGH)
+
+        snapshots.mark_dirty()
+        steps = snapshots.write_steps()
+        next(steps)
+        next(steps)
+        manager.remember('Edited zeta.py', {'type': 'file_edit'}, SalienceLevel.HIGH)
+        snapshots.mark_dirty()
+        assert sum(1 for _ in steps) >= 3
+        assert snapshots.writes == 1 and snapshots.dirty
+        assert not list(tmp_path.glob('*.tmp'))
+
+        restarted, snapshots = self._manager(tmp_path, monkeypatch)
+        assert snapshots.restore() == ['manager']
+        assert restarted.working_set_size() == 5
+
+    def test_written_by_idle_maintenance(self, tmp_path, monkeypatch):
+        """Test requests only mark state dirty; the snapshot is written when idle"""
+        monkeypatch.setenv('HOME', str(tmp_path))
+        engine = BridgeEngine(session_id='snapshot-test', scan_cache_path=tmp_path / 'scan.json')
+
+        engine.submit({'type': 'file_edit', 'file': 'foo.py', 'content': 'x = 1'})
+        assert engine.snapshots.dirty and engine.snapshots.writes == 0
+
+        engine.maintenance._last_activity -= engine.maintenance.idle_after_s
+        while engine.maintain():
+            pass
+        assert not engine.snapshots.dirty and engine.snapshots.writes == 1
+
+    def test_bridges_in_other_processes_get_own_slot(self, tmp_path, monkeypatch):
+        """Test a session held by another bridge process isn't shared"""
+        monkeypatch.setenv('HOME', str(tmp_path))
+        session_dir = tmp_path / '.vidurai' / 'sessions'
+        session_dir.mkdir(parents=True)
+        holder = subprocess.Popen(
+            ['python', '-c',
+             'import sys; from session_lock import claim_session; from pathlib import Path; '
+             'print(claim_session(Path(sys.argv[1]), "snapshot-test"), flush=True); '
+             'sys.stdin.read()',
+             str(session_dir)],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True
+        )
+        try:
+            assert holder.stdout.readline().strip() == 'snapshot-test'
+            manager, _ = self._manager(tmp_path, monkeypatch)
+            assert manager.session_id == 'snapshot-test-2'
+            assert ViduraiManager(session_id='snapshot-test').session_id == 'snapshot-test-2'
+        finally:
+            holder.communicate('')
+
+    def test_ignores_stale_corrupt_and_other_versions(self, tmp_path, monkeypatch):
+        """Test unusable snapshots are ignored and state is rebuilt"""
+        manager, snapshots = self._manager(tmp_path, monkeypatch)
+        manager.remember(
+            'Edited foo.py', {'type': 'file_edit', 'file': 'foo.py'}, SalienceLevel.LOW
+        )
+        snapshots.write()
+
+        stale = SnapshotManager(snapshots.path, max_age_s=-1)
+        stale.register('manager', manager)
+        assert stale.restore() == []
+
+        snapshots.path.write_bytes(b'not a pickle')
+        assert snapshots.restore() == []
+
+    def test_secret_scanner_cache_restored(self, tmp_path):
+        """Test the scan cache survives and is dropped when patterns change"""
+        scanner = SecretScanner(SECRET_PATTERNS)
+        scanner.contains_secrets('x = 1\n' * 200)
+        snapshots = SnapshotManager(tmp_path / 'scan.pkl')
+        snapshots.register('secret_scanner', scanner)
+        snapshots.write()
+
+        restored = SecretScanner(SECRET_PATTERNS)
+        snapshots.register('secret_scanner', restored)
+        assert snapshots.restore() == ['secret_scanner']
+        restored.contains_secrets('x = 1\n' * 200)
+        assert restored.stats()['chunks_scanned'] == 0
+
+        changed = SecretScanner([r'token'])
+        snapshots.register('secret_scanner', changed)
+        assert snapshots.restore() == []
+
+
+class TestBenchmarks:
+    """Test the hot-path microbenchmark harness"""
+
+    def test_corpus_is_deterministic(self):
+        """Test the generated corpus is identical across runs"""
+        corpus = build_corpus()
+        assert corpus == build_corpus()
+        assert len(corpus['py_50k'][1]) >= 50 * 1024
+        assert EventProcessor()._contains_secrets(corpus['config_secrets_5k'][1])
+
+    def test_run_subset(self):
+        """Test a filtered run times only matching benchmarks"""
+        results = run_benchmarks('gist_file_edit', min_repeat_s=0.001, repeats=2, processes=2)
+        assert REFERENCE in results
+        assert all(name.startswith('gist_file_edit[') for name in results if name != REFERENCE)
+        assert all(r['min_us'] <= r['median_us'] for r in results.values())
+        assert all(r['relative'] > 0 for r in results.values())
+
+    def test_compare_flags_regressions(self):
+        """Test slowdowns beyond the threshold and noise floor are flagged"""
+        baseline = {name: {'min_us': 100.0} for name in 'abc'}
+        baseline['tiny'] = {'min_us': 0.4}
+        current = {
+            'a': {'min_us': 130.0}, 'b': {'min_us': 110.0}, 'c': {'min_us': 50.0},
+            'd': {'min_us': 1.0}, 'tiny': {'min_us': 0.8}
+        }
+        statuses = {row['name']: row['status'] for row in compare(current, baseline, 0.25)}
+        assert statuses == {'a': 'regressed', 'b': 'ok', 'c': 'improved', 'd': 'new', 'tiny': 'ok'}
+        assert compare(current, baseline, 0.25, noise_floor_us=0)[-1]['status'] == 'regressed'
+
+        # A machine twice as slow across the board is not a regression
+        baseline[REFERENCE] = {'min_us': 50.0}
+        slower = {name: {'min_us': 2 * result['min_us']} for name, result in baseline.items()}
+        statuses = {row['name']: row['status'] for row in compare(slower, baseline, 0.25)}
+        assert statuses == {'a': 'ok', 'b': 'ok', 'c': 'ok', 'tiny': 'ok', REFERENCE: 'reference'}
+
+        # Paired ratios to the reference win over the raw times when both runs have them
+        baseline['a']['relative'] = 2.0
+        rows = compare({'a': {'min_us': 300.0, 'relative': 2.1}}, baseline, 0.25)
+        assert rows[0]['status'] == 'ok'
+        rows = compare({'a': {'min_us': 100.0, 'relative': 3.0}}, baseline, 0.25)
+        assert rows[0]['status'] == 'regressed' and rows[0]['change'] == 0.5
+
+        assert set(load_baseline()) == set(build_benchmarks(build_corpus()))
+
+
+class TestErrorIndex:
+    """Test error fingerprints, occurrences and likely fixes"""
+
+    NOW = 1_700_000_000
+
+    def test_fingerprint_ignores_variable_parts(self):
+        """Test paths, line numbers, addresses and timestamps don't change the fingerprint"""
+        first = ('File "/home/a/proj/app.py", line 42\n'
+                 'ValueError: bad config at 0x7f3a2b1c (2026-01-02T10:00:01Z)')
+        second = 'File "C:\\work\\app.py", line 7\nValueError: bad config at 0x1c (09:15:33)'
+        assert fingerprint(normalize_error(first)) == fingerprint(normalize_error(second))
+        assert normalize_error('\x1b[31mFAILED\x1b[0m  x') == 'FAILED x'
+        assert normalize_error(first) != normalize_error('KeyError: bad config')
+
+        # Error lines are preferred over the rest of the output
+        output = ('collecting 12 items\ntest_a.py ..F\nE   AssertionError: 1 != 2\n'
+                  '1 failed in 0.2s\nsummary')
+        assert extract_error_lines(output) == 'E   AssertionError: 1 != 2\n1 failed in 0.2s'
+
+    def test_occurrences_and_repeats(self):
+        """Test counts, seen_before and that quick repeats from one place count once"""
+        index = ErrorIndex(path=None)
+        assert index.record('boom', 'diagnostic', file_path='a.py', ts=self.NOW)['seen_before'] == 0
+        index.record('boom', 'diagnostic', file_path='a.py', ts=self.NOW + 5)
+        seen = index.record('boom', 'diagnostic', file_path='b.py', ts=self.NOW + 10)
+        assert seen['seen_before'] == 1
+
+        result = index.lookup('boom')
+        assert result['seen'] and result['count'] == 2
+        assert [o['file'] for o in result['occurrences']] == ['b.py', 'a.py']
+        assert not index.lookup('never happened')['seen']
+        assert index.lookup(fp=seen['fingerprint'])['count'] == 2
+
+    def test_following_edits_become_fixes(self):
+        """Test edits after a failure are candidate fixes, confirmed by a later success"""
+        index = ErrorIndex(path=None)
+        index.record('ImportError: cannot import name <n>', 'terminal', command='pytest',
+                     ts=self.NOW)
+        index.record_edit('src/util.py', 'm1', ts=self.NOW + 60)
+        index.record_edit('README.md', 'm2', ts=self.NOW + 90)
+        index.record_edit('src/util.py', 'm3', ts=self.NOW + 120)
+
+        pending = index.lookup('ImportError: cannot import name <n>')['likely_fixes']
+        assert [f['file'] for f in pending] == ['src/util.py', 'README.md']
+        assert pending[0]['confirmed'] == 0 and pending[0]['memory_ids'] == ['m3']
+
+        index.record_success('pytest')
+        index.record_edit('late.py', ts=self.NOW + 200)  # After the fix: not attached
+        fixes = index.lookup('ImportError: cannot import name <n>')['likely_fixes']
+        assert [(f['file'], f['confirmed']) for f in fixes] == [
+            ('src/util.py', 1), ('README.md', 1)
+        ]
+
+    def test_bridges_save_own_file_and_read_peers(self, tmp_path):
+        """Test two bridges' saves don't overwrite each other and lookups see both"""
+        first = ErrorIndex(tmp_path / 'errors.a.json', peer_pattern='errors*.json')
+        second = ErrorIndex(tmp_path / 'errors.b.json', peer_pattern='errors*.json')
+        first.record('boom', 'terminal', command='make', ts=self.NOW)
+        first.record_edit('fix.py', ts=self.NOW + 60)
+        first.record_success('make')
+        second.record('boom', 'diagnostic', file_path='a.py', ts=self.NOW + 120)
+        first.save()
+        second.save()
+
+        restarted = ErrorIndex.load(tmp_path / 'errors.b.json', peer_pattern='errors*.json')
+        result = restarted.lookup('boom')
+        assert result['count'] == 2
+        assert [o['source'] for o in result['occurrences']] == ['diagnostic', 'terminal']
+        assert result['likely_fixes'][0]['file'] == 'fix.py'
+        assert restarted.record('boom', 'terminal', ts=self.NOW + 999)['seen_before'] == 2
+
+    def test_lookup_error_command(self, tmp_path):
+        """Test a failure, an edit and a passing rerun are reported by lookup_error"""
+        proc = subprocess.Popen(
+            ['python', 'bridge.py'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1,
+            env={**os.environ, 'HOME': str(tmp_path)}
+        )
+        try:
+            failure = ('Traceback (most recent call last):\n  File "/tmp/x/app.py", line 3\n'
+                       'NameError: name \'cfg\' is not defined')
+            moved = failure.replace('/tmp/x', '/home/b/proj').replace('3', '9')
+            run = {'type': 'terminal_output', 'command': 'python app.py'}
+            events = [
+                dict(run, output=failure, exitCode=1),
+                {'type': 'file_edit', 'file': 'app.py', 'content': 'cfg = {}'},
+                dict(run, output='ok', exitCode=0),
+                {'type': 'lookup_error', 'error': moved},
+                {'type': 'lookup_error'},
+            ]
+            for event in events:
+                proc.stdin.write(json.dumps(event) + '\n')
+            proc.stdin.flush()
+            responses = [json.loads(proc.stdout.readline()) for _ in events]
+
+            assert responses[0]['seen_before'] == 0
+            failure_info = responses[3]['failure']
+            assert failure_info['fingerprint'] == responses[0]['error_fingerprint']
+            assert failure_info['count'] == 1
+            assert failure_info['likely_fixes'][0]['file'] == 'app.py'
+            assert failure_info['likely_fixes'][0]['confirmed'] == 1
+            assert responses[4]['status'] == 'error'
+        finally:
+            proc.terminate()
+            proc.wait(timeout=5)
+
+
+class TestBridgeLogging:
+    """Test rate-limited, ring-buffered bridge logging"""
+
+    def _record(self, msg, *args, created=1000.0, level=logging.WARNING):
+        record = logging.LogRecord('vidurai-bridge', level, __file__, 1, msg, args, None)
+        record.created = created
+        return record
+
+    def test_rate_limit_counts_suppressed(self):
+        """Test repeats of one template are dropped past the burst and reported later"""
+        limiter = RateLimitFilter(burst=2, window_s=60)
+        passed = [
+            limiter.filter(self._record("Secrets detected in %s", f"f{i}.env")) for i in range(5)
+        ]
+        assert passed == [True, True, False, False, False]
+        assert limiter.suppressing() == {"Secrets detected in %s": 3}
+
+        # Other messages have their own budget
+        assert limiter.filter(self._record("Database not available"))
+
+        later = self._record("Secrets detected in %s", "g.env", created=1061.0)
+        assert limiter.filter(later)
+        assert later.suppressed == 3
+        assert limiter.suppressed_total == 3
+
+    def test_ring_buffer_query(self):
+        """Test the buffer keeps the newest records and filters by level and seq"""
+        buffer = RingBufferHandler(capacity=3, level=logging.INFO)
+        for i, level in enumerate([logging.INFO, logging.WARNING, logging.INFO, logging.ERROR]):
+            buffer.handle(self._record("event %d", i, level=level))
+
+        assert [r['message'] for r in buffer.records()] == ['event 1', 'event 2', 'event 3']
+        assert [r['level'] for r in buffer.records(logging.WARNING)] == ['WARNING', 'ERROR']
+        assert [r['seq'] for r in buffer.records(since=3)] == [4]
+        assert [r['seq'] for r in buffer.records(limit=1)] == [4]
+        assert buffer.stats()['dropped'] == 1
+
+    def test_stderr_quiet_and_lazy(self):
+        """Test INFO stays off stderr and DEBUG messages are never formatted"""
+        class Expensive:
+            formatted = 0
+
+            def __str__(self):
+                Expensive.formatted += 1
+                return 'expensive'
+
+        stream = io.StringIO()
+        installed = configure_logging(stream=stream, stderr_level=logging.WARNING, buffer_size=10)
+        try:
+            logger = logging.getLogger('vidurai-bridge')
+            logger.debug("Value: %s", Expensive())
+            logger.info("Loaded %s", 'session')
+            logger.warning("Low disk")
+
+            assert Expensive.formatted == 0
+            assert stream.getvalue().count('\n') == 1
+            assert 'WARNING: Low disk' in stream.getvalue()
+            messages = [r['message'] for r in installed.buffer.records()]
+            assert messages[-2:] == ['Loaded session', 'Low disk']
+        finally:
+            configure_logging()
+
+    def test_bad_env_level_falls_back(self, monkeypatch):
+        """Test an unknown VIDURAI_LOG_LEVEL is reported instead of raising"""
+        stream = io.StringIO()
+        monkeypatch.setenv('VIDURAI_LOG_LEVEL', 'chatty')
+        try:
+            installed = configure_logging(stream=stream)
+            assert installed.stderr_handler.level == logging.WARNING
+            assert "Ignoring VIDURAI_LOG_LEVEL: Unknown log level: 'chatty'" in stream.getvalue()
+        finally:
+            monkeypatch.delenv('VIDURAI_LOG_LEVEL')
+            configure_logging()
+
+    def test_get_logs_command(self):
+        """Test get_logs returns buffered records over the protocol"""
+        proc = subprocess.Popen(
+            ['python', 'bridge.py'],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            bufsize=1
+        )
+        try:
+            events = [
+                {'type': 'file_edit', 'file': 'config.py',
+                 'content': 'api_key = "sk-' + 'a' * 48 + '"'},
+                {'type': 'get_logs', 'level': 'warning', '_id': 1},
+                {'type': 'get_logs', 'level': 'chatty', '_id': 2},
+            ]
+            for event in events:
+                proc.stdin.write(json.dumps(event) + '\n')
+            proc.stdin.flush()
+            responses = [json.loads(proc.stdout.readline()) for _ in events]
+
+            logs = responses[1]
+            assert logs['status'] == 'ok'
+            assert any('Secrets detected in config.py' in r['message'] for r in logs['logs'])
+            assert all(r['level'] in ('WARNING', 'ERROR', 'CRITICAL') for r in logs['logs'])
+            assert logs['last_seq'] >= logs['logs'][-1]['seq']
+            assert responses[2]['status'] == 'error'
+        finally:
+            proc.terminate()
+            proc.wait(timeout=5)
+
+
+class TestBridgeEngine:
+    """Test the transport-independent engine and the stdio transport"""
+
+    @pytest.fixture(autouse=True)
+    def _engine(self, tmp_path, monkeypatch):
+        monkeypatch.setenv('HOME', str(tmp_path))
+        self.engine = BridgeEngine(session_id='engine-test', scan_cache_path=tmp_path / 'scan.json')
+
+    def test_submit_many_in_process(self, capsys):
+        """Test a batch is processed in order without touching stdout"""
+        responses = self.engine.submit_many([
+            {'type': 'file_edit', 'file': 'engine.py', 'content': 'def run(): pass', '_id': 'a'},
+            {'type': 'diagnostic', 'file': 'engine.py', 'severity': 'error',
+             'message': "name 'x' is not defined"},
+            {'type': 'bogus'},
+            ['not', 'an', 'event'],
+            {'type': 'recall_context', 'query': 'engine', 'fields': ['metadata']},
+        ])
+
+        assert [r['status'] for r in responses] == ['ok', 'ok', 'error', 'error', 'ok']
+        assert responses[0]['_id'] == 'a'
+        assert 'error_fingerprint' in responses[1]
+        assert any(m['metadata'].get('file') == 'engine.py' for m in responses[4]['memories'])
+        assert all('_load' not in r for r in responses)
+        assert capsys.readouterr().out == ''
+        assert self.engine.submit({'type': 'get_stats'})['stats']['total_memories'] >= 1
+
+    def test_submit_honours_deadline(self):
+        """Test an already expired deadline is reported without processing"""
+        response = self.engine.submit({'type': 'recall_context', 'query': 'x', '_deadline': 1})
+        assert response['status'] == 'deadline_exceeded'
+        assert self.engine.metrics.deadline_exceeded['queued'] == 1
+
+    def test_context_query_cancelled_at_deadline(self, monkeypatch):
+        """Test a context query that outlives its deadline is cancelled, not answered"""
+        def slow_context(query=None, max_tokens=2000):
+            time.sleep(0.2)
+            return 'context'
+        monkeypatch.setattr(self.engine.vidurai_manager.memory, 'get_context_for_ai',
+                            slow_context, raising=False)
+
+        response = self.engine.submit({
+            'type': 'get_context_for_ai', 'project_path': '/proj',
+            '_deadline': (time.time() + 0.1) * 1000
+        })
+        assert response['status'] == 'deadline_exceeded'
+        assert self.engine.metrics.deadline_exceeded['processing'] == 1
+        assert self.engine.submit(
+            {'type': 'get_context_for_ai', 'project_path': '/proj'}
+        )['context'] == 'context'
+
+    def test_stdio_transport(self):
+        """Test the stdio transport serves lines until EOF with load hints"""
+        stdin = io.StringIO('{"type": "ping", "_id": 1}\nnot json\n')
+        stdout = io.StringIO()
+        StdioTransport(self.engine, stdin, stdout).serve()
+
+        replies = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        assert replies[0]['message'] == 'pong' and replies[0]['_id'] == 1
+        assert 'queue_depth' in replies[0]['_load']
+        assert replies[1]['status'] == 'error'
+
+
 class TestBridgeCommunication:
     """Test stdin/stdout communication"""
 
@@ -168,6 +1564,7 @@ class TestBridgeCommunication:
 
         assert response['status'] == 'ok'
         assert response['message'] == 'pong'
+        assert response['_load']['queue_depth'] == 0
 
         # Cleanup
         proc.terminate()
@@ -207,5 +1604,109 @@ class TestBridgeCommunication:
         proc.wait(timeout=2)
 
 
+
+class TestBridgeDaemon:
+    """Test the shared multi-window daemon over a Unix socket"""
+
+    def _connect(self, socket_path):
+        import socket
+        deadline = time.time() + 10
+        while True:
+            client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                client.connect(str(socket_path))
+                return client, client.makefile('rb')
+            except OSError:
+                client.close()
+                if time.time() > deadline:
+                    raise
+                time.sleep(0.1)
+
+    @pytest.mark.skipif(not hasattr(__import__('socket'), 'AF_UNIX'),
+                        reason='Unix sockets not supported')
+    def test_clients_share_one_bridge(self, tmp_path):
+        """Test two clients are served by one process with isolated responses"""
+        socket_path = tmp_path / 'bridge.sock'
+        proc = subprocess.Popen(
+            ['python', 'bridge.py', 'daemon', '--socket', str(socket_path)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env={**os.environ, 'HOME': str(tmp_path)}
+        )
+
+        try:
+            first, first_reader = self._connect(socket_path)
+            second, second_reader = self._connect(socket_path)
+            assert socket_path.stat().st_mode & 0o777 == 0o600
+
+            # Same request id on both connections: each gets only its own reply
+            first.sendall(b'{"type": "ping", "_id": 1}\n')
+            second.sendall(b'{"type": "health", "_id": 1}\n')
+
+            assert json.loads(first_reader.readline())['message'] == 'pong'
+            health = json.loads(second_reader.readline())
+            assert health['_id'] == 1
+            assert len(health['health']['clients']) == 2
+
+            first.close()
+            second.close()
+        finally:
+            proc.terminate()
+            proc.wait(timeout=5)
+
+        assert not socket_path.exists()
+
+    @pytest.mark.skipif(not hasattr(__import__('socket'), 'AF_UNIX'),
+                        reason='Unix sockets not supported')
+    def test_project_switch_does_not_leak(self, tmp_path):
+        """Test one client switching projects leaves another client's responses unchanged"""
+        socket_path = tmp_path / 'bridge.sock'
+        proc = subprocess.Popen(
+            ['python', 'bridge.py', 'daemon', '--socket', str(socket_path)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env={**os.environ, 'HOME': str(tmp_path)}
+        )
+
+        def request(client, reader, **event):
+            client.sendall((json.dumps(event) + '\n').encode('utf-8'))
+            return json.loads(reader.readline())
+
+        def edit(client, reader, project, name):
+            response = request(client, reader, type='file_edit', project_path=project,
+                               file=f'{project}/{name}.py', content=f'def {name}(): pass')
+            assert response['status'] == 'ok'
+
+        def top_files(client, reader, project):
+            response = request(client, reader, type='get_activity_histogram',
+                               project_path=project, buckets=1)
+            return [path for path, _ in response['histogram']['top_files']]
+
+        try:
+            first, first_reader = self._connect(socket_path)
+            second, second_reader = self._connect(socket_path)
+
+            edit(first, first_reader, '/work/alpha', 'parse')
+            edit(second, second_reader, '/work/beta', 'render')
+            before = top_files(first, first_reader, '/work/alpha')
+
+            # The second window switches to another project and keeps working
+            edit(second, second_reader, '/work/gamma', 'deploy')
+            edit(second, second_reader, '/work/gamma', 'rollback')
+
+            assert top_files(first, first_reader, '/work/alpha') == before == [
+                '/work/alpha/parse.py'
+            ]
+            assert sorted(top_files(second, second_reader, '/work/gamma')) == [
+                '/work/gamma/deploy.py', '/work/gamma/rollback.py'
+            ]
+
+            first.close()
+            second.close()
+        finally:
+            proc.terminate()
+            proc.wait(timeout=5)
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,13 @@
+"""
+Time Utilities
+Timestamp formats shared by the bridge modules
+"""
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def sql_timestamp(epoch: Optional[float]) -> Optional[str]:
+    """Format like SQLite CURRENT_TIMESTAMP so range queries keep working"""
+    if epoch is None:
+        return None
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
@@ -0,0 +1,267 @@
+"""
+Memory Transfer
+Stream a project's memories to and from NDJSON files (optionally gzipped)
+
+Usage:
+    python bridge.py export --project PATH --out memories.ndjson.gz
+    python bridge.py import --project PATH --in memories.ndjson.gz
+"""
+import sys
+import gzip
+import json
+import time
+import logging
+import argparse
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Any, Callable, IO, Iterator, List, Optional
+
+from timeutil import sql_timestamp
+
+logger = logging.getLogger('vidurai-bridge')
+
+FORMAT_VERSION = 1
+
+# Columns written per memory (the database schema minus ids)
+EXPORT_FIELDS = (
+    'verbatim', 'gist', 'salience', 'event_type', 'file_path',
+    'line_number', 'tags', 'created_at'
+)
+REQUIRED_FIELDS = ('verbatim', 'gist', 'salience', 'event_type')
+SALIENCE_NAMES = ('CRITICAL', 'HIGH', 'MEDIUM', 'LOW', 'NOISE')
+
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_IMPORT_BATCH = 5000
+
+# Send a progress update every this many memories
+PROGRESS_EVERY = 5000
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+ProgressFn = Callable[[Dict[str, Any]], None]
+
+
+def open_ndjson(path: Path, mode: str, compress: Optional[bool] = None) -> IO[str]:
+    """
+    Open an NDJSON file for text I/O.
+
+    Writing compresses when `compress` is set (default: path ends in .gz);
+    reading detects gzip from the file header.
+    """
+    path = Path(path).expanduser()
+    if mode == 'r':
+        with open(path, 'rb') as f:
+            compress = f.read(2) == GZIP_MAGIC
+    elif compress is None:
+        compress = path.suffix == '.gz'
+
+    if compress:
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def _working_set_record(memory) -> Dict[str, Any]:
+    metadata = memory.metadata or {}
+    return {
+        'verbatim': memory.verbatim,
+        'gist': memory.gist or memory.verbatim,
+        'salience': memory.salience.name,
+        'event_type': metadata.get('type', 'memory'),
+        'file_path': metadata.get('file'),
+        'line_number': metadata.get('line'),
+        'tags': None,
+        'created_at': sql_timestamp(memory.created_at.timestamp())
+    }
+
+
+def _evicted_record(entry: Dict[str, Any]) -> Dict[str, Any]:
+    metadata = entry.get('metadata') or {}
+    created_at = entry.get('created_at')
+    try:
+        created_at = sql_timestamp(datetime.fromisoformat(created_at).timestamp())
+    except (TypeError, ValueError):
+        created_at = None
+    return {
+        'verbatim': entry.get('verbatim'),
+        'gist': entry.get('gist') or entry.get('verbatim'),
+        'salience': entry.get('salience'),
+        'event_type': metadata.get('type', 'memory'),
+        'file_path': metadata.get('file'),
+        'line_number': metadata.get('line'),
+        'tags': None,
+        'created_at': created_at
+    }
+
+
+def iter_project_memories(manager, project_path: str,
+                          page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+    """
+    Stream every memory of a project, newest first.
+
+    Pages through the database by keyset cursor, so memory use is bounded by
+    page_size. Without a database, falls back to the session's working set
+    followed by its evicted archive, keeping memories whose metadata names
+    the project (ones recorded without a project_path are not exported).
+    """
+    if manager.db:
+        cursor = None
+        while True:
+            rows, cursor = manager.query_database_page(
+                project_path=project_path,
+                min_salience='NOISE',
+                limit=page_size,
+                cursor=cursor,
+                fields=list(EXPORT_FIELDS)
+            )
+            yield from rows
+            if cursor is None:
+                return
+
+    for memory in list(manager.memory.memories):
+        if (memory.metadata or {}).get('project_path') == project_path:
+            yield _working_set_record(memory)
+    for entry in manager.iter_evicted():
+        if (entry.get('metadata') or {}).get('project_path') == project_path:
+            yield _evicted_record(entry)
+
+
+def export_memories(manager, project_path: str, path: Path,
+                    compress: Optional[bool] = None,
+                    progress: Optional[ProgressFn] = None,
+                    page_size: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+    """Write a project's memories to an NDJSON file, returning a summary"""
+    path = Path(path).expanduser()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    started = time.time()
+    exported = 0
+
+    # Write to a temp file so a failed export never clobbers a good one
+    tmp = path.with_name(path.name + '.tmp')
+    compress = path.suffix == '.gz' if compress is None else compress
+    try:
+        with open_ndjson(tmp, 'w', compress) as f:
+            f.write(json.dumps({
+                'vidurai_export': FORMAT_VERSION,
+                'project': project_path,
+                'exported_at': datetime.now().isoformat()
+            }) + '\n')
+
+            for record in iter_project_memories(manager, project_path, page_size):
+                f.write(json.dumps(record, default=str) + '\n')
+                exported += 1
+                if progress and exported % PROGRESS_EVERY == 0:
+                    progress({'exported': exported})
+        tmp.replace(path)
+    except BaseException:
+        # Don't leave a partial export behind (e.g. disk full, deadline exceeded)
+        tmp.unlink(missing_ok=True)
+        raise
+
+    summary = {
+        'path': str(path),
+        'exported': exported,
+        'compressed': compress,
+        'bytes': path.stat().st_size,
+        'elapsed_s': round(time.time() - started, 2)
+    }
+    logger.info("Exported %d memories to %s", exported, path)
+    return summary
+
+
+def _valid_record(record: Any) -> bool:
+    return (
+        isinstance(record, dict)
+        and all(record.get(field) for field in REQUIRED_FIELDS)
+        and record['salience'] in SALIENCE_NAMES
+    )
+
+
+def import_memories(manager, project_path: str, path: Path,
+                    progress: Optional[ProgressFn] = None,
+                    batch_size: int = DEFAULT_IMPORT_BATCH) -> Dict[str, Any]:
+    """
+    Load memories from an NDJSON export into a project.
+
+    Records are inserted in batches, one transaction per batch; malformed
+    lines are skipped and counted.
+    """
+    if not manager.db:
+        raise RuntimeError("Database not available")
+
+    started = time.time()
+    imported = 0
+    skipped = 0
+    batch: List[Dict[str, Any]] = []
+
+    with open_ndjson(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                skipped += 1
+                continue
+            if isinstance(record, dict) and 'vidurai_export' in record:
+                continue  # Header line
+            if not _valid_record(record):
+                skipped += 1
+                continue
+
+            batch.append({field: record.get(field) for field in EXPORT_FIELDS})
+            if len(batch) >= batch_size:
+                imported += manager.store_many(project_path, batch)
+                batch = []
+                if progress:
+                    progress({'imported': imported, 'skipped': skipped})
+
+    if batch:
+        imported += manager.store_many(project_path, batch)
+
+    summary = {
+        'path': str(path),
+        'imported': imported,
+        'skipped': skipped,
+        'elapsed_s': round(time.time() - started, 2)
+    }
+    logger.info("Imported %d memories from %s (%d skipped)", imported, path, skipped)
+    return summary
+
+
+def main(command: str, argv: Optional[List[str]] = None) -> int:
+    """CLI entry point for `python bridge.py export|import`"""
+    parser = argparse.ArgumentParser(
+        prog=f'bridge.py {command}',
+        description=f'{command.capitalize()} a project\'s memories as NDJSON'
+    )
+    parser.add_argument('--project', default='.', help='Project path memories belong to')
+    if command == 'export':
+        parser.add_argument('--out', type=Path, required=True, metavar='PATH',
+                            help='Output file (gzip-compressed if it ends in .gz)')
+        parser.add_argument('--gzip', action='store_true', default=None,
+                            help='Compress regardless of the file extension')
+    else:
+        parser.add_argument('--in', dest='source', type=Path, required=True, metavar='PATH',
+                            help='NDJSON export (plain or gzip)')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_IMPORT_BATCH)
+    args = parser.parse_args(argv)
+
+    from vidurai_manager import ViduraiManager
+    manager = ViduraiManager()
+    project_path = str(Path(args.project).expanduser().resolve())
+
+    def report(update: Dict[str, Any]):
+        logger.info("%s: %s", command, update)
+
+    try:
+        if command == 'export':
+            summary = export_memories(manager, project_path, args.out, args.gzip, report)
+        else:
+            summary = import_memories(manager, project_path, args.source, report, args.batch_size)
+    except (OSError, RuntimeError) as e:
+        logger.error("%s failed: %s", command.capitalize(), e)
+        return 1
+
+    sys.stdout.write(json.dumps({'status': 'ok', command: summary}) + '\n')
+    return 0
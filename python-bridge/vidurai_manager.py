@@ -4,13 +4,28 @@ Manages VismritiMemory instance with session persistence
 v2.0: Now with database integration
 """
 import os
+import json
+import heapq
 import pickle
+import sqlite3
 import logging
+from contextlib import nullcontext
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Iterator, Optional, Set, Tuple, TypeVar
 
 from vidurai import VismritiMemory
-from vidurai.core.data_structures_v3 import SalienceLevel, Memory
+from vidurai.core.data_structures_v3 import SalienceLevel, Memory, MemoryStatus
+
+from pagination import project, decode_cursor, encode_cursor
+from semantic_index import SemanticIndex, NUMPY_AVAILABLE
+from dedup import Deduplicator, simhash
+from rollups import ActivityRollups
+from error_index import ErrorIndex
+from interning import MemoryMetadata, STRINGS
+from deadlines import Deadline, DeadlineExceeded, NO_DEADLINE
+from session_lock import claim_session
+from config import env_int
 
 # v2.0: Database backend
 try:
@@ -23,6 +38,30 @@ except Exception:
 
 logger = logging.getLogger('vidurai-bridge')
 
+# Columns paged database queries may return (see query_database_page)
+DB_MEMORY_FIELDS = (
+    'id', 'verbatim', 'gist', 'salience', 'event_type', 'file_path',
+    'line_number', 'tags', 'created_at', 'access_count'
+)
+
+
+# The evicted archive is rotated to {session}.evicted.ndjson.1 at this size
+# (VIDURAI_EVICTED_MAX_MB), so at most twice this is kept on disk
+DEFAULT_EVICTED_MAX_MB = 64
+
+# NOISE memories older than this are pruned from the working set during idle maintenance
+NOISE_MAX_AGE_S = 86400
+
+T = TypeVar('T')
+
+# Memory statuses excluded from recall (matches VismritiMemory.recall)
+FORGOTTEN_STATUSES = (MemoryStatus.PRUNED, MemoryStatus.UNLEARNED)
+
+
+def memory_sort_key(memory: Memory) -> Tuple[int, str, str]:
+    """Recall order (salience, then recency), made total by the engram id"""
+    return (memory.salience.value, memory.created_at.isoformat(), memory.engram_id or '')
+
 
 class ViduraiManager:
     """Manage Vidurai memory with local persistence"""
@@ -33,10 +72,15 @@ class ViduraiManager:
         self.session_dir = Path.home() / ".vidurai" / "sessions"
         self.session_dir.mkdir(parents=True, exist_ok=True)
 
-        # Session ID (default: "default")
-        self.session_id = session_id or "default"
+        # Session ID (default: "default"); bridges in other windows using the
+        # same id get their own slot ("default-2", ...) so files never collide
+        self.session_id = claim_session(self.session_dir, session_id or "default")
         self.session_file = self.session_dir / f"{self.session_id}.pkl"
 
+        # Working-set entries evicted under the memory budget (NDJSON archive)
+        self.evicted_file = self.session_dir / f"{self.session_id}.evicted.ndjson"
+        self.evicted_max_bytes = env_int('VIDURAI_EVICTED_MAX_MB', DEFAULT_EVICTED_MAX_MB) << 20
+
         # Initialize Vidurai memory (v2.0: with database backend)
         self.memory = VismritiMemory(
             enable_gist_extraction=False  # Using rule-based gist
@@ -48,12 +92,36 @@ class ViduraiManager:
             try:
                 self.db = MemoryDatabase()
             except Exception as e:
-                logger.error(f"Failed to initialize database: {e}")
+                logger.error("Failed to initialize database: %s", e)
+
+        # Hourly/daily activity counts per project. Each bridge saves its own
+        # file; histograms add in the other sessions' (and the pre-slot rollups.json)
+        self.rollups = ActivityRollups.load(
+            self.session_dir.parent / f"rollups.{self.session_id}.json",
+            peer_pattern="rollups*.json"
+        )
+
+        # Failure fingerprints -> occurrences and following edits. Each bridge saves
+        # its own file; lookups add in the other sessions' (and the pre-slot errors.json)
+        self.errors = ErrorIndex.load(
+            self.session_dir.parent / f"errors.{self.session_id}.json", peer_pattern="errors*.json"
+        )
+
+        # Folds bursts of near-identical memories into one
+        self.dedup = Deduplicator()
+
+        # Offline semantic recall over gists and metadata (needs numpy)
+        self._by_id: Dict[str, Memory] = {}
+        self.semantic_index = None
+        self._unindexable: Set[str] = set()  # Memories whose text has no indexable terms
+        if NUMPY_AVAILABLE:
+            self.semantic_index = SemanticIndex.load(self.session_dir / f"{self.session_id}.index")
 
         # Load existing session if available
         self._load_session()
 
-        logger.info(f"Vidurai manager initialized (session: {self.session_id}, db: {self.db is not None})")
+        logger.info("Vidurai manager initialized (session: %s, db: %s)",
+                    self.session_id, self.db is not None)
 
     def _load_session(self):
         """Load session from disk if exists"""
@@ -68,9 +136,9 @@ class ViduraiManager:
                     # For now, we'll rely on Vidurai's internal persistence
                     pass
 
-                logger.info(f"Loaded session from {self.session_file}")
+                logger.info("Loaded session from %s", self.session_file)
             except Exception as e:
-                logger.error(f"Error loading session: {e}")
+                logger.error("Error loading session: %s", e)
 
     def save_session(self):
         """Save session to disk"""
@@ -83,26 +151,59 @@ class ViduraiManager:
             with open(self.session_file, 'wb') as f:
                 pickle.dump(data, f)
 
-            logger.info(f"Saved session to {self.session_file}")
+            if self.semantic_index is not None:
+                self.semantic_index.save()
+            self.rollups.save()
+            self.errors.save()
+
+            logger.info("Saved session to %s", self.session_file)
         except Exception as e:
-            logger.error(f"Error saving session: {e}")
+            logger.error("Error saving session: %s", e)
 
     def remember(self, content: str, metadata: Dict[str, Any],
                  salience: SalienceLevel) -> str:
-        """Store content in Vidurai memory"""
+        """Store content in Vidurai memory (near-duplicates fold into a recent one)"""
         try:
+            # Slotted record with shared path/type strings instead of a dict per memory
+            metadata = MemoryMetadata(metadata)
+            key = (metadata.get('type'), metadata.get('file') or metadata.get('command'), salience)
+            fingerprint = simhash(content)
+
+            duplicate_id = self.dedup.find(key, fingerprint)
+            duplicate = self._by_id.get(duplicate_id) if duplicate_id else None
+            if duplicate is not None:
+                self.dedup.touch(duplicate_id)
+                count = duplicate.metadata.get('occurrence_count', 1)
+                duplicate.metadata['occurrence_count'] = count + 1
+                duplicate.metadata['last_seen'] = datetime.now().isoformat()
+                return duplicate_id
+
             memory = self.memory.remember(
                 content=content,
                 metadata=metadata,
                 salience=salience
             )
 
+            self.dedup.add(memory.engram_id, key, fingerprint)
+            self._by_id[memory.engram_id] = memory
+            if self.semantic_index is not None:
+                self._index_many([(memory.engram_id, self._index_text(memory))])
+
             # Return memory ID (engram_id)
             return memory.engram_id
         except Exception as e:
-            logger.error(f"Error storing memory: {e}")
+            logger.error("Error storing memory: %s", e)
             return None
 
+    @staticmethod
+    def _index_text(memory: Memory) -> str:
+        """Text embedded for semantic recall: the gist plus string metadata"""
+        parts = [memory.gist or memory.verbatim[:500]]
+        for key, value in (memory.metadata or {}).items():
+            if isinstance(value, str) and key not in ('salience', 'project_path'):
+                parts.append(value[:200])
+        return ' '.join(parts)
+
     def recall(self, query: str, top_k: int = 10) -> List[Memory]:
         """Recall relevant memories"""
         try:
@@ -116,9 +217,60 @@ class ViduraiManager:
 
             return memories
         except Exception as e:
-            logger.error(f"Error recalling memories: {e}")
+            logger.error("Error recalling memories: %s", e)
             return []
 
+    def recall_page(self, query: str, limit: int = 10,
+                    cursor: Optional[str] = None,
+                    deadline: Deadline = NO_DEADLINE) -> Tuple[List[Memory], Optional[str]]:
+        """Recall one page of memories, returning the cursor for the next page"""
+        deadline.check('recall')
+        if query and query.strip() and self.semantic_index is not None:
+            return self._semantic_page(query, limit, cursor, deadline)
+
+        # Same matching as VismritiMemory.recall, which would also call access() on
+        # every match; here only the memories on the returned page count as recalled
+        needle = (query or '').lower()
+        after = decode_cursor(cursor)
+        after_key = tuple(after) if after is not None else None
+        candidates = (
+            m for m in self.memory.memories
+            if m.status not in FORGOTTEN_STATUSES
+            and (after_key is None or memory_sort_key(m) < after_key)
+            and (needle in (m.gist or '').lower() or needle in (m.verbatim or '').lower())
+        )
+        # One extra match tells us whether there is a next page
+        ranked = heapq.nlargest(limit + 1, candidates, key=memory_sort_key)
+        page = ranked[:limit]
+        next_cursor = encode_cursor(memory_sort_key(page[-1])) if len(ranked) > limit else None
+
+        # Last checkpoint before access counts change
+        deadline.check('recall')
+        for memory in page:
+            memory.access()
+        return page, next_cursor
+
+    def _semantic_page(self, query: str, limit: int, cursor: Optional[str],
+                       deadline: Deadline = NO_DEADLINE) -> Tuple[List[Memory], Optional[str]]:
+        """Rank by TF-IDF cosine similarity; the cursor is (score, row)"""
+        def live(memory_id: str) -> bool:
+            memory = self._by_id.get(memory_id)
+            return memory is not None and memory.status not in FORGOTTEN_STATUSES
+
+        # One extra hit tells us whether there is a next page
+        hits = self.semantic_index.search(
+            query, limit + 1, after=decode_cursor(cursor), accept=live
+        )
+        page = hits[:limit]
+        next_cursor = encode_cursor(page[-1][1:]) if len(hits) > limit else None
+
+        # Last checkpoint before access counts change
+        deadline.check('recall')
+        memories = [self._by_id[memory_id] for memory_id, _, _ in page]
+        for memory in memories:
+            memory.access()  # Recall affects decay, as in VismritiMemory.recall
+        return memories, next_cursor
+
     def get_stats(self) -> Dict[str, Any]:
         """Get current session statistics"""
         try:
@@ -128,22 +280,243 @@ class ViduraiManager:
             return {
                 'session_id': self.session_id,
                 'total_memories': len(ledger),
-                'session_file': str(self.session_file)
+                'session_file': str(self.session_file),
+                'dedup': self.dedup.stats(),
+                'interned_strings': len(STRINGS)
             }
         except Exception as e:
-            logger.error(f"Error getting stats: {e}")
+            logger.error("Error getting stats: %s", e)
             return {
                 'session_id': self.session_id,
                 'total_memories': 0
             }
 
+    def snapshot_state(self) -> Dict[str, Any]:
+        """
+        Derived state for warm restarts (see snapshot.py).
+
+        The semantic index is not included: it persists itself (save_index)
+        and memories it is missing are re-added on restore.
+        """
+        return {
+            'session_id': self.session_id,
+            'memories': list(self.memory.memories),
+            'dedup': self.dedup.snapshot_state(),
+            'rollups': self.rollups.snapshot_state(),
+            'errors': self.errors.snapshot_state()
+        }
+
+    def restore_state(self, state: Dict[str, Any]):
+        """Restore the working set and derived indexes from a snapshot"""
+        if state['session_id'] != self.session_id:
+            raise ValueError(f"snapshot is for session {state['session_id']!r}")
+
+        self.memory.memories = list(state['memories'])
+        self._by_id = {m.engram_id: m for m in self.memory.memories}
+        self.dedup.restore_state(state['dedup'])
+        self.rollups.restore_state(state['rollups'])
+        if 'errors' in state:  # Snapshots from before the error index
+            self.errors.restore_state(state['errors'])
+
+        # Memories added after the index was last saved
+        if self.semantic_index is not None:
+            self._unindexable.clear()
+            self._index_many([
+                (m.engram_id, self._index_text(m))
+                for m in self.memory.memories if self._needs_index(m)
+            ])
+
+    def save_index(self):
+        """Persist the semantic index (vectors are memory-mapped on reload)"""
+        if self.semantic_index is not None:
+            self.semantic_index.save()
+
+    def working_set_size(self) -> int:
+        """Number of memories held in process"""
+        return len(self.memory.memories)
+
+    def evict(self, count: int) -> int:
+        """
+        Evict up to `count` in-memory memories, lowest salience and oldest first.
+
+        Evicted memories are appended to the session's evicted archive before
+        they are dropped, so they stay recoverable via iter_evicted().
+        """
+        memories = self.memory.memories
+        if count <= 0 or not memories:
+            return 0
+
+        ranked = sorted(
+            range(len(memories)),
+            key=lambda i: (memories[i].salience.value, memories[i].created_at)
+        )
+        return self._archive_and_drop(set(ranked[:count]))
+
+    def _archive_and_drop(self, victims: Set[int]) -> int:
+        """Archive the working-set memories at these indexes, then drop them"""
+        memories = self.memory.memories
+        evicted_at = datetime.now().isoformat()
+
+        try:
+            self._rotate_evicted()
+            with open(self.evicted_file, 'a', encoding='utf-8') as f:
+                for i in sorted(victims):
+                    mem = memories[i]
+                    f.write(json.dumps({
+                        'engram_id': mem.engram_id,
+                        'gist': mem.gist,
+                        'verbatim': mem.verbatim,
+                        'salience': mem.salience.name,
+                        'created_at': mem.created_at.isoformat(),
+                        'metadata': dict(mem.metadata or {}),
+                        'evicted_at': evicted_at
+                    }, default=str) + '\n')
+        except OSError as e:
+            # Never drop memories we could not archive
+            logger.error("Error archiving evicted memories: %s", e)
+            return 0
+
+        evicted_ids = [memories[i].engram_id for i in victims]
+        for memory_id in evicted_ids:
+            self._by_id.pop(memory_id, None)
+            self.dedup.forget(memory_id)
+            self._unindexable.discard(memory_id)
+        if self.semantic_index is not None:
+            self.semantic_index.remove(evicted_ids)
+
+        self.memory.memories = [m for i, m in enumerate(memories) if i not in victims]
+        return len(victims)
+
+    def _stale_noise(self, max_age_s: float) -> List[int]:
+        cutoff = datetime.now() - timedelta(seconds=max_age_s)
+        return [
+            i for i, m in enumerate(self.memory.memories)
+            if m.salience == SalienceLevel.NOISE and m.created_at < cutoff
+        ]
+
+    def noise_backlog(self, max_age_s: float = NOISE_MAX_AGE_S) -> int:
+        """NOISE memories old enough to be pruned"""
+        return len(self._stale_noise(max_age_s))
+
+    def prune_noise(self, max_age_s: float = NOISE_MAX_AGE_S, limit: int = 500) -> int:
+        """Archive and drop up to `limit` NOISE memories older than max_age_s"""
+        victims = self._stale_noise(max_age_s)[:limit]
+        return self._archive_and_drop(set(victims)) if victims else 0
+
+    def index_backlog(self) -> int:
+        """Working-set memories missing from the semantic index"""
+        if self.semantic_index is None:
+            return 0
+        return sum(1 for m in self.memory.memories if self._needs_index(m))
+
+    def reindex_missing(self, limit: int = 1000) -> int:
+        """
+        Index up to `limit` memories missing from the semantic index.
+
+        Returns how many were looked at; those with no indexable terms are
+        not retried, so repeated calls reach 0.
+        """
+        if self.semantic_index is None:
+            return 0
+        missing = []
+        for m in self.memory.memories:
+            if self._needs_index(m):
+                missing.append((m.engram_id, self._index_text(m)))
+                if len(missing) == limit:
+                    break
+        self._index_many(missing)
+        return len(missing)
+
+    def _needs_index(self, memory: Memory) -> bool:
+        return (memory.engram_id not in self.semantic_index
+                and memory.engram_id not in self._unindexable)
+
+    def _index_many(self, items: List[Tuple[str, str]]) -> int:
+        """Index (memory id, text) pairs, remembering the ones with no terms"""
+        added = self.semantic_index.add_many(items)
+        if added < len(items):
+            self._unindexable.update(
+                memory_id for memory_id, _ in items if memory_id not in self.semantic_index
+            )
+        return added
+
+    def vacuum_step(self, pages: int = 256) -> int:
+        """
+        Reclaim up to `pages` free database pages, returning how many remain.
+
+        Only databases in incremental auto-vacuum mode can be vacuumed in
+        steps; others just get a WAL checkpoint and `PRAGMA optimize`, since a
+        full VACUUM cannot be interrupted.
+        """
+        if not self.db:
+            return 0
+        conn = sqlite3.connect(self.db.db_path, timeout=1.0, isolation_level=None)
+        try:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2:  # INCREMENTAL
+                conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+                return conn.execute("PRAGMA freelist_count").fetchone()[0]
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+            conn.execute("PRAGMA optimize")
+            return 0
+        finally:
+            conn.close()
+
+    def _rotate_evicted(self):
+        """Start a new archive once the current one is over the size cap"""
+        if not self.evicted_max_bytes:
+            return
+        try:
+            if self.evicted_file.stat().st_size < self.evicted_max_bytes:
+                return
+        except FileNotFoundError:
+            return
+        os.replace(self.evicted_file, self._rotated_evicted_file())
+
+    def _rotated_evicted_file(self) -> Path:
+        return self.evicted_file.with_name(self.evicted_file.name + '.1')
+
+    def iter_evicted(self) -> Iterator[Dict[str, Any]]:
+        """Stream memories previously evicted from the working set, oldest first"""
+        for path in (self._rotated_evicted_file(), self.evicted_file):
+            if not path.exists():
+                continue
+
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        logger.warning("Skipping corrupt line in %s", path)
+
     # v2.0: New database query methods
 
+    def _sdk_query(self, stage: str, deadline: Deadline, query: Callable[[], T]) -> T:
+        """
+        Run an SDK query between deadline checkpoints. The SDK builds its
+        result in one call, so its own SQLite connection (when it exposes
+        one) is interrupted once the deadline passes.
+        """
+        deadline.check(stage)
+        conn = getattr(self.db, 'conn', None)
+        if isinstance(conn, sqlite3.Connection):
+            guard = deadline.guard_sqlite(conn)
+        else:
+            guard = nullcontext()
+        with guard:
+            result = query()
+        # The SDK may swallow the interrupt; the result is useless either way
+        deadline.check(stage)
+        return result
+
     def get_recent_activity(
         self,
         project_path: str,
         hours: int = 24,
-        limit: int = 20
+        limit: int = 20,
+        deadline: Deadline = NO_DEADLINE
     ) -> List[Dict[str, Any]]:
         """Get recent memories from database (v2.0)"""
         if not self.db:
@@ -151,9 +524,14 @@ class ViduraiManager:
             return []
 
         try:
-            return self.db.get_recent_activity(project_path, hours, limit)
+            return self._sdk_query(
+                'recent activity', deadline,
+                lambda: self.db.get_recent_activity(project_path, hours, limit)
+            )
+        except DeadlineExceeded:
+            raise
         except Exception as e:
-            logger.error(f"Error getting recent activity: {e}")
+            logger.error("Error getting recent activity: %s", e)
             return []
 
     def recall_from_database(
@@ -161,7 +539,8 @@ class ViduraiManager:
         project_path: str,
         query: Optional[str] = None,
         min_salience: str = 'MEDIUM',
-        limit: int = 10
+        limit: int = 10,
+        deadline: Deadline = NO_DEADLINE
     ) -> List[Dict[str, Any]]:
         """Recall memories from database (v2.0)"""
         if not self.db:
@@ -172,14 +551,16 @@ class ViduraiManager:
             # Convert string to DBSalienceLevel
             db_salience = DBSalienceLevel[min_salience.upper()]
 
-            return self.db.recall_memories(
+            return self._sdk_query('recall', deadline, lambda: self.db.recall_memories(
                 project_path=project_path,
                 query=query,
                 min_salience=db_salience,
                 limit=limit
-            )
+            ))
+        except DeadlineExceeded:
+            raise
         except Exception as e:
-            logger.error(f"Error recalling from database: {e}")
+            logger.error("Error recalling from database: %s", e)
             return []
 
     def get_database_statistics(self, project_path: str) -> Dict[str, Any]:
@@ -191,18 +572,150 @@ class ViduraiManager:
         try:
             return self.db.get_statistics(project_path)
         except Exception as e:
-            logger.error(f"Error getting database statistics: {e}")
+            logger.error("Error getting database statistics: %s", e)
             return {'total': 0, 'by_salience': {}, 'by_type': {}}
 
+    def _read_connection(self) -> sqlite3.Connection:
+        """Separate read-only connection for paged/streamed queries"""
+        conn = sqlite3.connect(self.db.db_path, timeout=10.0)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def query_database_page(
+        self,
+        project_path: str,
+        min_salience: str = 'LOW',
+        hours: Optional[int] = None,
+        query: Optional[str] = None,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        fields: Optional[List[str]] = None,
+        deadline: Deadline = NO_DEADLINE
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        Keyset-paginated memory query (newest first).
+
+        Uses (created_at, id) as the key, so each page is an index range scan
+        no matter how deep the client pages. Only the requested `fields` are
+        selected from the database.
+        """
+        if not self.db:
+            logger.warning("Database not available")
+            return [], None
+
+        after = decode_cursor(cursor)
+        threshold = DBSalienceLevel[min_salience.upper()].value
+        salience_values = [s.name for s in DBSalienceLevel if s.value >= threshold]
+
+        # id and created_at are always needed to build the next cursor
+        columns = [c for c in DB_MEMORY_FIELDS if c in (fields or DB_MEMORY_FIELDS)
+                   or c in ('id', 'created_at')]
+
+        sql = f"""
+            SELECT {', '.join('m.' + c for c in columns)}
+            FROM memories m
+            JOIN projects p ON p.id = m.project_id
+            WHERE p.path = ?
+                AND (m.expires_at IS NULL OR m.expires_at > datetime('now'))
+                AND m.salience IN ({','.join('?' * len(salience_values))})
+        """
+        params: List[Any] = [project_path] + salience_values
+
+        if hours:
+            sql += " AND m.created_at >= datetime('now', ?)"
+            params.append(f'-{hours} hours')
+        if query and query.strip():
+            sql += " AND m.id IN (SELECT memory_id FROM memories_fts WHERE memories_fts MATCH ?)"
+            params.append(query)
+        if after is not None:
+            sql += " AND (m.created_at < ? OR (m.created_at = ? AND m.id < ?))"
+            params.extend([after[0], after[0], after[1]])
+
+        sql += " ORDER BY m.created_at DESC, m.id DESC LIMIT ?"
+        params.append(limit + 1)  # One extra row tells us whether there is a next page
+
+        conn = self._read_connection()
+        try:
+            with deadline.guard_sqlite(conn):
+                rows = conn.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            logger.error("Error querying memories: %s", e)
+            return [], None
+        finally:
+            conn.close()
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        next_cursor = encode_cursor([rows[-1]['created_at'], rows[-1]['id']]) if has_more else None
+        return [project(dict(row), fields) for row in rows], next_cursor
+
+    def store_many(self, project_path: str, records: List[Dict[str, Any]]) -> int:
+        """
+        Bulk-insert memories into the database in a single transaction.
+
+        Each record needs verbatim, gist, salience (name) and event_type;
+        file_path, line_number, tags and created_at are optional
+        (created_at defaults to now).
+        """
+        if not self.db:
+            raise RuntimeError("Database not available")
+        if not records:
+            return 0
+
+        project_id = self.db.get_or_create_project(project_path)
+        rows = [
+            (
+                project_id,
+                r['verbatim'],
+                r['gist'],
+                r['salience'],
+                r['event_type'],
+                r.get('file_path'),
+                r.get('line_number'),
+                r.get('tags'),
+                r.get('created_at')
+            )
+            for r in records
+        ]
+
+        conn = sqlite3.connect(self.db.db_path, timeout=30.0, isolation_level=None)
+        try:
+            # IMMEDIATE takes the write lock up front, so the id range below is ours
+            conn.execute("BEGIN IMMEDIATE")
+            first_id = conn.execute("SELECT COALESCE(MAX(id), 0) FROM memories").fetchone()[0]
+            conn.executemany("""
+                INSERT INTO memories (
+                    project_id, verbatim, gist, salience, event_type, file_path,
+                    line_number, tags, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+            """, rows)
+            conn.execute("""
+                INSERT INTO memories_fts (memory_id, gist, verbatim, tags)
+                SELECT id, gist, verbatim, tags FROM memories WHERE id > ?
+            """, (first_id,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        return len(rows)
+
     def get_context_for_ai(
         self,
         project_path: str,
         query: Optional[str] = None,
-        max_tokens: int = 2000
+        max_tokens: int = 2000,
+        deadline: Deadline = NO_DEADLINE
     ) -> str:
         """Get formatted context for AI injection (v2.0)"""
         try:
-            return self.memory.get_context_for_ai(query=query, max_tokens=max_tokens)
+            return self._sdk_query('context', deadline, lambda: self.memory.get_context_for_ai(
+                query=query, max_tokens=max_tokens
+            ))
+        except DeadlineExceeded:
+            raise
         except Exception as e:
-            logger.error(f"Error getting AI context: {e}")
+            logger.error("Error getting AI context: %s", e)
             return f"[Error: {str(e)}]"
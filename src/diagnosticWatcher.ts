@@ -5,12 +5,15 @@
 import * as vscode from 'vscode';
 import * as path from 'path';
 import { PythonBridge } from './pythonBridge';
-import { log, getConfig } from './utils';
+import { log, getConfig, adaptiveDebounce } from './utils';
 
 export class DiagnosticWatcher {
     private bridge: PythonBridge;
     private disposables: vscode.Disposable[] = [];
     private processedDiagnostics: Set<string> = new Set();
+    // Diagnostics held back while the bridge is busy, oldest first
+    private pendingDiagnostics: Array<{ filePath: string; diagnostic: vscode.Diagnostic }> = [];
+    private flushTimer: NodeJS.Timeout | undefined;
 
     constructor(bridge: PythonBridge) {
         this.bridge = bridge;
@@ -45,6 +48,11 @@ export class DiagnosticWatcher {
     stop(): void {
         log('info', 'Stopping diagnostic watcher');
 
+        if (this.flushTimer) {
+            clearTimeout(this.flushTimer);
+            this.flushTimer = undefined;
+        }
+        this.pendingDiagnostics = [];
         this.processedDiagnostics.clear();
         this.disposables.forEach(d => d.dispose());
         this.disposables = [];
@@ -89,7 +97,7 @@ export class DiagnosticWatcher {
             this.processedDiagnostics.add(diagId);
 
             // Send to bridge
-            this.sendDiagnosticEvent(filePath, diagnostic);
+            this.enqueueDiagnostic(filePath, diagnostic);
 
             // Clean up old processed diagnostics (keep last 1000)
             if (this.processedDiagnostics.size > 1000) {
@@ -99,6 +107,42 @@ export class DiagnosticWatcher {
         }
     }
 
+    /**
+     * Send a diagnostic now, or hold it for a paced send while the bridge is busy
+     */
+    private enqueueDiagnostic(filePath: string, diagnostic: vscode.Diagnostic): void {
+        if (this.bridge.getLoadHint().queue_depth === 0 && !this.flushTimer) {
+            this.sendDiagnosticEvent(filePath, diagnostic);
+            return;
+        }
+
+        this.pendingDiagnostics.push({ filePath, diagnostic });
+        this.scheduleFlush();
+    }
+
+    private scheduleFlush(): void {
+        if (!this.flushTimer) {
+            const delay = adaptiveDebounce(0, this.bridge.getLoadHint());
+            this.flushTimer = setTimeout(() => this.flushDiagnostics(), delay);
+        }
+    }
+
+    /**
+     * Send up to the bridge's batch size of held diagnostics, then wait again for the rest.
+     * Each diagnostic stays its own event, so its severity and error fingerprint are its own.
+     */
+    private flushDiagnostics(): void {
+        this.flushTimer = undefined;
+        const batchSize = Math.max(1, this.bridge.getLoadHint().batch_size);
+
+        for (const { filePath, diagnostic } of this.pendingDiagnostics.splice(0, batchSize)) {
+            this.sendDiagnosticEvent(filePath, diagnostic);
+        }
+        if (this.pendingDiagnostics.length > 0) {
+            this.scheduleFlush();
+        }
+    }
+
     /**
      * Send diagnostic event to bridge
      */
@@ -115,12 +159,14 @@ export class DiagnosticWatcher {
 
             log('debug', `Sending diagnostic: ${severity} in ${path.basename(filePath)}`);
 
+            const timeout = 5000 + this.bridge.getLoadHint().min_debounce_ms;
             const response = await this.bridge.send({
                 type: 'diagnostic',
                 file: filePath,
                 severity: severity,
-                message: message
-            }, 5000);
+                message: message,
+                project_path: vscode.workspace.getWorkspaceFolder(vscode.Uri.file(filePath))?.uri.fsPath
+            }, timeout);
 
             if (response.status === 'ok') {
                 log('debug', `Diagnostic processed: ${response.gist} (${response.salience})`);
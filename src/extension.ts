@@ -7,7 +7,7 @@ import * as vscode from 'vscode';
 import * as fs from 'fs';
 import * as path from 'path';
 import * as os from 'os';
-import { PythonBridge } from './pythonBridge';
+import { PythonBridge, LogRecord, decodeMemories } from './pythonBridge';
 import { StatusBarManager } from './statusBar';
 import { ensureVidurai } from './installer';
 import { log, getConfig, getOutputChannel } from './utils';
@@ -22,6 +22,7 @@ let fileWatcher: FileWatcher | null = null;
 let terminalWatcher: TerminalWatcher | null = null;
 let diagnosticWatcher: DiagnosticWatcher | null = null;
 let memoryTreeView: vscode.TreeView<any> | null = null;
+let lastLogSeq = 0;  // Last bridge log record copied to the output channel
 
 /**
  * Extension activation
@@ -207,10 +208,120 @@ function registerCommands(context: vscode.ExtensionContext) {
 
     // Command: Show Logs
     context.subscriptions.push(
-        vscode.commands.registerCommand('vidurai.showLogs', () => {
+        vscode.commands.registerCommand('vidurai.showLogs', async () => {
+            await fetchBridgeLogs();
             getOutputChannel().show();
         })
     );
+
+    // Commands: Export / Import Memories (streaming NDJSON)
+    context.subscriptions.push(
+        vscode.commands.registerCommand('vidurai.exportMemories', async () => {
+            await transferMemories('export');
+        }),
+        vscode.commands.registerCommand('vidurai.importMemories', async () => {
+            await transferMemories('import');
+        })
+    );
+}
+
+/**
+ * Copy bridge log records buffered since the last fetch into the output channel
+ * (the bridge only writes warnings and errors to stderr)
+ */
+async function fetchBridgeLogs() {
+    if (!bridge || !bridge.isRunning()) {
+        return;
+    }
+
+    try {
+        let response = await bridge.send({ type: 'get_logs', since: lastLogSeq, limit: 500 });
+        if (response.status === 'ok' && response.last_seq < lastLogSeq) {
+            // Bridge restarted: sequence numbers start over
+            lastLogSeq = 0;
+            response = await bridge.send({ type: 'get_logs', since: 0, limit: 500 });
+        }
+        if (response.status !== 'ok') {
+            log('warn', `Could not fetch bridge logs: ${response.error}`);
+            return;
+        }
+
+        const channel = getOutputChannel();
+        for (const record of response.logs as LogRecord[]) {
+            const suppressed = record.suppressed ? ` (${record.suppressed} similar messages suppressed)` : '';
+            channel.appendLine(`[${record.ts}] [bridge ${record.level}] ${record.message}${suppressed}`);
+        }
+        lastLogSeq = response.last_seq;
+
+    } catch (error: any) {
+        log('warn', `Could not fetch bridge logs: ${error.message}`);
+    }
+}
+
+/**
+ * Export or import the current project's memories as NDJSON
+ */
+async function transferMemories(direction: 'export' | 'import') {
+    if (!bridge || !bridge.isRunning()) {
+        vscode.window.showErrorMessage('⚠️ Vidurai bridge is not running');
+        return;
+    }
+
+    const workspaceFolder = vscode.workspace.workspaceFolders?.[0];
+    if (!workspaceFolder) {
+        vscode.window.showErrorMessage('⚠️ Open a folder to export or import its memories');
+        return;
+    }
+
+    const filters = { 'Vidurai export': ['ndjson', 'gz'] };
+    let uri: vscode.Uri | undefined;
+    if (direction === 'export') {
+        uri = await vscode.window.showSaveDialog({
+            defaultUri: vscode.Uri.joinPath(workspaceFolder.uri, 'vidurai-memories.ndjson.gz'),
+            filters
+        });
+    } else {
+        uri = (await vscode.window.showOpenDialog({ canSelectMany: false, filters }))?.[0];
+    }
+    if (!uri) {
+        return;
+    }
+
+    const activeBridge = bridge;
+    try {
+        const response = await vscode.window.withProgress(
+            {
+                location: vscode.ProgressLocation.Notification,
+                title: direction === 'export' ? 'Exporting Vidurai memories' : 'Importing Vidurai memories'
+            },
+            (progress) => activeBridge.send(
+                {
+                    type: `${direction}_memories`,
+                    project_path: workspaceFolder.uri.fsPath,
+                    path: uri!.fsPath
+                },
+                60000,
+                (update) => progress.report({
+                    message: `${update.exported ?? update.imported} memories`
+                })
+            )
+        );
+
+        if (response.status !== 'ok') {
+            vscode.window.showErrorMessage(`❌ ${direction} failed: ${response.error}`);
+            return;
+        }
+
+        const summary = response[direction];
+        const count = summary.exported ?? summary.imported;
+        vscode.window.showInformationMessage(
+            `✅ ${direction === 'export' ? 'Exported' : 'Imported'} ${count} memories`
+        );
+
+    } catch (error: any) {
+        log('error', `Memory ${direction} failed: ${error.message}`);
+        vscode.window.showErrorMessage(`❌ ${direction} failed: ${error.message}`);
+    }
 }
 
 /**
@@ -227,7 +338,8 @@ async function copyContext() {
         const response = await bridge.send({
             type: 'recall_context',
             query: '',
-            top_k: 10
+            top_k: 10,
+            encoding: 'dict'
         });
 
         if (response.status !== 'ok' || !response.memories) {
@@ -239,7 +351,7 @@ async function copyContext() {
         let markdown = '# Vidurai Context\n\n';
         markdown += '_Automatically generated from your recent work_\n\n';
 
-        for (const mem of response.memories) {
+        for (const mem of decodeMemories(response)) {
             markdown += `## ${mem.gist}\n\n`;
             markdown += `- **Salience:** ${mem.salience}\n`;
             markdown += `- **Age:** ${mem.age_days} days ago\n\n`;
@@ -5,7 +5,7 @@
 import * as vscode from 'vscode';
 import * as path from 'path';
 import { PythonBridge } from './pythonBridge';
-import { log, getConfig } from './utils';
+import { log, getConfig, adaptiveDebounce } from './utils';
 import {
     ViduraiEvent,
     FileEditPayload,
@@ -16,6 +16,9 @@ import {
 export class FileWatcher {
     private bridge: PythonBridge;
     private editTimers: Map<string, NodeJS.Timeout> = new Map();
+    // One request per file at a time; newer content waits here meanwhile
+    private inFlight: Set<string> = new Set();
+    private pendingContent: Map<string, string> = new Map();
     private disposables: vscode.Disposable[] = [];
 
     constructor(bridge: PythonBridge) {
@@ -54,6 +57,7 @@ export class FileWatcher {
         // Clear all debounce timers
         this.editTimers.forEach(timer => clearTimeout(timer));
         this.editTimers.clear();
+        this.pendingContent.clear();
 
         // Dispose event handlers
         this.disposables.forEach(d => d.dispose());
@@ -88,8 +92,15 @@ export class FileWatcher {
         }
 
         // Debounce: Only send event after user stops typing
-        const debounceMs = getConfig('debounceMs', 2000);
+        // (longer while the bridge is backed up, within vidurai.maxDebounceMs)
+        const debounceMs = adaptiveDebounce(getConfig('debounceMs', 2000), this.bridge.getLoadHint());
+        this.scheduleEdit(filePath, content, debounceMs);
+    }
 
+    /**
+     * (Re)start the debounce timer for a file
+     */
+    private scheduleEdit(filePath: string, content: string, delayMs: number): void {
         // Clear existing timer for this file
         const existingTimer = this.editTimers.get(filePath);
         if (existingTimer) {
@@ -98,15 +109,15 @@ export class FileWatcher {
 
         // Set new timer
         const timer = setTimeout(() => {
-            this.sendFileEditEvent(filePath, content);
             this.editTimers.delete(filePath);
-        }, debounceMs);
+            this.dispatchFileEdit(filePath, content);
+        }, delayMs);
 
         this.editTimers.set(filePath, timer);
     }
 
     /**
-     * Handle file save (immediate, no debounce)
+     * Handle file save (immediate unless the bridge is backed up)
      */
     private onFileSave(document: vscode.TextDocument): void {
         if (document.uri.scheme !== 'file') {
@@ -121,6 +132,15 @@ export class FileWatcher {
 
         log('debug', `File saved: ${filePath}`);
 
+        const content = document.getText();
+
+        // Bridge backed up: coalesce with further edits instead of adding to the queue
+        const load = this.bridge.getLoadHint();
+        if (load.queue_depth > 0) {
+            this.scheduleEdit(filePath, content, adaptiveDebounce(0, load));
+            return;
+        }
+
         // File save is important, send immediately
         // (This will also clear any pending debounced edit)
         const existingTimer = this.editTimers.get(filePath);
@@ -129,8 +149,31 @@ export class FileWatcher {
             this.editTimers.delete(filePath);
         }
 
-        const content = document.getText();
-        this.sendFileEditEvent(filePath, content);
+        this.dispatchFileEdit(filePath, content);
+    }
+
+    /**
+     * Send an edit, or hold it until this file's previous request completes
+     */
+    private async dispatchFileEdit(filePath: string, content: string): Promise<void> {
+        if (this.inFlight.has(filePath)) {
+            // Only the latest content is sent once the current request finishes
+            this.pendingContent.set(filePath, content);
+            return;
+        }
+
+        this.inFlight.add(filePath);
+        try {
+            await this.sendFileEditEvent(filePath, content);
+        } finally {
+            this.inFlight.delete(filePath);
+            const next = this.pendingContent.get(filePath);
+            this.pendingContent.delete(filePath);
+            // A running debounce timer already holds newer content
+            if (next !== undefined && !this.editTimers.has(filePath)) {
+                this.scheduleEdit(filePath, next, adaptiveDebounce(0, this.bridge.getLoadHint()));
+            }
+        }
     }
 
     /**
@@ -183,15 +226,18 @@ export class FileWatcher {
             log('debug', `ViduraiEvent created: ${event.event_id} (${VIDURAI_SCHEMA_VERSION})`);
 
             // Send to bridge (protocol unchanged - we just send structured data)
+            // Allow for the backlog ahead of this request when the bridge is busy
+            const timeout = 5000 + this.bridge.getLoadHint().min_debounce_ms;
             const response = await this.bridge.send({
                 type: 'file_edit',
                 file: filePath,
                 content: content,
+                project_path: projectRoot,  // Keys the bridge's activity rollups
                 // Include event metadata for future use
                 _event_id: event.event_id,
                 _timestamp: event.timestamp,
                 _schema_version: event.schema_version
-            }, 5000);
+            }, timeout);
 
             if (response.status === 'ok') {
                 log('debug', `File edit processed: ${response.gist} (${response.salience})`);
@@ -1,11 +1,16 @@
 /**
  * Python Bridge Communication
- * Manages subprocess and stdin/stdout communication
+ * Manages subprocess and stdin/stdout communication,
+ * or a connection to a shared bridge daemon when one is running
  */
 import * as vscode from 'vscode';
 import * as path from 'path';
+import * as fs from 'fs';
+import * as os from 'os';
+import * as net from 'net';
+import { Writable } from 'stream';
 import { spawn, ChildProcess } from 'child_process';
-import { log } from './utils';
+import { log, getConfig } from './utils';
 
 interface BridgeEvent {
     type: string;
@@ -13,20 +18,93 @@ interface BridgeEvent {
 }
 
 interface BridgeResponse {
-    status: 'ok' | 'error';
+    status: 'ok' | 'error' | 'progress' | 'deadline_exceeded';
     [key: string]: any;
 }
 
+/**
+ * Flow-control hint the bridge attaches to every response as `_load`
+ */
+export interface LoadHint {
+    queue_depth: number;      // Events waiting in the bridge (plus our unanswered requests)
+    min_debounce_ms: number;  // Send no faster than this
+    batch_size: number;       // Fold this many pending events into one request
+}
+
+// Keys the bridge dictionary-encodes when a request sets encoding: 'dict'
+const ENCODED_KEYS = ['file', 'file_path', 'type', 'event_type', 'severity', 'salience'];
+
+/**
+ * Expand a dictionary-encoded memory list (string table indexes -> strings)
+ */
+export function decodeMemories(response: BridgeResponse): any[] {
+    const memories: any[] = response.memories || [];
+    if (response.encoding !== 'dict') {
+        return memories;
+    }
+
+    const strings: string[] = response.strings || [];
+    const decode = (record: any): any => {
+        const out: any = { ...record };
+        for (const key of ENCODED_KEYS) {
+            if (typeof out[key] === 'number') {
+                out[key] = strings[out[key]];
+            }
+        }
+        if (out.metadata && typeof out.metadata === 'object') {
+            out.metadata = decode(out.metadata);
+        }
+        return out;
+    };
+    return memories.map(decode);
+}
+
+const IDLE_LOAD: LoadHint = { queue_depth: 0, min_debounce_ms: 0, batch_size: 1 };
+
+// Bridge stderr lines look like "[<time>] WARNING: <message>"
+const STDERR_LEVEL = /^\[[^\]]*\] (\w+):/;
+
+/**
+ * Output channel level for a chunk of bridge stderr (tracebacks and
+ * unformatted output count as errors: the bridge only writes warnings up)
+ */
+function stderrLevel(chunk: string): string {
+    const match = STDERR_LEVEL.exec(chunk);
+    if (!match) {
+        return 'error';
+    }
+    switch (match[1]) {
+        case 'DEBUG': return 'debug';
+        case 'INFO': return 'info';
+        case 'WARNING': return 'warn';
+        default: return 'error';
+    }
+}
+
+export interface LogRecord {
+    seq: number;
+    ts: string;
+    level: string;
+    logger: string;
+    message: string;
+    suppressed: number;  // Similar records dropped by the rate limiter before this one
+}
+
 export class PythonBridge {
     private process: ChildProcess | null = null;
+    private daemonSocket: net.Socket | null = null;  // Shared daemon connection
     private pythonPath: string;
     private bridgePath: string;
     private bridgeDir: string;
     private responseCallbacks: Map<number, (response: BridgeResponse) => void> = new Map();
+    // Interim 'progress' messages for long-running requests (export/import)
+    private progressCallbacks: Map<number, (progress: BridgeResponse) => void> = new Map();
     private requestId: number = 0;
     private crashCount: number = 0;
+    private restartCount: number = 0;  // Reported by the bridge's health command
     private readonly MAX_CRASHES = 3;
     private stdoutBuffer: string = '';  // Buffer for partial lines
+    private loadHint: LoadHint = IDLE_LOAD;  // From the latest response
 
     constructor(pythonPath: string, extensionPath: string) {
         this.pythonPath = pythonPath;
@@ -38,11 +116,27 @@ export class PythonBridge {
      * Start the Python bridge process
      */
     async start(): Promise<void> {
-        if (this.process) {
+        if (this.process || this.daemonSocket) {
             log('warn', 'Bridge already running');
             return;
         }
 
+        // Prefer a shared daemon (python bridge.py daemon) if one is running
+        if (await this.connectDaemon()) {
+            try {
+                const pingResponse = await this.send({ type: 'ping' }, 5000);
+                if (pingResponse.status === 'ok') {
+                    log('info', 'Connected to shared bridge daemon');
+                    this.crashCount = 0;
+                    return;
+                }
+            } catch (error: any) {
+                log('warn', `Bridge daemon ping failed: ${error.message}`);
+            }
+            log('warn', 'Bridge daemon did not answer ping, spawning private bridge');
+            this.disconnectDaemon();
+        }
+
         log('info', `Starting Python bridge: ${this.pythonPath} -u ${this.bridgePath}`);
         log('info', `Bridge working directory: ${this.bridgeDir}`);
 
@@ -51,7 +145,11 @@ export class PythonBridge {
             this.process = spawn(this.pythonPath, ['-u', this.bridgePath], {
                 stdio: ['pipe', 'pipe', 'pipe'],
                 cwd: this.bridgeDir,
-                env: { ...process.env, PYTHONUNBUFFERED: '1' }
+                env: {
+                    ...process.env,
+                    PYTHONUNBUFFERED: '1',
+                    VIDURAI_BRIDGE_RESTARTS: String(this.restartCount)
+                }
             });
 
             // Handle stdout (JSON responses) with proper buffering
@@ -59,18 +157,11 @@ export class PythonBridge {
                 this.handleStdout(data);
             });
 
-            // Handle stderr (logs from Python)
+            // Handle stderr (warnings and errors only; the rest is fetched with get_logs)
             this.process.stderr?.on('data', (data: Buffer) => {
                 const message = data.toString().trim();
                 if (message) {
-                    // Log at appropriate level based on content
-                    if (message.includes('ERROR') || message.includes('Exception')) {
-                        log('error', `Bridge stderr: ${message}`);
-                    } else if (message.includes('WARNING')) {
-                        log('warn', `Bridge stderr: ${message}`);
-                    } else {
-                        log('info', `Bridge stderr: ${message}`);
-                    }
+                    log(stderrLevel(message), `Bridge stderr: ${message}`);
                 }
             });
 
@@ -97,10 +188,80 @@ export class PythonBridge {
         }
     }
 
+    /**
+     * Connect to the shared bridge daemon socket, if one is listening
+     */
+    private connectDaemon(): Promise<boolean> {
+        if (!getConfig('useDaemon', true) || process.platform === 'win32') {
+            return Promise.resolve(false);
+        }
+
+        const socketPath = getConfig('daemonSocket', '')
+            || path.join(os.homedir(), '.vidurai', 'bridge.sock');
+
+        if (!fs.existsSync(socketPath)) {
+            return Promise.resolve(false);
+        }
+
+        return new Promise(resolve => {
+            const socket = net.createConnection(socketPath);
+
+            const timeoutHandle = setTimeout(() => {
+                socket.destroy();
+                resolve(false);
+            }, 1000);
+
+            socket.once('error', (error: Error) => {
+                clearTimeout(timeoutHandle);
+                log('info', `No bridge daemon at ${socketPath} (${error.message}), spawning private bridge`);
+                resolve(false);
+            });
+
+            socket.once('connect', () => {
+                clearTimeout(timeoutHandle);
+                log('info', `Connected to bridge daemon: ${socketPath}`);
+                this.daemonSocket = socket;
+
+                socket.on('data', (data: Buffer) => {
+                    this.handleStdout(data);
+                });
+
+                socket.on('error', (error: Error) => {
+                    log('error', `Bridge daemon connection error: ${error.message}`);
+                });
+
+                socket.on('close', () => {
+                    // Ignore deliberate disconnects (stop/restart)
+                    if (this.daemonSocket !== socket) {
+                        return;
+                    }
+                    log('warn', 'Lost connection to bridge daemon');
+                    this.daemonSocket = null;
+                    this.handleCrash();
+                });
+
+                resolve(true);
+            });
+        });
+    }
+
+    /**
+     * Close the daemon connection (the daemon keeps serving other windows)
+     */
+    private disconnectDaemon(): void {
+        if (this.daemonSocket) {
+            const socket = this.daemonSocket;
+            this.daemonSocket = null;
+            socket.end();
+        }
+    }
+
     /**
      * Stop the Python bridge process
      */
     stop(): void {
+        this.disconnectDaemon();
+
         if (this.process) {
             log('info', 'Stopping Python bridge');
             this.process.kill('SIGTERM');
@@ -118,6 +279,8 @@ export class PythonBridge {
         // Clear stdout buffer and pending callbacks
         this.stdoutBuffer = '';
         this.responseCallbacks.clear();
+        this.progressCallbacks.clear();
+        this.loadHint = IDLE_LOAD;
     }
 
     /**
@@ -125,6 +288,7 @@ export class PythonBridge {
      */
     async restart(): Promise<void> {
         log('info', 'Restarting bridge');
+        this.restartCount++;
         this.stop();
         await new Promise(resolve => setTimeout(resolve, 1000));
         await this.start();
@@ -132,32 +296,56 @@ export class PythonBridge {
 
     /**
      * Send event to bridge and wait for response
+     *
+     * onProgress receives interim 'progress' messages; each one also
+     * restarts the timeout, so long streaming requests don't time out.
      */
-    send(event: BridgeEvent, timeout: number = 30000): Promise<BridgeResponse> {
+    send(
+        event: BridgeEvent,
+        timeout: number = 30000,
+        onProgress?: (progress: BridgeResponse) => void
+    ): Promise<BridgeResponse> {
         return new Promise((resolve, reject) => {
-            if (!this.process || !this.process.stdin) {
+            const writer: Writable | null = this.daemonSocket ?? this.process?.stdin ?? null;
+            if (!writer) {
                 reject(new Error('Bridge not running'));
                 return;
             }
 
             const id = this.requestId++;
-            const eventWithId = { ...event, _id: id };
+            // _timestamp lets the bridge measure client-to-bridge lag; _deadline lets it
+            // drop work we stop waiting for (not for streaming requests, whose timeout
+            // restarts on every progress message)
+            const now = Date.now();
+            const eventWithId: BridgeEvent = { _timestamp: new Date(now).toISOString(), ...event, _id: id };
+            if (!onProgress) {
+                eventWithId._deadline = now + timeout;
+            }
 
             // Set timeout
-            const timeoutHandle = setTimeout(() => {
+            const onTimeout = () => {
                 this.responseCallbacks.delete(id);
+                this.progressCallbacks.delete(id);
                 reject(new Error('Bridge timeout'));
-            }, timeout);
+            };
+            let timeoutHandle = setTimeout(onTimeout, timeout);
 
             // Store callback
             this.responseCallbacks.set(id, (response) => {
                 clearTimeout(timeoutHandle);
+                this.progressCallbacks.delete(id);
                 resolve(response);
             });
 
+            this.progressCallbacks.set(id, (progress) => {
+                clearTimeout(timeoutHandle);
+                timeoutHandle = setTimeout(onTimeout, timeout);
+                onProgress?.(progress);
+            });
+
             // Send event
             const json = JSON.stringify(eventWithId) + '\n';
-            const written = this.process.stdin.write(json);
+            const written = writer.write(json);
 
             if (!written) {
                 log('warn', `Write buffer full for event: ${event.type}`);
@@ -209,11 +397,21 @@ export class PythonBridge {
     private handleResponse(response: BridgeResponse): void {
         const id = (response as any)._id;
 
-        if (id !== undefined) {
+        if (response._load) {
+            this.loadHint = response._load;
+        }
+
+        if (id !== undefined && response.status === 'progress') {
+            // Interim update: the request stays pending
+            this.progressCallbacks.get(id)?.(response);
+        } else if (id !== undefined) {
             const callback = this.responseCallbacks.get(id);
             if (callback) {
                 this.responseCallbacks.delete(id);
                 callback(response);
+            } else if (response.status === 'deadline_exceeded') {
+                // Expected: we already timed out and the bridge skipped the work
+                log('debug', `Bridge dropped expired request ID: ${id}`);
             } else {
                 log('warn', `No callback found for response ID: ${id}`);
             }
@@ -260,10 +458,24 @@ export class PythonBridge {
         }
     }
 
+    /**
+     * Latest load hint from the bridge
+     *
+     * Requests still awaiting a response count towards the queue depth, so
+     * callers back off even when a stalled bridge sends nothing back.
+     */
+    getLoadHint(): LoadHint {
+        const pending = this.responseCallbacks.size;
+        if (pending <= this.loadHint.queue_depth) {
+            return this.loadHint;
+        }
+        return { ...this.loadHint, queue_depth: pending };
+    }
+
     /**
      * Check if bridge is running
      */
     isRunning(): boolean {
-        return this.process !== null;
+        return this.process !== null || this.daemonSocket !== null;
     }
 }
@@ -5,6 +5,9 @@ import * as vscode from 'vscode';
 import { PythonBridge } from './pythonBridge';
 import { log } from './utils';
 
+const SPARKLINE_HOURS = 8;
+const SPARK_BLOCKS = ['▁', '▂', '▃', '▄', '▅', '▆', '▇', '█'];
+
 export class StatusBarManager {
     private statusBarItem: vscode.StatusBarItem;
     private bridge: PythonBridge;
@@ -65,10 +68,17 @@ export class StatusBarManager {
 
             if (response.status === 'ok' && response.stats) {
                 const memoryCount = response.stats.total_memories || 0;
+                const sparkline = await this.activitySparkline();
+                const label = sparkline ? `⊚ ${memoryCount} ${sparkline}` : `⊚ ${memoryCount}`;
 
-                this.statusBarItem.text = `⊚ ${memoryCount}`;
-                this.statusBarItem.tooltip = `Vidurai: ${memoryCount} memories tracked\nClick to copy context`;
+                this.statusBarItem.text = label;
+                this.statusBarItem.tooltip =
+                    `Vidurai: ${memoryCount} memories tracked\n` +
+                    (sparkline ? `Activity, last ${SPARKLINE_HOURS}h: ${sparkline}\n` : '') +
+                    'Click to copy context';
                 this.statusBarItem.command = 'vidurai.copyContext';
+
+                await this.updateHealth(memoryCount, label);
             }
 
         } catch (error: any) {
@@ -79,6 +89,54 @@ export class StatusBarManager {
         }
     }
 
+    /**
+     * Hourly activity for the workspace, from the bridge's precomputed rollups
+     */
+    private async activitySparkline(): Promise<string> {
+        const projectPath = vscode.workspace.workspaceFolders?.[0]?.uri.fsPath;
+        if (!projectPath) {
+            return '';
+        }
+
+        const response = await this.bridge.send({
+            type: 'get_activity_histogram',
+            project_path: projectPath,
+            granularity: 'hour',
+            buckets: SPARKLINE_HOURS
+        }, 5000);
+
+        const counts: number[] = response.status === 'ok' ? response.histogram.counts : [];
+        const max = Math.max(0, ...counts);
+        if (max === 0) {
+            return '';
+        }
+        return counts
+            .map(count => SPARK_BLOCKS[Math.round((count / max) * (SPARK_BLOCKS.length - 1))])
+            .join('');
+    }
+
+    /**
+     * Flag degraded bridge performance before requests start timing out
+     */
+    private async updateHealth(memoryCount: number, label: string): Promise<void> {
+        const response = await this.bridge.send({ type: 'health' }, 5000);
+
+        if (response.status !== 'ok' || !response.health?.degraded) {
+            return;
+        }
+
+        const health = response.health;
+        const reasons: string[] = health.degraded_reasons || [];
+
+        this.statusBarItem.text = `${label} $(warning)`;
+        this.statusBarItem.tooltip =
+            `Vidurai: ${memoryCount} memories tracked\n` +
+            `Bridge is slow: ${reasons.join(', ')}\n` +
+            `p95 lag: ${health.lag_ms?.p95 ?? '-'} ms, queued: ${health.queued}\n` +
+            'Click to copy context';
+        log('warn', `Bridge degraded: ${reasons.join(', ')}`);
+    }
+
     /**
      * Dispose status bar
      */
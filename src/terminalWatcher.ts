@@ -100,7 +100,8 @@ export class TerminalWatcher {
                 type: 'terminal_output',
                 command: command,
                 output: output,
-                exitCode: exitCode
+                exitCode: exitCode,
+                project_path: vscode.workspace.workspaceFolders?.[0]?.uri.fsPath
             }, 5000);
 
             if (response.status === 'ok') {
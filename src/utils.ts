@@ -6,6 +6,7 @@ import * as path from 'path';
 import * as fs from 'fs';
 import { exec } from 'child_process';
 import { promisify } from 'util';
+import type { LoadHint } from './pythonBridge';
 
 const execAsync = promisify(exec);
 
@@ -63,6 +64,15 @@ export function getConfig<T>(key: string, defaultValue: T): T {
     return vscode.workspace.getConfiguration('vidurai').get(key, defaultValue);
 }
 
+/**
+ * Debounce adapted to bridge load: at least baseMs and the bridge's
+ * recommended minimum, capped at vidurai.maxDebounceMs
+ */
+export function adaptiveDebounce(baseMs: number, load: LoadHint): number {
+    const maxMs = Math.max(baseMs, getConfig('maxDebounceMs', 30000));
+    return Math.min(Math.max(baseMs, load.min_debounce_ms), maxMs);
+}
+
 /**
  * Log message to output channel
  */
@@ -3,7 +3,7 @@
  * v2.0 - Database-backed memory browsing
  */
 import * as vscode from 'vscode';
-import { PythonBridge } from '../pythonBridge';
+import { PythonBridge, decodeMemories } from '../pythonBridge';
 
 interface Memory {
     id: number;
@@ -14,6 +14,14 @@ interface Memory {
     event_type: string;
 }
 
+// Only the columns the tree and details panel render
+const MEMORY_FIELDS = ['id', 'gist', 'salience', 'created_at', 'file_path', 'event_type'];
+
+interface MemoryPage {
+    memories: Memory[];
+    nextCursor: string | null;
+}
+
 export class MemoryTreeDataProvider implements vscode.TreeDataProvider<MemoryTreeItem> {
     private _onDidChangeTreeData: vscode.EventEmitter<MemoryTreeItem | undefined | null | void> =
         new vscode.EventEmitter<MemoryTreeItem | undefined | null | void>();
@@ -53,17 +61,31 @@ export class MemoryTreeDataProvider implements vscode.TreeDataProvider<MemoryTre
             return await this.getStatisticsItems();
         }
 
-        const memories = await this.getMemoriesForCategory(element.category);
-        return memories.map(mem => new MemoryTreeItem(
+        // "Load more" nodes fetch the next page of their parent category
+        const category = element.page ? element.page.category : element.category;
+        const page = await this.getMemoriesForCategory(category, element.page?.cursor ?? null);
+
+        const items = page.memories.map(mem => new MemoryTreeItem(
             this.formatMemoryLabel(mem),
             'memory',
             vscode.TreeItemCollapsibleState.None,
             mem
         ));
+        if (page.nextCursor) {
+            items.push(new MemoryTreeItem(
+                '… Load more',
+                'more',
+                vscode.TreeItemCollapsibleState.Collapsed,
+                undefined,
+                { category, cursor: page.nextCursor }
+            ));
+        }
+        return items;
     }
 
-    private async getMemoriesForCategory(category: string): Promise<Memory[]> {
+    private async getMemoriesForCategory(category: string, cursor: string | null): Promise<MemoryPage> {
         const projectPath = vscode.workspace.workspaceFolders![0].uri.fsPath;
+        const empty: MemoryPage = { memories: [], nextCursor: null };
 
         try {
             let command: any;
@@ -93,18 +115,27 @@ export class MemoryTreeDataProvider implements vscode.TreeDataProvider<MemoryTre
                     };
                     break;
                 default:
-                    return [];
+                    return empty;
             }
 
+            // Keyset paging: the bridge returns next_cursor while more rows remain
+            command.cursor = cursor;
+            command.fields = MEMORY_FIELDS;
+            // File paths and types repeat across rows: send each once
+            command.encoding = 'dict';
+
             const result = await this.bridge.send(command);
             if (result.status === 'ok') {
-                return result.memories || [];
+                return {
+                    memories: decodeMemories(result),
+                    nextCursor: result.next_cursor || null
+                };
             }
 
-            return [];
+            return empty;
         } catch (error: any) {
             console.error('Error fetching memories:', error);
-            return [];
+            return empty;
         }
     }
 
@@ -191,7 +222,8 @@ export class MemoryTreeItem extends vscode.TreeItem {
         public readonly label: string,
         public readonly category: string,
         public readonly collapsibleState: vscode.TreeItemCollapsibleState,
-        public readonly memory?: Memory
+        public readonly memory?: Memory,
+        public readonly page?: { category: string; cursor: string }
     ) {
         super(label, collapsibleState);
 
@@ -205,6 +237,8 @@ export class MemoryTreeItem extends vscode.TreeItem {
             };
         } else if (category === 'stat') {
             this.contextValue = 'stat';
+        } else if (category === 'more') {
+            this.contextValue = 'more';
         } else {
             this.contextValue = 'category';
         }